@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+只追加的历史条目归档
+- 条目按发布日期（UTC）分段存放在 segments/<日期>.jsonl.gz，每次追加按 (日期, 来源) 写入一个独立的 gzip 成员
+- index.json 记录每个成员的偏移、长度、来源和时间范围；按来源和时间查询时只读取并解压命中的成员
+- 同一链接只归档一次；超过保留天数的整段文件直接删除
+- 抓取失败的源、更宽的回退窗口、--cache-only 重新生成和 --at 回溯都可以从本地归档取条目，无需重新抓取
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+from contextlib import contextmanager
+from dataclasses import astuple, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，退化为不加锁
+    fcntl = None
+
+ARCHIVE_DAYS = 30
+INDEX_FILE = "index.json"
+SEGMENT_SUFFIX = ".jsonl.gz"
+
+
+@dataclass
+class Member:
+    segment: str
+    offset: int
+    length: int
+    source: str
+    first: float
+    last: float
+    count: int
+
+
+def link_key(link: str) -> str:
+    return hashlib.sha1(link.encode("utf-8")).hexdigest()[:16]
+
+
+@contextmanager
+def locked(path: Path):
+    with open(f"{path}.lock", "a", encoding="utf-8") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class ItemArchive:
+    def __init__(self, directory: str, retention_days: int = ARCHIVE_DAYS):
+        self.root = Path(directory)
+        self.retention = timedelta(days=retention_days)
+        self.members: list[Member] = []
+        self.seen: dict[str, float] = {}
+        self._load()
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / INDEX_FILE
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.members = [Member(*m) for m in data.get("members", [])]
+            self.seen = dict(data.get("seen", {}))
+        except FileNotFoundError:
+            self.members, self.seen = [], {}
+        except (OSError, ValueError, TypeError) as e:
+            logging.warning("归档索引读取失败，按空归档处理: %s", e)
+            self.members, self.seen = [], {}
+
+    def _write_index(self) -> None:
+        data = {"members": [astuple(m) for m in self.members], "seen": self.seen}
+        tmp = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.index_path)
+
+    def append(self, items: Iterable[Any], now: Optional[datetime] = None) -> int:
+        """归档尚未见过的条目（需有 dt、link、source 与 to_dict()），返回新增条数"""
+        cutoff = ((now or datetime.now(timezone.utc)) - self.retention).timestamp()
+        (self.root / "segments").mkdir(parents=True, exist_ok=True)
+        with locked(self.index_path):
+            self._load()
+            groups: dict[tuple[str, str], list[tuple[float, str]]] = {}
+            for it in items:
+                dt = it.dt
+                if not dt or not it.link:
+                    continue
+                ts = dt.timestamp()
+                key = link_key(it.link)
+                if ts < cutoff or key in self.seen:
+                    continue
+                self.seen[key] = ts
+                record = {k: v for k, v in it.to_dict().items() if not k.startswith("_")}
+                record["ts"] = ts
+                day = dt.astimezone(timezone.utc).strftime("%Y-%m-%d")
+                groups.setdefault((day, it.source), []).append((ts, json.dumps(record, ensure_ascii=False)))
+
+            added = 0
+            for (day, source), rows in sorted(groups.items()):
+                rows.sort()
+                data = gzip.compress("".join(f"{line}\n" for _, line in rows).encode("utf-8"), mtime=0)
+                segment = f"{day}{SEGMENT_SUFFIX}"
+                with open(self.root / "segments" / segment, "ab") as f:
+                    offset = f.tell()
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.members.append(Member(segment, offset, len(data), source, rows[0][0], rows[-1][0], len(rows)))
+                added += len(rows)
+
+            self._prune(cutoff)
+            self._write_index()
+        return added
+
+    def _prune(self, cutoff: float) -> None:
+        """删除整段都早于保留期的分段文件，以及对应的索引和链接记录"""
+        cutoff_day = datetime.fromtimestamp(cutoff, timezone.utc).strftime("%Y-%m-%d")
+        expired = {m.segment for m in self.members if m.segment[:len(cutoff_day)] < cutoff_day}
+        for segment in expired:
+            try:
+                (self.root / "segments" / segment).unlink()
+            except FileNotFoundError:
+                pass
+        self.members = [m for m in self.members if m.segment not in expired]
+        self.seen = {k: ts for k, ts in self.seen.items() if ts >= cutoff}
+
+    def query(
+        self,
+        sources: Optional[Iterable[str]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """按来源与时间范围扫描：只解压索引命中的成员，逐条产出记录（含 ts）"""
+        names = set(sources) if sources is not None else None
+        lo = since.timestamp() if since else float("-inf")
+        hi = until.timestamp() if until else float("inf")
+        hits = [
+            m for m in self.members
+            if (names is None or m.source in names) and m.last >= lo and m.first <= hi
+        ]
+        hits.sort(key=lambda m: (m.segment, m.offset))
+        for m in hits:
+            try:
+                with open(self.root / "segments" / m.segment, "rb") as f:
+                    f.seek(m.offset)
+                    data = gzip.decompress(f.read(m.length))
+            except (OSError, EOFError) as e:
+                logging.debug("归档分段读取失败 [%s]: %s", m.segment, e)
+                continue
+            for line in data.decode("utf-8").splitlines():
+                record = json.loads(line)
+                if lo <= record["ts"] <= hi:
+                    yield record
+
+    @property
+    def count(self) -> int:
+        return sum(m.count for m in self.members)
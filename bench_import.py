@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+冷启动导入耗时基准
+- 每轮在新解释器中导入一次模块，扣除空解释器启动时间后取中位数
+- 同时列出导入后已加载的重型依赖，用于确认延迟导入仍然生效
+- 命令行：python3 bench_import.py [模块 ...] [--runs 10]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+DEFAULT_MODULES = ["generate_rss_news", "hotsearch", "renderers", "digest_server"]
+HEAVY_MODULES = ["feedparser", "argparse", "http.server", "cProfile", "tracemalloc", "digest_server"]
+
+
+def run_once(code: str) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True)
+    return time.perf_counter() - started
+
+
+def measure(module: str, runs: int) -> float:
+    """返回导入模块的额外耗时（毫秒，中位数）"""
+    baseline = statistics.median(run_once("pass") for _ in range(runs))
+    total = statistics.median(run_once(f"import {module}") for _ in range(runs))
+    return max(0.0, total - baseline) * 1000
+
+
+def loaded_heavy_modules(module: str) -> list[str]:
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules and m != {module!r}))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout.strip()
+    return [m for m in out.split(",") if m]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="测量模块冷启动导入耗时")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="要测量的模块")
+    parser.add_argument("--runs", type=int, default=10, help="每个模块的测量轮数")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        heavy = loaded_heavy_modules(module)
+        print(f"{module:<20} {measure(module, args.runs):>7.1f} ms  重型依赖: {', '.join(heavy) if heavy else '无'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+日报快照与本地 HTTP 服务
+- 生成脚本每次运行结束时调用 write_snapshots，预渲染 Markdown / HTML / 飞书卡片 / JSON Feed / RSS 及其 gzip 版本
+- manifest.json 最后原子写入，记录每个文件的强 ETag（sha256）
+- 服务端只在 manifest 变化时重新加载，请求阶段不做任何渲染或压缩
+- 命令行：python3 digest_server.py --dir /tmp/ai-news-snapshots --port 8080
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+MANIFEST_NAME = "manifest.json"
+
+CONTENT_TYPES = {
+    ".md": "text/markdown; charset=utf-8",
+    ".html": "text/html; charset=utf-8",
+    ".json": "application/json; charset=utf-8",
+    ".xml": "application/rss+xml; charset=utf-8",
+}
+
+
+def content_etag(data: bytes) -> str:
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+
+
+def write_file_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def content_type_for(name: str) -> str:
+    if name.endswith("feed.json"):
+        return "application/feed+json; charset=utf-8"
+    return CONTENT_TYPES.get(Path(name).suffix, "application/octet-stream")
+
+
+def write_snapshots(directory: str, files: dict[str, bytes]) -> Path:
+    """写入快照文件及其 gzip 版本，最后写 manifest，服务端看到新 manifest 时文件已全部就绪"""
+    root = Path(directory)
+    manifest = {}
+    for name, data in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        gz = gzip.compress(data, compresslevel=9, mtime=0)
+        write_file_atomic(path, data)
+        write_file_atomic(path.with_name(path.name + ".gz"), gz)
+        manifest[name] = {
+            "content_type": content_type_for(name),
+            "etag": content_etag(data),
+            "gzip_etag": content_etag(gz),
+            "size": len(data),
+            "gzip_size": len(gz),
+        }
+    root.mkdir(parents=True, exist_ok=True)
+    write_file_atomic(root / MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+    return root / MANIFEST_NAME
+
+
+@dataclass
+class Snapshot:
+    content_type: str
+    body: bytes
+    etag: str
+    gzip_body: bytes
+    gzip_etag: str
+
+
+class SnapshotStore:
+    """内存中的快照集合，manifest 的 mtime 变化时整体替换"""
+
+    def __init__(self, directory: str):
+        self.root = Path(directory)
+        self.files: dict[str, Snapshot] = {}
+        self._mtime: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        manifest_path = self.root / MANIFEST_NAME
+        try:
+            mtime = manifest_path.stat().st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            try:
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+                files = {}
+                for name, meta in manifest.items():
+                    path = self.root / name
+                    body = path.read_bytes()
+                    gzip_body = path.with_name(path.name + ".gz").read_bytes()
+                    # 文件先于 manifest 写入，ETag 按实际读到的内容计算，避免新内容配旧 ETag
+                    files[name] = Snapshot(
+                        content_type=meta["content_type"],
+                        body=body,
+                        etag=content_etag(body),
+                        gzip_body=gzip_body,
+                        gzip_etag=content_etag(gzip_body),
+                    )
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ 快照加载失败: {e}")
+                return
+            self.files = files
+            self._mtime = mtime
+
+    def get(self, name: str) -> Optional[Snapshot]:
+        self.refresh()
+        return self.files.get(name)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def accepts_gzip(header: str) -> bool:
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() != "gzip":
+            continue
+        params = params.replace(" ", "")
+        return params not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class DigestHandler(BaseHTTPRequestHandler):
+    server_version = "DigestServer/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self, send_body: bool) -> None:
+        name = urlparse(self.path).path.lstrip("/")
+        if not name or name.endswith("/"):
+            name = f"{name}digest.md"
+        snapshot = self.server.store.get(name)
+        if snapshot is None:
+            self.send_error(404)
+            return
+
+        use_gzip = accepts_gzip(self.headers.get("Accept-Encoding", ""))
+        body = snapshot.gzip_body if use_gzip else snapshot.body
+        etag = snapshot.gzip_etag if use_gzip else snapshot.etag
+
+        if etag_matches(self.headers.get("If-None-Match", ""), etag):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Vary", "Accept-Encoding")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", snapshot.content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(directory: str, host: str = "127.0.0.1", port: int = 8080, verbose: bool = False) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), DigestHandler)
+    server.store = SnapshotStore(directory)
+    server.store.refresh()
+    server.verbose = verbose
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="以 HTTP 提供最新日报快照（Markdown / HTML / JSON Feed / RSS）")
+    parser.add_argument("--dir", default=os.environ.get("DIGEST_SNAPSHOT_DIR", "/tmp/ai-news-snapshots"), help="快照目录")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8080, help="监听端口")
+    parser.add_argument("--verbose", action="store_true", help="输出访问日志")
+    args = parser.parse_args()
+
+    server = make_server(args.dir, args.host, args.port, args.verbose)
+    print(f"🌐 日报服务已启动: http://{args.host}:{server.server_address[1]}/ （快照目录 {args.dir}）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+飞书推送模块
+- Webhook 直连：持久连接、失败重试（指数退避）、超长消息自动分片
+- openclaw CLI：仅在未配置 Webhook 时作为备选
+- 发件箱：消息先写入持久化发件箱（outbox.py）再投递，失败后用 --drain 重新投递即可，无需重新生成
+  FEISHU_DELIVERY_TARGETS（或 --to）可同时投递到多个目标：webhook、openclaw、file:<目录>
+- 命令行：python3 feishu.py --file /tmp/daily-ai-news.md
+  发送消息卡片：python3 feishu.py --card /tmp/ai-news-snapshots/card.json
+  重新投递发件箱：python3 feishu.py --drain
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import http.client
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+import outbox
+
+# 自定义机器人请求体上限为 20KB，预留 JSON 转义与分片标记的余量
+MAX_MESSAGE_BYTES = 18 * 1024
+
+# 飞书限流错误码，需要退避重试
+RATE_LIMIT_CODES = {11232}
+
+OUTBOX_DIR = os.environ.get("FEISHU_OUTBOX_DIR", outbox.OUTBOX_DIR)
+
+
+def split_message(text: str, max_bytes: int = MAX_MESSAGE_BYTES) -> list[str]:
+    """按行切分超长消息，单行超长时按字符硬切"""
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+
+    def flush() -> None:
+        nonlocal current, size
+        if current:
+            chunks.append("\n".join(current))
+        current, size = [], 0
+
+    for line in text.split("\n"):
+        line_bytes = len(line.encode("utf-8")) + 1
+        if line_bytes > max_bytes:
+            flush()
+            piece = ""
+            for char in line:
+                if len((piece + char).encode("utf-8")) > max_bytes:
+                    chunks.append(piece)
+                    piece = ""
+                piece += char
+            current, size = [piece], len(piece.encode("utf-8")) + 1
+            continue
+        if size + line_bytes > max_bytes:
+            flush()
+        current.append(line)
+        size += line_bytes
+
+    flush()
+    return chunks or [""]
+
+
+def text_payloads(text: str, max_bytes: int = MAX_MESSAGE_BYTES) -> list[dict]:
+    """超长文本分片后的请求体，多片时加 (i/n) 标记"""
+    chunks = split_message(text, max_bytes)
+    total = len(chunks)
+    return [
+        {"msg_type": "text", "content": {"text": f"({i}/{total})\n{chunk}" if total > 1 else chunk}}
+        for i, chunk in enumerate(chunks, 1)
+    ]
+
+
+class FeishuWebhookSender:
+    """飞书自定义机器人 Webhook 客户端，复用同一条 HTTP 连接发送多条消息"""
+
+    def __init__(
+        self,
+        webhook: str,
+        *,
+        secret: str = "",
+        timeout: float = 10,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_bytes: int = MAX_MESSAGE_BYTES,
+    ):
+        self.url = urlparse(webhook)
+        self.path = self.url.path + (f"?{self.url.query}" if self.url.query else "")
+        self.secret = secret
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_bytes = max_bytes
+        self.last_error = ""
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            if self.url.scheme == "https":
+                self._conn = http.client.HTTPSConnection(self.url.netloc, timeout=self.timeout)
+            else:
+                self._conn = http.client.HTTPConnection(self.url.netloc, timeout=self.timeout)
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "FeishuWebhookSender":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _sign(self, payload: dict) -> dict:
+        if not self.secret:
+            return payload
+        timestamp = str(int(time.time()))
+        string_to_sign = f"{timestamp}\n{self.secret}".encode("utf-8")
+        sign = base64.b64encode(hmac.new(string_to_sign, digestmod=hashlib.sha256).digest()).decode("utf-8")
+        return {"timestamp": timestamp, "sign": sign, **payload}
+
+    def _post(self, body: bytes) -> tuple[int, bytes]:
+        conn = self._connection()
+        conn.request("POST", self.path, body=body, headers={
+            "Content-Type": "application/json; charset=utf-8",
+            "Connection": "keep-alive",
+        })
+        resp = conn.getresponse()
+        data = resp.read()
+        if resp.will_close:
+            self.close()
+        return resp.status, data
+
+    def send_payload(self, payload: dict) -> bool:
+        body = json.dumps(self._sign(payload), ensure_ascii=False).encode("utf-8")
+        for attempt in range(self.retries + 1):
+            retryable = True
+            try:
+                status, data = self._post(body)
+            except (OSError, http.client.HTTPException) as e:
+                self.close()
+                self.last_error = f"连接失败: {e}"
+            else:
+                if status == 200:
+                    try:
+                        result = json.loads(data.decode("utf-8") or "{}")
+                    except ValueError:
+                        result = {}
+                    code = result.get("code", result.get("StatusCode", 0))
+                    if code == 0:
+                        self.last_error = ""
+                        return True
+                    self.last_error = f"飞书错误 {code}: {result.get('msg', result.get('StatusMessage', ''))}"
+                    retryable = code in RATE_LIMIT_CODES
+                else:
+                    self.last_error = f"HTTP {status}"
+                    retryable = status == 429 or status >= 500
+
+            if not retryable or attempt >= self.retries:
+                break
+            time.sleep(self.backoff * (2 ** attempt))
+        return False
+
+    def payloads(self, kind: str, body: Any) -> list[dict]:
+        if kind == "card":
+            return [{"msg_type": "interactive", "card": body}]
+        return text_payloads(body, self.max_bytes)
+
+    def send_text(self, text: str) -> bool:
+        return all(self.send_payload(payload) for payload in self.payloads("text", text))
+
+    def send_card(self, card: dict) -> bool:
+        return self.send_payload(self.payloads("card", card)[0])
+
+
+def send_via_openclaw(message: str, target: str, timeout: float = 30) -> tuple[bool, str]:
+    openclaw = os.environ.get("OPENCLAW_BIN") or shutil.which("openclaw")
+    if not openclaw:
+        return False, "openclaw CLI 未安装，请使用 FEISHU_WEBHOOK 方式"
+    cmd = [openclaw, "message", "send", "--channel", "feishu", "--target", target, "--message", message]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.SubprocessError) as e:
+        return False, str(e)
+    return result.returncode == 0, result.stderr.strip()
+
+
+def resolve_targets(kind: str, webhook: str = "", target: str = "", spec: str = "") -> list[str]:
+    """解析投递目标：spec（逗号分隔）为空时，优先 Webhook，否则 openclaw；消息卡片不走 openclaw"""
+    webhook = webhook or os.environ.get("FEISHU_WEBHOOK", "")
+    target = target or os.environ.get("FEISHU_TARGET_ID", "")
+    spec = spec or os.environ.get("FEISHU_DELIVERY_TARGETS", "")
+    names = [s.strip() for s in spec.split(",") if s.strip()]
+    if not names:
+        names = ["webhook"] if webhook else ["openclaw"] if target and kind == "text" else []
+
+    targets = []
+    for name in names:
+        if name == "webhook" and not webhook:
+            print("⚠️ 投递目标 webhook 需要配置 FEISHU_WEBHOOK，已忽略")
+        elif name == "openclaw":
+            if kind == "card":
+                print("⚠️ openclaw 不支持消息卡片，已忽略")
+            elif not target:
+                print("⚠️ 投递目标 openclaw 需要配置 FEISHU_TARGET_ID，已忽略")
+            else:
+                targets.append(f"openclaw:{target}")
+        elif name == "webhook" or name.startswith("file:"):
+            targets.append(name)
+        else:
+            print(f"⚠️ 未知的投递目标: {name}")
+    return targets
+
+
+class Deliverer:
+    """发件箱的投递函数：按目标类型发送，Webhook 在一次投递中复用同一条连接"""
+
+    def __init__(self, webhook: str = "", secret: str = ""):
+        self.webhook = webhook or os.environ.get("FEISHU_WEBHOOK", "")
+        self.secret = secret or os.environ.get("FEISHU_SECRET", "")
+        self._sender: Optional[FeishuWebhookSender] = None
+
+    def __enter__(self) -> "Deliverer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._sender is not None:
+            self._sender.close()
+
+    def __call__(self, target: str, message: outbox.Message, delivery: outbox.Delivery) -> str:
+        if target == "webhook":
+            return self._webhook(message, delivery)
+        if target.startswith("openclaw:"):
+            ok, error = send_via_openclaw(message.body, target.split(":", 1)[1])
+            return "" if ok else (error or "openclaw 发送失败")
+        if target.startswith("file:"):
+            return self._file(target.split(":", 1)[1], message)
+        return f"未知的投递目标: {target}"
+
+    def _webhook(self, message: outbox.Message, delivery: outbox.Delivery) -> str:
+        if not self.webhook:
+            return "未配置 FEISHU_WEBHOOK"
+        if self._sender is None:
+            self._sender = FeishuWebhookSender(self.webhook, secret=self.secret)
+        payloads = self._sender.payloads(message.kind, message.body)
+        # 从上次中断的分片继续，已送达的分片不重复发送
+        for payload in payloads[delivery.progress:]:
+            if not self._sender.send_payload(payload):
+                return self._sender.last_error
+            delivery.progress += 1
+        return ""
+
+    @staticmethod
+    def _file(directory: str, message: outbox.Message) -> str:
+        suffix = ".json" if message.kind == "card" else ".md"
+        path = Path(directory) / f"{message.key}{suffix}"
+        data = json.dumps(message.body, ensure_ascii=False, indent=2) if message.kind == "card" else message.body
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            return str(e)
+        return ""
+
+
+def drain(webhook: str = "", outbox_dir: str = "", force: bool = False) -> list[outbox.Message]:
+    """投递发件箱中所有到期的消息（force 时忽略退避时间），打印失败的目标与剩余待发送数"""
+    box = outbox.Outbox(outbox_dir or OUTBOX_DIR)
+    with Deliverer(webhook) as deliverer:
+        messages = box.drain(deliverer, force=force)
+    for message in messages:
+        for target, delivery in message.targets.items():
+            if delivery.status == outbox.FAILED:
+                print(f"❌ 发送到飞书失败 [{target}]: {delivery.error}，已放弃")
+            elif delivery.status == outbox.PENDING and delivery.error:
+                retry_at = time.strftime("%H:%M:%S", time.localtime(delivery.due))
+                print(f"❌ 发送到飞书失败 [{target}]: {delivery.error}，将于 {retry_at} 后重试")
+    remaining = sum(not m.done for m in messages)
+    if remaining:
+        print(f"📮 发件箱中还有 {remaining} 条待发送，稍后运行 python3 feishu.py --drain 重试（加 --force 立即重试）")
+    return messages
+
+
+def deliver(
+    kind: str,
+    body: Any,
+    targets: list[str],
+    *,
+    webhook: str = "",
+    key: str = "",
+    group: str = "",
+    outbox_dir: str = "",
+) -> bool:
+    """写入发件箱并立即投递；返回这条消息是否已送达本次指定的全部目标"""
+    if not targets:
+        return False
+
+    def delivered(message: Optional[outbox.Message]) -> bool:
+        return message is not None and all(message.targets[t].status == outbox.SENT for t in targets)
+
+    box = outbox.Outbox(outbox_dir or OUTBOX_DIR)
+    message = box.enqueue(kind, body, targets, key=key, group=group)
+    if delivered(message):
+        print("📮 相同消息已发送过，跳过")
+        return True
+    drain(webhook, outbox_dir)
+    return delivered(box.get(message.key))
+
+
+def send_message(message: str, webhook: str = "", target: str = "", *, group: str = "", to: str = "") -> bool:
+    """发送消息到飞书：优先 Webhook 直连，否则回退到 openclaw CLI；经发件箱投递，失败可重新投递"""
+    targets = resolve_targets("text", webhook, target, to)
+    if not targets:
+        print("⚠️ 未配置飞书推送，请设置 FEISHU_WEBHOOK 或 FEISHU_TARGET_ID 环境变量")
+        return False
+    return deliver("text", message, targets, webhook=webhook, group=group)
+
+
+def send_card(card: dict, webhook: str = "", *, to: str = "") -> bool:
+    """发送消息卡片，支持 Webhook 与文件目标"""
+    targets = resolve_targets("card", webhook, spec=to)
+    if not targets:
+        print("⚠️ 消息卡片需要配置 FEISHU_WEBHOOK")
+        return False
+    return deliver("card", card, targets, webhook=webhook)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="发送消息到飞书群")
+    parser.add_argument("--file", help="要发送的文件，默认读取标准输入")
+    parser.add_argument("--card", help="以消息卡片发送的 JSON 文件（generate-rss-news.py 快照中的 card.json）")
+    parser.add_argument("--webhook", default="", help="飞书机器人 Webhook 地址（默认读取 FEISHU_WEBHOOK）")
+    parser.add_argument("--target", default="", help="飞书群 ID，openclaw 方式使用（默认读取 FEISHU_TARGET_ID）")
+    parser.add_argument("--to", default="", help="投递目标，逗号分隔：webhook,openclaw,file:<目录>（默认读取 FEISHU_DELIVERY_TARGETS）")
+    parser.add_argument("--drain", action="store_true", help="只重新投递发件箱中待发送的消息")
+    parser.add_argument("--force", action="store_true", help="与 --drain 一起使用：忽略退避时间，立即重试")
+    args = parser.parse_args()
+
+    if args.drain:
+        messages = drain(args.webhook, force=args.force)
+        print(f"📮 发件箱: 处理 {len(messages)} 条，已送达 {sum(m.delivered for m in messages)} 条")
+        if any(d.status in (outbox.PENDING, outbox.FAILED) for m in messages for d in m.targets.values()):
+            sys.exit(1)
+        return
+
+    if args.card:
+        with open(args.card, "r", encoding="utf-8") as f:
+            ok = send_card(json.load(f), args.webhook, to=args.to)
+        if ok:
+            print("✅ 已成功发送到飞书群")
+        else:
+            sys.exit(1)
+        return
+
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            message = f.read()
+    else:
+        message = sys.stdin.read()
+
+    if send_message(message, args.webhook, args.target, to=args.to):
+        print("✅ 已成功发送到飞书群")
+    else:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2130 @@
+#!/usr/bin/env python3
+"""
+AI Daily News Generator - Production Version
+Designed for: AI工具爱好者
+"""
+
+import functools
+import hashlib
+import heapq
+import json
+import logging
+import os
+import re
+import ssl
+import sys
+import threading
+import time
+import urllib.parse as urlparse_lib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from html import unescape
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+import urllib.request
+import urllib.error
+
+import archive
+import httprecord
+import netroute
+import profiling
+import renderers
+import retryqueue
+from translation_memory import TranslationMemory
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，退化为不加锁
+    fcntl = None
+
+TRANSLATE_ENABLED = True
+TITLE_MIN_LENGTH = 15
+TITLE_MAX_LENGTH = 80
+TRANSLATE_WORKERS = 4
+TRANSLATE_LOOKAHEAD = TRANSLATE_WORKERS * 4
+
+RSS_SOURCES: dict[str, str] = {
+    "OpenAI": "https://openai.com/blog/rss.xml",
+    "Anthropic": "https://www.anthropic.com/news",
+    "Google DeepMind": "https://deepmind.google/blog/rss.xml",
+    
+    "GitHub Blog": "https://github.blog/feed/",
+    "Hugging Face": "https://huggingface.co/blog/feed.xml",
+    
+    "arXiv AI": "http://export.arxiv.org/api/query?search_query=cat:cs.AI&sortBy=submittedDate&sortOrder=descending&max_results=15",
+    "arXiv ML": "http://export.arxiv.org/api/query?search_query=cat:cs.LG&sortBy=submittedDate&sortOrder=descending&max_results=10",
+    "arXiv CV": "http://export.arxiv.org/api/query?search_query=cat:cs.CV&sortBy=submittedDate&sortOrder=descending&max_results=10",
+    "arXiv CL": "http://export.arxiv.org/api/query?search_query=cat:cs.CL&sortBy=submittedDate&sortOrder=descending&max_results=10",
+    
+    "TechCrunch AI": "https://techcrunch.com/category/artificial-intelligence/feed/",
+    "机器之心": "https://www.jiqizhixin.com/rss",
+    
+    "Hacker News": "https://news.ycombinator.com/rss",
+    
+    "36氪": "https://36kr.com/feed",
+    "虎嗅": "https://www.huxiu.com/rss/0.xml",
+    "IT之家": "https://www.ithome.com/rss/",
+    "少数派": "https://sspai.com/feed",
+    "爱范儿": "https://www.ifanr.com/feed",
+}
+
+INCLUDE_KEYWORDS: list[str] = [
+    "AI", "LLM", "大模型", "多模态", "multimodal", "智能体", "agent",
+    "machine learning", "deep learning", "transformer", "attention", "diffusion",
+    "端侧", "on-device", "edge AI", "programming", "copilot", "assistant",
+    "RAG", "retrieval", "embedding", "向量数据库", "fine-tuning", "prompt engineering",
+    "vision", "speech", "VLM", "VLA", "ASR", "TTS", "reinforcement learning",
+    "Claude", "GPT", "Gemini", "Llama", "Qwen", "通义", "幻觉", "alignment",
+    "autonomous", "robotics"
+]
+
+EXCLUDE_KEYWORDS: list[str] = [
+    "融资", "IPO", "投资", "收购", "merger",
+    "招聘", "求职", "面试",
+    "峰会", "会议", "活动", "Meetup",
+    "Super Bowl", "NFL", "体育",
+    "娱乐", "八卦", "明星", "politics", "政治", "crypto", "加密货币",
+    "gaming", "游戏", "celebrity"
+]
+
+HOT_KEYWORDS: list[str] = [
+    'Claude', 'GPT-5', 'GPT-4.5', 'OpenAI', 'Anthropic', 'Gemini',
+    '发布', 'launch', 'release', 'announce',
+    '开源', 'open source', '突破', 'breakthrough', 'SOTA',
+    'vulnerability', '安全漏洞'
+]
+
+SOURCE_WEIGHTS: dict[str, float] = {
+    "OpenAI": 3.0,
+    "Anthropic": 3.0,
+    "Google DeepMind": 2.5,
+    "Hugging Face": 2.0,
+    "GitHub Blog": 1.6,
+    "arXiv AI": 1.4,
+    "arXiv ML": 1.4,
+    "arXiv CV": 1.4,
+    "arXiv CL": 1.4,
+    "TechCrunch AI": 1.2,
+    "机器之心": 1.2,
+    "Hacker News": 1.0,
+    "36氪": 1.0,
+    "虎嗅": 1.0,
+    "IT之家": 0.8,
+    "少数派": 0.8,
+    "爱范儿": 0.8,
+}
+
+# 内容指纹计算前剔除的易变区域（正则），键为源名称，"*" 对所有源生效
+VOLATILE_PATTERNS: dict[str, list[str]] = {
+    "*": [r"<lastBuildDate>.*?</lastBuildDate>"],
+    "Anthropic": [r"<script\b[^>]*>.*?</script>", r'\snonce="[^"]*"'],
+}
+
+DEFAULT_DATE_REGEX = r"(\w+\s+\d+,\s+\d{4})"
+
+# 无 RSS 的列表页抓取规则，键为 sources 中的源名称
+HTML_SOURCES: dict[str, dict[str, Any]] = {
+    "Anthropic": {
+        "link_pattern": r"^/news/[a-z0-9-]+$",
+        "title": "slug",
+        "date_regex": DEFAULT_DATE_REGEX,
+        "max_items": 10,
+        "enrich": "always",
+        "enrich_limit": 10,
+    },
+}
+HTML_MAX_ITEMS = 30
+HTML_CHUNK_SIZE = 16 * 1024
+
+MAX_ITEMS = 10
+CACHE_EXPIRE_HOURS = 48
+
+# HTTP 新鲜度（秒）：按服务端 Cache-Control / Expires 跳过请求，上限防止误配置的超长 max-age 让条目长期不更新
+FRESHNESS_MIN = 0
+FRESHNESS_MAX = 6 * 3600
+
+ARXIV_API = "http://export.arxiv.org/api/query"
+ARXIV_MAX_PAGES = 5
+ARXIV_PAGE_DELAY = 3.0
+ARXIV_STATS_KEY = "arXiv"
+ARXIV_DEFAULT_RESULTS = 10
+
+# 按源统计的耗时（秒）与响应大小（字节）直方图分桶，最后一个桶为溢出桶
+LATENCY_BUCKETS = [0.05, 0.1, 0.2, 0.35, 0.5, 0.75, 1, 1.5, 2, 3, 5, 7.5, 10, 15, 20, 30, 45, 60]
+SIZE_BUCKETS = [1024, 4096, 16384, 65536, 262144, 1048576, 4194304]
+LATENCY_DECAY = 0.9
+LATENCY_MIN_SAMPLES = 5
+TIMEOUT_MARGIN = 2.0
+TIMEOUT_MIN = 3.0
+
+
+def is_chinese(text: str) -> bool:
+    chinese_chars = sum(1 for c in text if '\u4e00' <= c <= '\u9fff')
+    return chinese_chars > len(text) * 0.3
+
+
+def open_url(req: urllib.request.Request, *, timeout: float, ctx: Optional[ssl.SSLContext], proxy: str = ""):
+    """所有出站请求的统一入口：配置了代理时由 netroute 按主机选择直连或代理，连接失败自动换路；
+    开启 --record / --replay 时经 httprecord 录制或回放"""
+    def live():
+        if proxy:
+            return netroute.get_router(proxy).open(req, timeout=timeout, context=ctx)
+        return urllib.request.urlopen(req, timeout=timeout, context=ctx)
+
+    return httprecord.urlopen(req, live)
+
+
+def translate_text(text: str, proxy: str = "", timeout: int = 10) -> str:
+    if not text or not TRANSLATE_ENABLED:
+        return text
+    
+    if is_chinese(text):
+        return text
+    
+    try:
+        url = "https://translate.googleapis.com/translate_a/single"
+        params = {
+            "client": "gtx",
+            "sl": "auto",
+            "tl": "zh-CN",
+            "dt": "t",
+            "q": text
+        }
+        full_url = f"{url}?{urlencode(params)}"
+        
+        ctx = ssl.create_default_context()
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+        
+        req = urllib.request.Request(full_url, headers={"User-Agent": "Mozilla/5.0"})
+        with open_url(req, timeout=timeout, ctx=ctx, proxy=proxy) as r:
+            result = json.loads(r.read().decode("utf-8"))
+        
+        if result and result[0]:
+            translated = "".join(part[0] for part in result[0] if part[0])
+            return translated
+    except Exception as e:
+        logging.debug("翻译失败: %s", e)
+    
+    return text
+
+
+class TranslationStage:
+    """流式翻译：抓取期间提前提交候选文本，去重后再取结果，同一文本只翻译一次"""
+
+    def __init__(
+        self,
+        proxy: str = "",
+        timeout: int = 10,
+        workers: int = TRANSLATE_WORKERS,
+        memory: Optional[TranslationMemory] = None,
+    ):
+        self.proxy = proxy
+        self.timeout = timeout
+        self.memory = memory
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="translate")
+        self._pending: dict[str, Future] = {}
+
+    def submit(self, text: str) -> None:
+        if text and text not in self._pending and not is_chinese(text):
+            self._pending[text] = self._executor.submit(self._translate, text)
+
+    def _translate(self, text: str) -> str:
+        if self.memory is None or not TRANSLATE_ENABLED:
+            return translate_text(text, self.proxy, self.timeout)
+        return self.memory.translate(text, lambda s: translate_text(s, self.proxy, self.timeout))
+
+    def translate(self, text: str) -> str:
+        if not text or is_chinese(text):
+            return text
+        self.submit(text)
+        try:
+            return self._pending[text].result()
+        except Exception as e:
+            logging.debug("翻译失败: %s", e)
+            return text
+
+    @property
+    def submitted(self) -> int:
+        return len(self._pending)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "TranslationStage":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def enhance_title(title: str, description: str = "", source: str = "") -> str:
+    if len(title) >= TITLE_MIN_LENGTH and len(title) <= TITLE_MAX_LENGTH:
+        return title
+    
+    if len(title) < TITLE_MIN_LENGTH:
+        context_hints = {
+            "Claude": "发布",
+            "GPT": "发布",
+            "Gemini": "发布",
+            "Llama": "发布",
+            "Sonnet": "发布",
+            "Opus": "发布",
+            "Haiku": "发布",
+            "announces": "宣布",
+            "releases": "发布",
+            "launches": "推出",
+            "introduces": "推出",
+        }
+        
+        hint = ""
+        for keyword, action in context_hints.items():
+            if keyword.lower() in title.lower():
+                hint = action
+                break
+        
+        if hint:
+            return f"{title} {hint}"
+        
+        if description:
+            desc_clean = re.sub(r'<[^>]+>', '', description)
+            desc_clean = unescape(desc_clean).strip()
+            if len(desc_clean) > 20:
+                return f"{title}：{desc_clean[:TITLE_MAX_LENGTH - len(title) - 2]}"
+        
+        if source:
+            return f"{title}（{source}）"
+    
+    if len(title) > TITLE_MAX_LENGTH:
+        return title[:TITLE_MAX_LENGTH - 3] + "..."
+    
+    return title
+
+
+_UNPARSED: Any = object()
+
+
+def clean_description(html: str) -> str:
+    return re.sub(r"<[^>]+>", "", unescape(html))[:150]
+
+
+class NewsItem:
+    """单条资讯：用 __slots__ 省去每条的 __dict__，来源名称驻留后共享同一字符串
+
+    清理后的描述、解析后的 dt 和 casefold 后的标题/描述在首次访问时才计算并缓存，
+    修改 title / description / pubdate 时对应缓存失效；大部分条目在过滤时就被丢弃，不必付出这些开销
+    """
+
+    __slots__ = (
+        "_title", "link", "_pubdate", "_description", "_html_description", "source", "_dt",
+        "score", "original_title", "summary", "hot", "_folded_title", "_folded_description",
+    )
+
+    def __init__(
+        self,
+        title: str,
+        link: str,
+        pubdate: str = "",
+        description: str = "",
+        source: str = "",
+        dt: Optional[datetime] = None,
+        score: float = 0.0,
+        original_title: str = "",
+        summary: str = "",
+        hot: bool = False,
+        html_description: str = "",
+    ):
+        """html_description 为未清理的 HTML 描述，首次访问 description 时才去标签；dt 未给出时由 pubdate 解析"""
+        self.title = title
+        self.link = link
+        self.pubdate = pubdate
+        self._html_description = "" if description else html_description
+        self._description: Optional[str] = description if description or not html_description else None
+        self._folded_description: Optional[str] = None
+        self.source = sys.intern(source)
+        if dt is not None:
+            self._dt = dt
+        self.score = score
+        self.original_title = original_title
+        self.summary = summary
+        self.hot = hot
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @title.setter
+    def title(self, value: str) -> None:
+        self._title = value
+        self._folded_title: Optional[str] = None
+
+    @property
+    def pubdate(self) -> str:
+        return self._pubdate
+
+    @pubdate.setter
+    def pubdate(self, value: str) -> None:
+        self._pubdate = value
+        self._dt: Any = _UNPARSED
+
+    @property
+    def description(self) -> str:
+        if self._description is None:
+            self._description = clean_description(self._html_description)
+            self._html_description = ""
+        return self._description
+
+    @description.setter
+    def description(self, value: str) -> None:
+        self._description = value
+        self._html_description = ""
+        self._folded_description = None
+
+    @property
+    def dt(self) -> Optional[datetime]:
+        if self._dt is _UNPARSED:
+            self._dt = parse_date(self._pubdate)
+        return self._dt
+
+    @dt.setter
+    def dt(self, value: Optional[datetime]) -> None:
+        self._dt = value
+
+    @property
+    def folded_title(self) -> str:
+        if self._folded_title is None:
+            self._folded_title = self._title.casefold()
+        return self._folded_title
+
+    @property
+    def folded_description(self) -> str:
+        if self._folded_description is None:
+            self._folded_description = self.description.casefold()
+        return self._folded_description
+
+    def copy(self) -> "NewsItem":
+        """浅复制，已计算的缓存一并带上"""
+        other = NewsItem.__new__(NewsItem)
+        for name in NewsItem.__slots__:
+            setattr(other, name, getattr(self, name))
+        return other
+
+    def _fields(self) -> tuple[Any, ...]:
+        return (
+            self.title, self.link, self.pubdate, self.description, self.source, self.dt,
+            self.score, self.original_title, self.summary, self.hot,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, NewsItem):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"NewsItem(title={self.title!r}, link={self.link!r}, source={self.source!r}, dt={self.dt!r})"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "title": self.title,
+            "link": self.link,
+            "pubdate": self.pubdate,
+            "description": self.description,
+            "source": self.source,
+            "_dt": self.dt,
+            "_score": self.score,
+            "original_title": self.original_title,
+            "_summary": self.summary,
+            "_hot": self.hot,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "NewsItem":
+        return cls(
+            title=data.get("title", ""),
+            link=data.get("link", ""),
+            pubdate=data.get("pubdate", ""),
+            description=data.get("description", ""),
+            source=data.get("source", ""),
+            dt=data.get("_dt"),
+            score=data.get("_score", 0.0),
+            original_title=data.get("original_title", ""),
+            summary=data.get("_summary", ""),
+            hot=data.get("_hot", False),
+        )
+
+
+def freshness_lifetime(headers: Any) -> float:
+    """按 RFC 9111 计算响应的新鲜寿命（秒）：max-age 优先，其次 Expires - Date；no-store / no-cache 为 0"""
+    directives = {}
+    for part in (headers.get("Cache-Control") or "").split(","):
+        key, _, value = part.strip().partition("=")
+        if key:
+            directives[key.lower()] = value.strip().strip('"')
+    if "no-store" in directives or "no-cache" in directives:
+        return 0.0
+    if "max-age" in directives:
+        try:
+            return max(0.0, float(directives["max-age"]))
+        except ValueError:
+            return 0.0
+
+    expires = headers.get("Expires")
+    if not expires:
+        return 0.0
+    try:
+        expires_at = parsedate_to_datetime(expires)
+        date = headers.get("Date")
+        date_at = parsedate_to_datetime(date) if date else datetime.now(timezone.utc)
+    except (TypeError, ValueError):
+        return 0.0  # 非法的 Expires（如 "0"、"-1"）视为已过期
+    if expires_at.tzinfo is None or date_at.tzinfo is None:
+        return 0.0
+    return max(0.0, (expires_at - date_at).total_seconds())
+
+
+@dataclass
+class CacheEntry:
+    etag: str = ""
+    last_modified: str = ""
+    timestamp: float = 0.0
+    cursor: str = ""
+    content_hash: str = ""
+    items: list[dict[str, Any]] = field(default_factory=list)
+    freshness: float = 0.0
+    age: float = 0.0
+
+    def is_expired(self, expire_hours: float = CACHE_EXPIRE_HOURS) -> bool:
+        if self.timestamp == 0:
+            return False
+        age_hours = (time.time() - self.timestamp) / 3600
+        return age_hours > expire_hours
+
+    def is_fresh(self, now: float, min_fresh: float = FRESHNESS_MIN, max_fresh: float = FRESHNESS_MAX) -> bool:
+        """响应仍在新鲜期内（服务端给出的寿命按 [min_fresh, max_fresh] 截断）且有保存的条目时，可不发请求直接复用"""
+        if not self.timestamp or not self.items or now < self.timestamp:
+            # 缓存时间晚于当前时间说明时钟回拨，无法判断新鲜度，按过期处理
+            return False
+        lifetime = min(max(self.freshness, min_fresh), max_fresh)
+        return self.age + (now - self.timestamp) < lifetime
+
+    def update_freshness(self, headers: Any) -> None:
+        self.freshness = freshness_lifetime(headers)
+        try:
+            self.age = max(0.0, float(headers.get("Age") or 0))
+        except ValueError:
+            self.age = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "timestamp": self.timestamp,
+            "cursor": self.cursor,
+            "content_hash": self.content_hash,
+            "items": self.items,
+            "freshness": self.freshness,
+            "age": self.age,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "CacheEntry":
+        return cls(
+            etag=data.get("etag", ""),
+            last_modified=data.get("last_modified", ""),
+            timestamp=data.get("timestamp", 0.0),
+            cursor=data.get("cursor", ""),
+            content_hash=data.get("content_hash", ""),
+            items=data.get("items", []),
+            freshness=data.get("freshness", 0.0),
+            age=data.get("age", 0.0),
+        )
+
+    def stored_items(self) -> list[NewsItem]:
+        return [NewsItem.from_dict(d) for d in self.items if isinstance(d, dict)]
+
+    def store_items(self, items: list[NewsItem]) -> None:
+        self.items = [{k: v for k, v in it.to_dict().items() if not k.startswith("_")} for it in items]
+
+
+@dataclass
+class Config:
+    hours: int = 24
+    fallback_hours: int = 48
+    max_items: int = MAX_ITEMS
+    timeout: int = 25
+    sources: dict[str, str] = field(default_factory=lambda: RSS_SOURCES)
+    include_keywords: list[str] = field(default_factory=lambda: INCLUDE_KEYWORDS)
+    exclude_keywords: list[str] = field(default_factory=lambda: EXCLUDE_KEYWORDS)
+    hot_keywords: list[str] = field(default_factory=lambda: HOT_KEYWORDS)
+    source_weights: dict[str, float] = field(default_factory=lambda: SOURCE_WEIGHTS)
+    cache_path: str = "/tmp/rss-cache.json"
+    proxy: str = ""
+    volatile_patterns: dict[str, list[str]] = field(default_factory=lambda: VOLATILE_PATTERNS)
+    html_sources: dict[str, dict[str, Any]] = field(default_factory=lambda: HTML_SOURCES)
+    output: str = ""
+    translation_memory_path: str = "/tmp/translation-memory.json"
+    glossary: dict[str, str] = field(default_factory=dict)
+    protected_terms: list[str] = field(default_factory=list)
+    latency_stats_path: str = "/tmp/rss-latency.json"
+    freshness: dict[str, dict[str, float]] = field(default_factory=dict)
+    archive_dir: str = "/tmp/rss-archive"
+    archive_days: int = archive.ARCHIVE_DAYS
+    name: str = ""
+
+    @classmethod
+    def from_file(cls, path: str) -> "Config":
+        name = Path(path).stem
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(
+                hours=int(data.get("hours", 24)),
+                fallback_hours=int(data.get("fallback_hours", 48)),
+                max_items=int(data.get("max_items", MAX_ITEMS)),
+                timeout=int(data.get("timeout", 25)),
+                sources=data.get("sources", RSS_SOURCES),
+                include_keywords=data.get("include_keywords", INCLUDE_KEYWORDS),
+                exclude_keywords=data.get("exclude_keywords", EXCLUDE_KEYWORDS),
+                hot_keywords=data.get("hot_keywords", HOT_KEYWORDS),
+                source_weights=data.get("source_weights", SOURCE_WEIGHTS),
+                cache_path=data.get("cache_path", "/tmp/rss-cache.json"),
+                proxy=data.get("proxy", ""),
+                volatile_patterns=data.get("volatile_patterns", VOLATILE_PATTERNS),
+                html_sources=data.get("html_sources", HTML_SOURCES),
+                output=data.get("output", ""),
+                translation_memory_path=data.get("translation_memory_path", "/tmp/translation-memory.json"),
+                glossary=data.get("glossary", {}),
+                protected_terms=data.get("protected_terms", []),
+                latency_stats_path=data.get("latency_stats_path", "/tmp/rss-latency.json"),
+                freshness=data.get("freshness", {}),
+                archive_dir=data.get("archive_dir", "/tmp/rss-archive"),
+                archive_days=int(data.get("archive_days", archive.ARCHIVE_DAYS)),
+                name=data.get("name", name),
+            )
+        except Exception as e:
+            logging.warning("配置文件读取失败: %s", e)
+            return cls(name=name)
+
+    def freshness_bounds(self, source: str) -> tuple[float, float]:
+        """该源的新鲜度上下限（秒），源名称下的配置覆盖 "*" 下的通用配置"""
+        bounds = {"min": FRESHNESS_MIN, "max": FRESHNESS_MAX, **self.freshness.get("*", {}), **self.freshness.get(source, {})}
+        return float(bounds["min"]), float(bounds["max"])
+
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+def fetch_attempt(
+    url: str,
+    *,
+    insecure_ssl: bool = False,
+    timeout: int = 25,
+    cache_entry: Optional[CacheEntry] = None,
+    proxy: str = "",
+    observe: Optional[Callable[[float, int, str], None]] = None,
+) -> tuple[tuple[str, CacheEntry, bool, str], Optional[float]]:
+    """单次请求，返回 (结果, 重试提示)，供 RetryScheduler 调度；结果同 fetch()
+
+    重试提示为 None 表示无需重试（成功、304 或 403/404 等不可重试的状态），否则为 Retry-After 要求的秒数
+    """
+    ctx: Optional[ssl.SSLContext] = None
+    if insecure_ssl:
+        ctx = ssl.create_default_context()
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+    elif url.lower().startswith("https://"):
+        ctx = ssl.create_default_context()
+
+    headers: dict[str, str] = {"User-Agent": "Mozilla/5.0"}
+    new_cache = CacheEntry(timestamp=time.time())
+
+    if cache_entry:
+        if cache_entry.etag:
+            headers["If-None-Match"] = cache_entry.etag
+        if cache_entry.last_modified:
+            headers["If-Modified-Since"] = cache_entry.last_modified
+
+    retry: Optional[float] = 0.0
+    started = time.monotonic()
+    try:
+        req = urllib.request.Request(url, headers=headers)
+        with open_url(req, timeout=timeout, ctx=ctx, proxy=proxy) as r:
+            raw = r.read()
+            new_cache.etag = r.headers.get("ETag") or ""
+            new_cache.last_modified = r.headers.get("Last-Modified") or ""
+            new_cache.update_freshness(r.headers)
+        if observe:
+            observe(time.monotonic() - started, len(raw), "")
+        return (raw.decode("utf-8", errors="replace"), new_cache, False, ""), None
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            if observe:
+                observe(time.monotonic() - started, 0, "")
+            revalidated = CacheEntry(timestamp=time.time())
+            revalidated.update_freshness(e.headers)
+            return ("", revalidated, True, ""), None
+        last_error = f"HTTP {e.code}"
+        retry = retryqueue.retry_after_seconds(e.headers.get("Retry-After")) if e.code in RETRYABLE_STATUS else None
+        logging.debug("Fetch failed: %s (%s)", url, e)
+    except urllib.error.URLError as e:
+        if "timed out" in str(e).lower():
+            last_error = "超时"
+        elif "connection refused" in str(e).lower():
+            last_error = "连接被拒绝"
+        elif "name or service not known" in str(e).lower():
+            last_error = "DNS解析失败"
+        else:
+            last_error = str(e.reason) if hasattr(e, 'reason') else str(e)[:30]
+        logging.debug("Fetch failed: %s (%s)", url, e)
+    except ssl.SSLError as e:
+        last_error = f"SSL错误: {str(e)[:30]}"
+        logging.debug("Fetch failed: %s (%s)", url, e)
+    except Exception as e:
+        last_error = str(e)[:40]
+        logging.debug("Fetch failed: %s (%s)", url, e)
+
+    if observe:
+        observe(time.monotonic() - started, 0, last_error)
+    return ("", CacheEntry(), False, last_error), retry
+
+
+def fetch(
+    url: str,
+    *,
+    insecure_ssl: bool = False,
+    timeout: int = 25,
+    retries: int = 2,
+    cache_entry: Optional[CacheEntry] = None,
+    proxy: str = "",
+    observe: Optional[Callable[[float, int, str], None]] = None,
+    scheduler: Optional[retryqueue.RetryScheduler] = None,
+) -> tuple[str, CacheEntry, bool, str]:
+    """请求并等待最终结果；observe 在每次尝试结束时回调 (耗时秒数, 响应字节数, 错误信息)
+
+    重试由 scheduler 排队，等待期间不占用线程池；未指定时为本次调用单独创建调度器
+    """
+    attempt = functools.partial(
+        fetch_attempt, url,
+        insecure_ssl=insecure_ssl, timeout=timeout, cache_entry=cache_entry, proxy=proxy, observe=observe,
+    )
+    if scheduler is None:
+        with retryqueue.RetryScheduler() as own:
+            return own.submit(attempt, urlparse(url).netloc, retries).result()
+    return scheduler.submit(attempt, urlparse(url).netloc, retries).result()
+
+
+_volatile_regex_cache: dict[str, re.Pattern] = {}
+
+
+def content_fingerprint(body: str, volatile_patterns: Optional[list[str]] = None) -> str:
+    """正文指纹：剔除易变区域并折叠空白后取 SHA-256"""
+    for pattern in volatile_patterns or []:
+        regex = _volatile_regex_cache.get(pattern)
+        if regex is None:
+            regex = _volatile_regex_cache[pattern] = re.compile(pattern, re.DOTALL | re.IGNORECASE)
+        body = regex.sub("", body)
+    normalized = " ".join(body.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def load_cache(path: str) -> dict[str, CacheEntry]:
+    try:
+        if not path:
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+            return {k: CacheEntry.from_dict(v) for k, v in data.items() if isinstance(v, dict)}
+    except Exception:
+        return {}
+
+
+@contextmanager
+def file_lock(path: str):
+    """跨进程独占锁（path.lock），没有 fcntl 的平台上退化为不加锁"""
+    with open(f"{path}.lock", "a", encoding="utf-8") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def save_cache(path: str, cache: dict[str, CacheEntry]) -> None:
+    """加锁后与磁盘上的最新内容合并再原子替换，同一条目以 timestamp 较新者为准"""
+    try:
+        if not path:
+            return
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(path):
+            merged = load_cache(path)
+            for k, v in cache.items():
+                current = merged.get(k)
+                if current is None or v.timestamp >= current.timestamp:
+                    merged[k] = v
+            write_json_atomic(path, {k: v.to_dict() for k, v in merged.items()})
+    except Exception as e:
+        logging.warning("缓存保存失败: %s", e)
+
+
+@dataclass
+class Histogram:
+    bounds: list[float]
+    counts: list[float] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        if len(self.counts) != len(self.bounds) + 1:
+            self.counts = [0.0] * (len(self.bounds) + 1)
+
+    @property
+    def total(self) -> float:
+        return sum(self.counts)
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += weight
+                return
+        self.counts[-1] += weight
+
+    def merge(self, other: "Histogram", decay: float = 1.0) -> None:
+        self.counts = [a * decay + b for a, b in zip(self.counts, other.counts)]
+
+    def percentile(self, p: float) -> float:
+        """桶内线性插值；落在溢出桶时返回最大边界的两倍"""
+        total = self.total
+        if total <= 0:
+            return 0.0
+        rank = total * p
+        seen = 0.0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(self.bounds):
+                    return self.bounds[-1] * 2
+                low = self.bounds[i - 1] if i else 0.0
+                return low + (self.bounds[i] - low) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1] * 2
+
+
+@dataclass
+class SourceMetrics:
+    latency: Histogram = field(default_factory=lambda: Histogram(LATENCY_BUCKETS))
+    size: Histogram = field(default_factory=lambda: Histogram(SIZE_BUCKETS))
+    failures: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"latency": self.latency.counts, "size": self.size.counts, "failures": self.failures}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SourceMetrics":
+        return cls(
+            latency=Histogram(LATENCY_BUCKETS, list(data.get("latency", []))),
+            size=Histogram(SIZE_BUCKETS, list(data.get("size", []))),
+            failures=float(data.get("failures", 0.0)),
+        )
+
+
+class LatencyStats:
+    """按源累积的耗时与大小直方图，跨次运行持久化，并据此给出自适应超时"""
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.history = self._load(path)
+        self.current: dict[str, SourceMetrics] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load(path: str) -> dict[str, SourceMetrics]:
+        if not path:
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {k: SourceMetrics.from_dict(v) for k, v in data.items() if isinstance(v, dict)}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logging.warning("耗时统计读取失败: %s", e)
+            return {}
+
+    def observe(self, name: str, seconds: float, size: int, error: str = "") -> None:
+        """超时按实际等待时长计入（删失样本），其他快速失败只计失败次数；304 等空响应不计大小"""
+        with self._lock:
+            metrics = self.current.setdefault(name, SourceMetrics())
+            if error:
+                metrics.failures += 1
+                if error == "超时":
+                    metrics.latency.add(seconds)
+                return
+            metrics.latency.add(seconds)
+            if size:
+                metrics.size.add(size)
+
+    def observer(self, name: str) -> Callable[[float, int, str], None]:
+        return lambda seconds, size, error: self.observe(name, seconds, size, error)
+
+    def combined(self, name: str) -> SourceMetrics:
+        merged = SourceMetrics()
+        for source in (self.history.get(name), self.current.get(name)):
+            if source:
+                merged.latency.merge(source.latency)
+                merged.size.merge(source.size)
+                merged.failures += source.failures
+        return merged
+
+    def timeout_for(self, name: str, cap: float) -> float:
+        """p99 × 安全系数，限制在 [TIMEOUT_MIN, cap]；样本不足时直接使用 cap"""
+        latency = self.combined(name).latency
+        if latency.total < LATENCY_MIN_SAMPLES:
+            return cap
+        return round(max(TIMEOUT_MIN, min(cap, latency.percentile(0.99) * TIMEOUT_MARGIN)), 1)
+
+    def summary(self, name: str) -> Optional[dict[str, float]]:
+        metrics = self.combined(name)
+        if metrics.latency.total <= 0:
+            return None
+        return {
+            "p50": metrics.latency.percentile(0.5),
+            "p95": metrics.latency.percentile(0.95),
+            "p99": metrics.latency.percentile(0.99),
+            "size_p50": metrics.size.percentile(0.5),
+        }
+
+    def save(self) -> None:
+        """与磁盘上的最新统计合并：旧样本按 LATENCY_DECAY 衰减后叠加本次观测"""
+        if not self.path or not self.current:
+            return
+        try:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            with file_lock(self.path):
+                merged = self._load(self.path)
+                for name, metrics in self.current.items():
+                    base = merged.setdefault(name, SourceMetrics())
+                    base.latency.merge(metrics.latency, LATENCY_DECAY)
+                    base.size.merge(metrics.size, LATENCY_DECAY)
+                    base.failures = base.failures * LATENCY_DECAY + metrics.failures
+                write_json_atomic(self.path, {k: v.to_dict() for k, v in merged.items()})
+        except Exception as e:
+            logging.warning("耗时统计保存失败: %s", e)
+
+
+def entry_to_item(entry: Any, source: str) -> Optional[NewsItem]:
+    title = entry.get("title", "").strip()
+    link = entry.get("link", "").strip()
+    if not title or not link:
+        return None
+
+    pubdate = ""
+    if hasattr(entry, "published"):
+        pubdate = entry.published
+    elif hasattr(entry, "updated"):
+        pubdate = entry.updated
+
+    html_description = entry.get("summary", "") or entry.get("description", "")
+    description = ""
+
+    if "arxiv" in source.lower():
+        title = f"[论文] {title}"
+        authors = entry.get("authors", [])
+        if authors:
+            author_names = [a.get("name", "") for a in authors[:2]]
+            description = f"作者: {', '.join(author_names)}"
+
+    return NewsItem(
+        title=unescape(title),
+        link=link,
+        pubdate=pubdate,
+        description=description,
+        source=source,
+        html_description=html_description,
+    )
+
+
+def parse_feed(xml: str, source: str) -> list[NewsItem]:
+    items: list[NewsItem] = []
+    if not xml:
+        return items
+
+    import feedparser  # 导入耗时约占冷启动的一半，只在真正解析 feed 时加载
+
+    try:
+        feed = feedparser.parse(xml)
+        for entry in feed.entries:
+            item = entry_to_item(entry, source)
+            if item:
+                items.append(item)
+    except Exception as e:
+        logging.warning("解析 feed 失败 [%s]: %s", source, e)
+
+    return items
+
+
+def arxiv_category(url: str) -> tuple[str, int]:
+    """识别单分类 arXiv 查询（search_query=cat:xx），返回 (分类, max_results)，否则返回 ("", 0)"""
+    u = urlparse(url)
+    if u.netloc != urlparse(ARXIV_API).netloc:
+        return "", 0
+    params = dict(parse_qsl(u.query))
+    m = re.fullmatch(r"cat:([\w.-]+)", params.get("search_query", "").strip())
+    if not m:
+        return "", 0
+    try:
+        max_results = int(params.get("max_results", ARXIV_DEFAULT_RESULTS))
+    except ValueError:
+        max_results = ARXIV_DEFAULT_RESULTS
+    return m.group(1), max_results
+
+
+def split_arxiv_sources(sources: dict[str, str]) -> tuple[dict[str, str], int, dict[str, str]]:
+    """拆出可合并的 arXiv 源，返回 (分类 -> 源名称, 合并后每页条数, 其余源)"""
+    categories: dict[str, str] = {}
+    page_size = 0
+    others: dict[str, str] = {}
+    for name, url in sources.items():
+        category, max_results = arxiv_category(url)
+        if category and category not in categories:
+            categories[category] = name
+            page_size += max_results
+        else:
+            others[name] = url
+    return categories, page_size, others
+
+
+def arxiv_cache_key(categories: dict[str, str]) -> str:
+    return f"{ARXIV_API}?cat=" + "+".join(sorted(categories))
+
+
+def arxiv_query_url(categories: list[str], since: datetime, until: datetime, start: int, max_results: int) -> str:
+    search = "(" + " OR ".join(f"cat:{c}" for c in categories) + ")"
+    search += f" AND submittedDate:[{since:%Y%m%d%H%M} TO {until:%Y%m%d%H%M}]"
+    params = {
+        "search_query": search,
+        "sortBy": "submittedDate",
+        "sortOrder": "descending",
+        "start": start,
+        "max_results": max_results,
+    }
+    return f"{ARXIV_API}?{urlencode(params)}"
+
+
+def merge_stored_items(fresh: list[NewsItem], previous: list[NewsItem], cutoff: datetime) -> list[NewsItem]:
+    """增量结果与上次保存的条目合并，按链接去重并丢弃早于 cutoff 的条目"""
+    merged: list[NewsItem] = []
+    seen_links: set[str] = set()
+    for it in fresh + previous:
+        dt = it.dt
+        if it.link in seen_links or not dt or dt < cutoff:
+            continue
+        seen_links.add(it.link)
+        merged.append(it)
+    return merged
+
+
+def arxiv_entry_source(entry: Any, categories: dict[str, str]) -> str:
+    """按主分类归属源，主分类不在列表中时取第一个匹配的交叉分类"""
+    terms = [entry.get("arxiv_primary_category", {}).get("term", "")]
+    terms += [tag.get("term", "") for tag in entry.get("tags", [])]
+    for term in terms:
+        if term in categories:
+            return categories[term]
+    return ""
+
+
+def submit_arxiv(
+    categories: dict[str, str],
+    *,
+    since: datetime,
+    until: Optional[datetime] = None,
+    page_size: int,
+    max_pages: int = ARXIV_MAX_PAGES,
+    insecure_ssl: bool = False,
+    timeout: int = 25,
+    proxy: str = "",
+    observe: Optional[Callable[[float, int, str], None]] = None,
+    scheduler: retryqueue.RetryScheduler,
+) -> Future:
+    """一次请求合并查询所有分类，只取 since 之后提交的论文；返回 Future，结果为 (源名称 -> 条目, 新游标, 错误信息)
+
+    每页作为调度器任务提交，翻页间隔由调度器定时，等待期间不占用线程池
+    """
+    until = until or datetime.now(timezone.utc)
+    by_source: dict[str, list[NewsItem]] = {name: [] for name in categories.values()}
+    newest = since
+    oldest: Optional[datetime] = None
+    page_size = max(page_size, 1)
+    result: Future = Future()
+
+    def submit_page(page: int) -> None:
+        url = arxiv_query_url(list(categories), since, until, page * page_size, page_size)
+        attempt = functools.partial(
+            fetch_attempt, url, insecure_ssl=insecure_ssl, timeout=timeout, proxy=proxy, observe=observe,
+        )
+        future = scheduler.submit(attempt, urlparse(url).netloc, delay=ARXIV_PAGE_DELAY if page else 0.0)
+        future.add_done_callback(lambda f: on_page(page, f))
+
+    def on_page(page: int, future: Future) -> None:
+        nonlocal newest, oldest
+        try:
+            xml, _, _, error_msg = future.result()
+            if not xml:
+                if page == 0:
+                    result.set_result(({}, "", error_msg))
+                    return
+                # 结果按提交时间倒序，失败页及其后的论文都早于已取到的条目，游标保持不变，下次运行重新请求
+                logging.warning("⚠️ arXiv 第 %d 页获取失败，游标保持不变: %s", page + 1, error_msg)
+                result.set_result((by_source, since.isoformat(), ""))
+                return
+
+            import feedparser
+
+            feed = feedparser.parse(xml)
+            for entry in feed.entries:
+                name = arxiv_entry_source(entry, categories)
+                item = entry_to_item(entry, name) if name else None
+                if not item:
+                    continue
+                by_source[name].append(item)
+                dt = parse_date(item.pubdate)
+                if dt and dt > newest:
+                    newest = dt
+                if dt and (oldest is None or dt < oldest):
+                    oldest = dt
+
+            if len(feed.entries) < page_size:
+                result.set_result((by_source, newest.isoformat(), ""))
+            elif page + 1 >= max_pages:
+                # 达到页数上限时窗口被截断，游标只推进到已取到的最早提交时间
+                cursor = max(oldest or since, since)
+                logging.warning(
+                    "⚠️ arXiv 已达 %d 页上限，%s 之前提交的论文未抓取", max_pages, cursor.isoformat(),
+                )
+                result.set_result((by_source, cursor.isoformat(), ""))
+            else:
+                submit_page(page + 1)
+        except BaseException as e:
+            result.set_exception(e)
+
+    submit_page(0)
+    return result
+
+
+def fetch_arxiv(
+    categories: dict[str, str],
+    *,
+    scheduler: Optional[retryqueue.RetryScheduler] = None,
+    **kwargs: Any,
+) -> tuple[dict[str, list[NewsItem]], str, str]:
+    """同 submit_arxiv，阻塞等待结果；未指定 scheduler 时单独创建"""
+    if scheduler is None:
+        with retryqueue.RetryScheduler() as own:
+            return submit_arxiv(categories, scheduler=own, **kwargs).result()
+    return submit_arxiv(categories, scheduler=scheduler, **kwargs).result()
+
+
+def parse_date(pubdate: str) -> Optional[datetime]:
+    if not pubdate:
+        return None
+
+    s = pubdate.strip()
+
+    try:
+        dt = parsedate_to_datetime(s)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(timezone.utc)
+    except Exception:
+        pass
+
+    try:
+        s2 = s
+        if s2.endswith("Z"):
+            s2 = s2[:-1] + "+00:00"
+        dt = datetime.fromisoformat(s2)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(timezone.utc)
+    except Exception:
+        return None
+
+
+class ListingExtractor(HTMLParser):
+    """增量提取列表页中的文章链接，达到 max_items 后停止"""
+
+    def __init__(self, link_pattern: re.Pattern, base_netloc: str, max_items: int):
+        super().__init__(convert_charrefs=True)
+        self.link_pattern = link_pattern
+        self.base_netloc = base_netloc
+        self.max_items = max_items
+        self.links: list[dict[str, str]] = []
+        self.done = False
+        self._seen: set[str] = set()
+        self._current: Optional[dict[str, Any]] = None
+        self._heading_depth = 0
+
+    def _match(self, href: str) -> bool:
+        if self.link_pattern.search(href):
+            return True
+        u = urlparse(href)
+        return bool(u.netloc) and u.netloc == self.base_netloc and bool(self.link_pattern.search(u.path))
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        if self.done:
+            return
+        if tag == "a":
+            href = (dict(attrs).get("href") or "").strip()
+            if href and href not in self._seen and self._match(href):
+                self._current = {"href": href, "text": [], "heading": [], "datetime": ""}
+        elif self._current is not None:
+            if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+                self._heading_depth += 1
+            elif tag == "time":
+                self._current["datetime"] = dict(attrs).get("datetime") or ""
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._current is None:
+            return
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6") and self._heading_depth:
+            self._heading_depth -= 1
+        elif tag == "a":
+            current, self._current = self._current, None
+            self._heading_depth = 0
+            self._seen.add(current["href"])
+            self.links.append({
+                "href": current["href"],
+                "text": " ".join("".join(current["text"]).split()),
+                "heading": " ".join("".join(current["heading"]).split()),
+                "datetime": current["datetime"],
+            })
+            if len(self.links) >= self.max_items:
+                self.done = True
+
+    def handle_data(self, data: str) -> None:
+        if self._current is not None:
+            self._current["text"].append(data)
+            if self._heading_depth:
+                self._current["heading"].append(data)
+
+
+def slug_title(href: str) -> str:
+    slug = [part for part in urlparse(href).path.split("/") if part]
+    return slug[-1].replace("-", " ").title() if slug else ""
+
+
+def parse_html_listing(html: str, source: str, spec: dict[str, Any], page_url: str = "") -> list[NewsItem]:
+    """按 html_sources 中的声明解析无 RSS 的列表页"""
+    items: list[NewsItem] = []
+    if not html:
+        return items
+
+    try:
+        base_url = spec.get("base_url") or page_url
+        start = html.find(spec["region_start"]) if spec.get("region_start") else 0
+        start = max(start, 0)
+        end = html.find(spec["region_end"], start) if spec.get("region_end") else -1
+        end = end if end >= 0 else len(html)
+
+        extractor = ListingExtractor(
+            re.compile(spec["link_pattern"]),
+            urlparse(base_url).netloc,
+            int(spec.get("max_items", HTML_MAX_ITEMS)),
+        )
+        for pos in range(start, end, HTML_CHUNK_SIZE):
+            extractor.feed(html[pos:min(pos + HTML_CHUNK_SIZE, end)])
+            if extractor.done:
+                break
+
+        date_regex = re.compile(spec["date_regex"]) if spec.get("date_regex") else None
+        title_rule = spec.get("title", "heading")
+        for link in extractor.links:
+            candidates = {"heading": link["heading"], "text": link["text"], "slug": slug_title(link["href"])}
+            order = [title_rule] + [rule for rule in ("heading", "text", "slug") if rule != title_rule]
+            title = next((candidates[rule] for rule in order if candidates.get(rule)), "")
+            if not title:
+                continue
+
+            pubdate = link["datetime"]
+            if not pubdate and date_regex:
+                m = date_regex.search(link["text"])
+                pubdate = m.group(1) if m else ""
+
+            items.append(NewsItem(
+                title=title,
+                link=urlparse_lib.urljoin(base_url, link["href"]),
+                pubdate=pubdate,
+                description="",
+                source=source,
+            ))
+    except Exception as e:
+        logging.warning("解析 HTML 列表页失败 [%s]: %s", source, e)
+
+    return items
+
+
+def enrich_single_item(
+    item: NewsItem,
+    ctx: ssl.SSLContext,
+    proxy: str,
+    timeout: float,
+    date_regex: str = DEFAULT_DATE_REGEX,
+    observe: Optional[Callable[[float, int, str], None]] = None,
+) -> NewsItem:
+    started = time.monotonic()
+    try:
+        req = urllib.request.Request(item.link, headers={"User-Agent": "Mozilla/5.0"})
+        with open_url(req, timeout=timeout, ctx=ctx, proxy=proxy) as r:
+            raw = r.read()
+    except Exception as e:
+        if observe:
+            observe(time.monotonic() - started, 0, "超时" if "timed out" in str(e).lower() else str(e)[:40])
+        logging.debug("Enrich item failed [%s]: %s", item.link, e)
+        return item
+
+    if observe:
+        observe(time.monotonic() - started, len(raw), "")
+    html = raw.decode("utf-8", errors="replace")
+
+    title_match = re.search(r'<meta[^>]*property=["\']og:title["\'][^>]*content=["\']([^"\']+)["\']', html)
+    if title_match:
+        item.title = unescape(title_match.group(1))
+
+    date_match = re.search(date_regex, html)
+    if date_match:
+        item.pubdate = date_match.group(1)
+
+    return item
+
+
+def enrich_html_items(
+    items: list[NewsItem],
+    spec: dict[str, Any],
+    proxy: str = "",
+    timeout: float = 15,
+    observe: Optional[Callable[[float, int, str], None]] = None,
+) -> list[NewsItem]:
+    """按 enrich 策略抓取详情页补全标题和日期：never / missing（仅缺日期的条目）/ always"""
+    policy = spec.get("enrich", "missing")
+    if not items or policy == "never":
+        return items
+
+    candidates = [it for it in items if policy == "always" or not it.pubdate]
+    items_to_fetch = candidates[:int(spec.get("enrich_limit", 10))]
+    if not items_to_fetch:
+        return items
+
+    ctx = ssl.create_default_context()
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+
+    date_regex = spec.get("date_regex") or DEFAULT_DATE_REGEX
+    with ThreadPoolExecutor(max_workers=min(5, len(items_to_fetch))) as executor:
+        futures = [
+            executor.submit(enrich_single_item, item, ctx, proxy, timeout, date_regex, observe)
+            for item in items_to_fetch
+        ]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                logging.debug("Future failed: %s", e)
+
+    return items
+
+
+def normalize_url(url: str) -> str:
+    try:
+        if not url:
+            return ""
+        u = urlparse(url)
+        qs = [(k, v) for (k, v) in parse_qsl(u.query) if not k.lower().startswith("utm_")]
+        u2 = u._replace(query=urlencode(qs), fragment="")
+        return urlunparse(u2)
+    except Exception:
+        return (url or "").strip()
+
+
+def is_hot(item: NewsItem, hot_keywords: list[str]) -> bool:
+    title = item.folded_title
+    return any(kw.casefold() in title for kw in hot_keywords)
+
+
+def compute_score(
+    item: NewsItem,
+    source_weights: dict[str, float],
+    hot_keywords: list[str],
+    now_utc: datetime,
+    window_hours: int,
+) -> float:
+    score = 0.0
+    score += float(source_weights.get(item.source, 1.0))
+
+    title = item.folded_title
+    if any(kw.casefold() in title for kw in hot_keywords):
+        score += 2.0
+
+    if item.description:
+        score += 0.2
+
+    if item.dt and window_hours > 0:
+        delta_hours = (now_utc - item.dt).total_seconds() / 3600.0
+        recency = max(0.0, 1.0 - (delta_hours / max(window_hours, 1)))
+        score += recency * 3.0
+
+    return score
+
+
+def tokenize_title(title: str) -> set[str]:
+    s = title.casefold()
+    s = re.sub(r'[^\w\s]', ' ', s)
+    words = s.split()
+    return set(w for w in words if len(w) > 2)
+
+
+def jaccard(words1: set[str], words2: set[str]) -> float:
+    if not words1 or not words2:
+        return 0.0
+    return len(words1 & words2) / len(words1 | words2)
+
+
+def title_similarity(t1: str, t2: str) -> float:
+    return jaccard(tokenize_title(t1), tokenize_title(t2))
+
+
+def iter_deduped(items: Iterable[NewsItem], similarity_threshold: float = 0.7) -> Iterator[NewsItem]:
+    """流式去重：链接相同或标题相似即视为重复，保留先出现的条目；已见标题只保存分词结果"""
+    seen_links: set[str] = set()
+    seen_titles: list[set[str]] = []
+
+    for it in items:
+        link = normalize_url(it.link)
+        if link and link in seen_links:
+            continue
+
+        words = tokenize_title(it.title)
+        if any(jaccard(words, seen) >= similarity_threshold for seen in seen_titles):
+            continue
+
+        if link:
+            seen_links.add(link)
+        seen_titles.append(words)
+        it.link = link
+        yield it
+
+
+def dedupe_items(items: list[NewsItem], similarity_threshold: float = 0.7) -> list[NewsItem]:
+    return list(iter_deduped(items, similarity_threshold))
+
+
+def matches_keywords(item: NewsItem, include_kws: list[str], exclude_kws: list[str]) -> bool:
+    """关键词均需已 casefold"""
+    title = item.folded_title
+    desc = item.folded_description
+    if any((kw in title) or (kw in desc) for kw in exclude_kws):
+        return False
+    return any((kw in title) or (kw in desc) for kw in include_kws)
+
+
+def iter_window(
+    items: Iterable[NewsItem],
+    include_keywords: list[str],
+    exclude_keywords: list[str],
+    cutoff: datetime,
+    fallback_cutoff: datetime,
+    counts: Optional[dict[bool, int]] = None,
+) -> Iterator[tuple[bool, NewsItem]]:
+    """流式过滤：逐条产出 (是否在主窗口, 条目)，只保留命中关键词且在回退窗口内的条目
+
+    counts 非空时按窗口累计条数（True 为主窗口，False 为回退窗口）
+    """
+    include_kws = [kw.casefold() for kw in include_keywords]
+    exclude_kws = [kw.casefold() for kw in exclude_keywords]
+
+    for item in items:
+        # 先比较时间：窗口外的条目无需清理描述和 casefold
+        dt = item.dt
+        if not dt or dt < fallback_cutoff:
+            continue
+        if not matches_keywords(item, include_kws, exclude_kws):
+            continue
+
+        in_primary = dt >= cutoff
+        if counts is not None:
+            counts[in_primary] = counts.get(in_primary, 0) + 1
+        yield in_primary, item
+
+
+def filter_items(
+    items: list[NewsItem],
+    include_keywords: list[str],
+    exclude_keywords: list[str],
+    cutoff: datetime,
+    fallback_cutoff: datetime,
+) -> tuple[list[NewsItem], list[NewsItem]]:
+    primary: list[NewsItem] = []
+    fallback: list[NewsItem] = []
+    for in_primary, item in iter_window(items, include_keywords, exclude_keywords, cutoff, fallback_cutoff):
+        (primary if in_primary else fallback).append(item)
+    return primary, fallback
+
+
+def iter_translated(
+    items: Iterable[NewsItem],
+    translator: TranslationStage,
+    lookahead: int = TRANSLATE_LOOKAHEAD,
+) -> Iterator[NewsItem]:
+    """流式翻译标题：提前提交后面 lookahead 条，翻译并行进行，同时只在内存中保留这一窗口"""
+    window: deque[NewsItem] = deque()
+
+    def finish(it: NewsItem) -> NewsItem:
+        it.original_title = it.title
+        it.title = enhance_title(translator.translate(it.title), it.description, it.source)
+        return it
+
+    for it in items:
+        translator.submit(it.title)
+        window.append(it)
+        if len(window) > lookahead:
+            yield finish(window.popleft())
+    while window:
+        yield finish(window.popleft())
+
+
+def iter_scored(items: Iterable[NewsItem], cfg: Config, now_utc: datetime) -> Iterator[NewsItem]:
+    for it in items:
+        it.score = compute_score(it, cfg.source_weights, cfg.hot_keywords, now_utc, cfg.hours)
+        yield it
+
+
+def rank_key(item: NewsItem) -> tuple[float, datetime]:
+    return item.score, item.dt or datetime.min.replace(tzinfo=timezone.utc)
+
+
+def select_top(items: Iterable[NewsItem], limit: int) -> list[NewsItem]:
+    """按 (分数, 时间) 降序取前 limit 条；limit > 0 时只维护大小为 limit 的堆，
+    结果与稳定排序后截断一致（同分时先出现的在前）"""
+    if limit and limit > 0:
+        return heapq.nlargest(limit, items, key=rank_key)
+    return sorted(items, key=rank_key, reverse=True)
+
+
+def make_prefilter(profiles: list[Config], now_utc: datetime) -> Callable[[NewsItem], bool]:
+    """廉价的候选判断：任一配置的关键词与回退窗口能命中即可，用于抓取期间提前提交翻译"""
+    rules = [
+        (
+            set(p.sources),
+            [kw.casefold() for kw in p.include_keywords],
+            [kw.casefold() for kw in p.exclude_keywords],
+            now_utc - timedelta(hours=p.fallback_hours),
+        )
+        for p in profiles
+    ]
+
+    def is_candidate(item: NewsItem) -> bool:
+        dt = item.dt
+        if not dt:
+            return False
+        return any(
+            item.source in names and dt >= cutoff and matches_keywords(item, include_kws, exclude_kws)
+            for names, include_kws, exclude_kws, cutoff in rules
+        )
+
+    return is_candidate
+
+
+def generate_markdown(items: list[NewsItem], hours: int, hot_keywords: list[str]) -> str:
+    for item in items:
+        item.hot = item.hot or is_hot(item, hot_keywords)
+    return renderers.render_digest(items, hours, datetime.now().astimezone())["markdown"]
+
+
+SNAPSHOT_FORMATS = {
+    "markdown": "digest.md",
+    "html": "digest.html",
+    "feishu_card": "card.json",
+    "json_feed": "feed.json",
+    "rss": "feed.xml",
+}
+
+
+def snapshot_files(prefix: str, rendered: dict[str, str]) -> dict[str, bytes]:
+    return {f"{prefix}{SNAPSHOT_FORMATS[fmt]}": text.encode("utf-8") for fmt, text in rendered.items()}
+
+
+def fetch_all_sources(
+    cfg: Config,
+    *,
+    insecure_ssl: bool,
+    now_utc: datetime,
+    on_items: Optional[Callable[[list[NewsItem]], None]] = None,
+    latency: Optional[LatencyStats] = None,
+) -> tuple[list[NewsItem], dict[str, tuple[int, str, str]], dict[str, int]]:
+    """并发抓取并解析 cfg.sources 中的所有源，返回 (条目, 各源状态, 汇总计数)
+
+    on_items 在每个源的条目就绪时立即回调，供下游阶段（如翻译）与其余源的下载重叠进行
+    latency 记录每个源的耗时与大小，并按历史为每个源计算超时（cfg.timeout 为上限）
+    """
+    fallback_cutoff = now_utc - timedelta(hours=cfg.fallback_hours)
+    if latency is None:
+        latency = LatencyStats()
+
+    all_items: list[NewsItem] = []
+    cache = load_cache(cfg.cache_path)
+
+    stats = {"success": 0, "cached": 0, "failed": 0}
+    source_results: dict[str, tuple[int, str, str]] = {}
+
+    def collect(items: list[NewsItem]) -> None:
+        all_items.extend(items)
+        if on_items and items:
+            on_items(items)
+
+    arxiv_sources, arxiv_page_size, feed_sources = split_arxiv_sources(cfg.sources)
+    arxiv_key = arxiv_cache_key(arxiv_sources)
+
+    futures: dict = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(cfg.sources)))) as executor:
+        scheduler = retryqueue.RetryScheduler(executor)
+        if arxiv_sources:
+            arxiv_cursor = parse_date(cache[arxiv_key].cursor) if arxiv_key in cache else None
+            futures[submit_arxiv(
+                arxiv_sources,
+                since=arxiv_cursor or fallback_cutoff,
+                until=now_utc,
+                page_size=arxiv_page_size,
+                insecure_ssl=insecure_ssl,
+                timeout=latency.timeout_for(ARXIV_STATS_KEY, cfg.timeout),
+                proxy=cfg.proxy,
+                observe=latency.observer(ARXIV_STATS_KEY),
+                scheduler=scheduler,
+            )] = (None, arxiv_key)
+
+        for name, url in feed_sources.items():
+            entry = cache.get(url)
+            if entry and entry.is_fresh(now_utc.timestamp(), *cfg.freshness_bounds(name)):
+                items = entry.stored_items()
+                collect(items)
+                stats["cached"] += 1
+                source_results[name] = (len(items), "fresh", "")
+                logging.debug("   %s: 仍在新鲜期内，跳过请求", name)
+                continue
+            attempt = functools.partial(
+                fetch_attempt,
+                url,
+                insecure_ssl=insecure_ssl,
+                timeout=latency.timeout_for(name, cfg.timeout),
+                cache_entry=cache.get(url),
+                proxy=cfg.proxy,
+                observe=latency.observer(name),
+            )
+            futures[scheduler.submit(attempt, urlparse(url).netloc)] = (name, url)
+
+        for future in as_completed(futures):
+            name, url = futures[future]
+            if name is None:
+                by_source, cursor, error_msg = future.result()
+                if not by_source:
+                    # 首页失败时沿用上次保存的条目，游标不变
+                    stale = cache[url].stored_items() if url in cache else None
+                    if stale is not None:
+                        stale = [it for it in stale if it.dt and it.dt >= fallback_cutoff]
+                        collect(stale)
+                    for source_name in arxiv_sources.values():
+                        if stale is None:
+                            stats["failed"] += 1
+                            source_results[source_name] = (0, "failed", error_msg)
+                        else:
+                            stats["cached"] += 1
+                            count = sum(1 for it in stale if it.source == source_name)
+                            source_results[source_name] = (count, "stale", error_msg)
+                    continue
+
+                fresh = [it for items in by_source.values() for it in items]
+                for it in fresh:
+                    it.link = normalize_url(it.link)
+                previous = cache[url].stored_items() if url in cache else []
+                merged = merge_stored_items(fresh, previous, fallback_cutoff)
+                collect(merged)
+                for source_name in arxiv_sources.values():
+                    stats["success"] += 1
+                    source_results[source_name] = (sum(1 for it in merged if it.source == source_name), "success", "")
+                if cursor:
+                    entry = CacheEntry(timestamp=time.time(), cursor=cursor)
+                    entry.store_items(merged)
+                    cache[url] = entry
+                continue
+
+            xml, new_cache_entry, not_modified, error_msg = future.result()
+
+            old_entry = cache.get(url)
+
+            if not_modified:
+                items = old_entry.stored_items() if old_entry else []
+                if old_entry:
+                    old_entry.timestamp = new_cache_entry.timestamp
+                    old_entry.freshness = new_cache_entry.freshness
+                    old_entry.age = new_cache_entry.age
+                collect(items)
+                stats["cached"] += 1
+                source_results[name] = (len(items), "cached", "")
+                logging.debug("   %s: 缓存命中", name)
+                continue
+
+            if xml:
+                patterns = cfg.volatile_patterns.get("*", []) + cfg.volatile_patterns.get(name, [])
+                fingerprint = content_fingerprint(xml, patterns)
+                if old_entry and old_entry.content_hash == fingerprint:
+                    items = old_entry.stored_items()
+                    collect(items)
+                    stats["cached"] += 1
+                    source_results[name] = (len(items), "cached", "")
+                    logging.debug("   %s: 内容未变化，复用 %d 条", name, len(items))
+                    new_cache_entry.content_hash = fingerprint
+                    new_cache_entry.items = old_entry.items
+                    cache[url] = new_cache_entry
+                    continue
+
+                if name in cfg.html_sources:
+                    spec = cfg.html_sources[name]
+                    with profiling.stage("parse"):
+                        items = parse_html_listing(xml, name, spec, url)
+                    detail_key = f"{name} 详情页"
+                    with profiling.stage("enrich"):
+                        items = enrich_html_items(
+                            items, spec, cfg.proxy,
+                            timeout=latency.timeout_for(detail_key, cfg.timeout),
+                            observe=latency.observer(detail_key),
+                        )
+                else:
+                    with profiling.stage("parse"):
+                        items = parse_feed(xml, name)
+                for it in items:
+                    it.link = normalize_url(it.link)
+                new_cache_entry.content_hash = fingerprint
+                new_cache_entry.store_items(items)
+                cache[url] = new_cache_entry
+                collect(items)
+                stats["success"] += 1
+                source_results[name] = (len(items), "success", "")
+                logging.debug("   %s: %d 条", name, len(items))
+            else:
+                stats["failed"] += 1
+                source_results[name] = (0, "failed", error_msg)
+                logging.debug("   %s: 获取失败 - %s", name, error_msg)
+
+    save_cache(cfg.cache_path, cache)
+    latency.save()
+
+    return all_items, source_results, stats
+
+
+def format_latency(summary: Optional[dict[str, float]], timeout: float) -> str:
+    if not summary:
+        return ""
+    size = f" · {summary['size_p50'] / 1024:.0f}KB" if summary["size_p50"] else ""
+    return (
+        f" [p50 {summary['p50']:.2f}s · p95 {summary['p95']:.2f}s · p99 {summary['p99']:.2f}s"
+        f"{size} · 超时 {timeout:g}s]"
+    )
+
+
+def print_source_report(
+    sources: dict[str, str],
+    source_results: dict[str, tuple[int, str, str]],
+    stats: dict[str, int],
+    total_items: int,
+    latency: Optional[LatencyStats] = None,
+    timeout_cap: float = 25,
+) -> None:
+    print("📡 数据源状态:")
+    arxiv_sources = split_arxiv_sources(sources)[0].values()
+    for name in sources.keys():
+        count, status, error = source_results.get(name, (0, "pending", ""))
+        detail = ""
+        if latency:
+            key = ARXIV_STATS_KEY if name in arxiv_sources else name
+            detail = format_latency(latency.summary(key), latency.timeout_for(key, timeout_cap))
+        if status == "success":
+            print(f"   ✅ {name}: {count} 条{detail}")
+        elif status == "cached":
+            print(f"   💾 {name}: 缓存命中 ({count} 条){detail}")
+        elif status == "fresh":
+            print(f"   🧊 {name}: 缓存仍新鲜，未请求 ({count} 条){detail}")
+        elif status == "stale":
+            print(f"   ⚠️ {name}: {error if error else '获取失败'}，沿用缓存 ({count} 条){detail}")
+        elif status == "failed":
+            print(f"   ❌ {name}: {error if error else '获取失败'}{detail}")
+    print()
+
+    print(f"📊 汇总: 成功 {stats['success']} | 缓存 {stats['cached']} | 失败 {stats['failed']}")
+    print(f"📊 抓取条目: {total_items} 条")
+
+
+def build_digest(
+    cfg: Config,
+    all_items: list[NewsItem],
+    now_utc: datetime,
+    translator: Optional[TranslationStage] = None,
+    formats: tuple[str, ...] = ("markdown",),
+    shared: bool = False,
+) -> tuple[dict[str, str], list[NewsItem]]:
+    """过滤、去重、翻译、评分并渲染单份日报，返回 (各格式渲染结果, 入选条目)
+
+    过滤 → 去重 → 翻译 → 评分逐条流动，最后用大小为 max_items 的堆选出结果，不构建中间列表；
+    主窗口为空时再对回退窗口走一遍同样的流水线（第二个堆）。
+    translator 可在抓取阶段提前提交翻译，此处只在去重后按需取回结果。
+    shared 表示 all_items 为多份配置共用：只取本配置的源，并在修改前复制通过过滤的条目
+    """
+    cutoff = now_utc - timedelta(hours=cfg.hours)
+    fallback_cutoff = now_utc - timedelta(hours=cfg.fallback_hours)
+    if translator is None:
+        with TranslationStage(cfg.proxy, cfg.timeout) as translator:
+            return build_digest(cfg, all_items, now_utc, translator, formats, shared)
+
+    names = set(cfg.sources)
+    counts: dict[bool, int] = {}
+
+    def candidates(primary: bool) -> Iterator[NewsItem]:
+        items = (it for it in all_items if it.source in names) if shared else all_items
+        window = iter_window(
+            items,
+            cfg.include_keywords,
+            cfg.exclude_keywords,
+            cutoff,
+            fallback_cutoff,
+            counts if primary else None,
+        )
+        for in_primary, it in window:
+            if in_primary == primary:
+                yield it.copy() if shared else it
+
+    def select(primary: bool) -> list[NewsItem]:
+        stream = profiling.stage_iter("filter", candidates(primary))
+        stream = profiling.stage_iter("dedupe", iter_deduped(stream))
+        stream = profiling.stage_iter("translate", iter_translated(stream, translator))
+        stream = profiling.stage_iter("score", iter_scored(stream, cfg, now_utc))
+        with profiling.stage("select"):
+            return select_top(stream, cfg.max_items)
+
+    print("🌐 正在筛选、翻译和优化标题...")
+    result = select(primary=True)
+    if not result:
+        result = select(primary=False)
+    print(f"📊 过滤结果: {counts.get(True, 0)} 条 ({cfg.hours}h) + {counts.get(False, 0)} 条 ({cfg.fallback_hours}h fallback)")
+    print()
+
+    with profiling.stage("translate"):
+        for it in result:
+            it.hot = is_hot(it, cfg.hot_keywords)
+            if it.hot and it.description:
+                translator.submit(it.description[:100])
+        for it in result:
+            if it.hot and it.description:
+                it.summary = translator.translate(it.description[:100])
+
+    with profiling.stage("render"):
+        rendered = renderers.render_digest(result, cfg.hours, now_utc, formats)
+    return rendered, result
+
+
+def merge_profiles(profiles: list[Config]) -> Config:
+    """多份配置合并为一次抓取用的配置：源取并集，网络参数沿用第一份配置"""
+    base = profiles[0]
+    sources: dict[str, str] = {}
+    html_sources: dict[str, dict[str, Any]] = {}
+    volatile_patterns: dict[str, list[str]] = {}
+    freshness: dict[str, dict[str, float]] = {}
+    glossary: dict[str, str] = {}
+    protected_terms: list[str] = []
+    for profile in profiles:
+        for phrase, target in profile.glossary.items():
+            glossary.setdefault(phrase, target)
+        protected_terms.extend(t for t in profile.protected_terms if t not in protected_terms)
+        for name, url in profile.sources.items():
+            if name in sources and sources[name] != url:
+                logging.warning("源名称冲突，沿用首次出现的地址: %s", name)
+                continue
+            sources[name] = url
+        for name, spec in profile.html_sources.items():
+            html_sources.setdefault(name, spec)
+        for name, patterns in profile.volatile_patterns.items():
+            merged = volatile_patterns.setdefault(name, [])
+            merged.extend(p for p in patterns if p not in merged)
+        for name, bounds in profile.freshness.items():
+            freshness.setdefault(name, bounds)
+    return replace(
+        base,
+        sources=sources,
+        html_sources=html_sources,
+        volatile_patterns=volatile_patterns,
+        freshness=freshness,
+        glossary=glossary,
+        protected_terms=protected_terms,
+        fallback_hours=max(p.fallback_hours for p in profiles),
+        timeout=max(p.timeout for p in profiles),
+    )
+
+
+def write_output(path: Path, md: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(md)
+
+
+@dataclass
+class Digest:
+    """一份日报的生成结果，rendered 为各格式的渲染文本"""
+    config: Config
+    rendered: dict[str, str]
+    items: list[NewsItem]
+    generated_at: datetime
+
+    @property
+    def markdown(self) -> str:
+        return self.rendered.get("markdown", "")
+
+
+def load_cached_items(cfg: Config) -> list[NewsItem]:
+    """只读取缓存中各源上次保存的条目，不发起任何网络请求"""
+    cache = load_cache(cfg.cache_path)
+    arxiv_sources, _, feed_sources = split_arxiv_sources(cfg.sources)
+    keys = list(feed_sources.values())
+    if arxiv_sources:
+        keys.append(arxiv_cache_key(arxiv_sources))
+    return [it for key in keys if key in cache for it in cache[key].stored_items()]
+
+
+def restore_from_archive(
+    items: list[NewsItem],
+    store: archive.ItemArchive,
+    cfg: Config,
+    now_utc: datetime,
+    until: Optional[datetime] = None,
+) -> list[NewsItem]:
+    """从归档取回回退窗口内、本次结果中没有的条目（如抓取失败的源或已滚出 feed 的条目）"""
+    links = {it.link for it in items}
+    since = now_utc - timedelta(hours=cfg.fallback_hours)
+    return [
+        NewsItem.from_dict(record)
+        for record in store.query(cfg.sources, since, until)
+        if record.get("link") not in links
+    ]
+
+
+def generate_digests(
+    profiles: list[Config],
+    *,
+    formats: tuple[str, ...] = ("markdown",),
+    insecure_ssl: bool = False,
+    now: Optional[datetime] = None,
+    cache_only: bool = False,
+) -> list[Digest]:
+    """多份配置共用一次抓取，逐份过滤、翻译、评分并渲染
+
+    抓取结果写入归档，并从归档补回回退窗口内本次没有拿到的条目；
+    cache_only 时跳过抓取，直接用缓存与归档中不晚于 now 的条目重新渲染（可用于回溯过去某一时刻）
+    """
+    cfg = merge_profiles(profiles)
+    now_utc = now or datetime.now(timezone.utc)
+    memory = TranslationMemory(cfg.translation_memory_path, cfg.glossary, cfg.protected_terms)
+    translator = TranslationStage(cfg.proxy, cfg.timeout, memory=memory)
+    is_candidate = make_prefilter(profiles, now_utc)
+
+    def queue_translations(items: list[NewsItem]) -> None:
+        for it in items:
+            if is_candidate(it):
+                translator.submit(it.title)
+
+    store = archive.ItemArchive(cfg.archive_dir, cfg.archive_days) if cfg.archive_dir else None
+    digests: list[Digest] = []
+    with translator:
+        if cache_only:
+            all_items = [it for it in load_cached_items(cfg) if not it.dt or it.dt <= now_utc]
+            print(f"💾 仅使用缓存: {len(all_items)} 条")
+            if store:
+                with profiling.stage("archive"):
+                    restored = restore_from_archive(all_items, store, cfg, now_utc, until=now_utc)
+                all_items += restored
+                print(f"🗄️ 归档补回: {len(restored)} 条")
+        else:
+            latency = LatencyStats(cfg.latency_stats_path)
+            with profiling.stage("fetch"):
+                all_items, source_results, stats = fetch_all_sources(
+                    cfg, insecure_ssl=insecure_ssl, now_utc=now_utc, on_items=queue_translations, latency=latency,
+                )
+            print_source_report(cfg.sources, source_results, stats, len(all_items), latency, cfg.timeout)
+            logging.debug("抓取期间已提交翻译 %d 条", translator.submitted)
+            if store:
+                with profiling.stage("archive"):
+                    try:
+                        added = store.append(all_items, now_utc)
+                    except OSError as e:
+                        added = 0
+                        logging.warning("归档写入失败: %s", e)
+                    restored = restore_from_archive(all_items, store, cfg, now_utc)
+                queue_translations(restored)
+                all_items += restored
+                print(f"🗄️ 归档: 新增 {added} 条，补回 {len(restored)} 条（共 {store.count} 条）")
+
+        for profile in profiles:
+            if len(profiles) > 1:
+                print()
+                print(f"📝 配置: {profile.name}")
+            rendered, result = build_digest(profile, all_items, now_utc, translator, formats, shared=len(profiles) > 1)
+            digests.append(Digest(config=profile, rendered=rendered, items=result, generated_at=now_utc))
+
+    netroute.save_routers()
+    try:
+        memory.save()
+    except OSError as e:
+        logging.warning("翻译记忆保存失败: %s", e)
+    logging.debug("翻译记忆: %s", memory.stats)
+    return digests
+
+
+def generate_digest(config: Optional[Config] = None, **kwargs: Any) -> Digest:
+    """进程内生成单份日报，供调度器直接调用（参数同 generate_digests）"""
+    return generate_digests([config or Config()], **kwargs)[0]
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AI Daily News Generator (RSS/Atom)")
+    parser.add_argument("-o", "--output", default=os.environ.get("DAILY_AI_NEWS_OUTPUT", ""), help="Markdown 输出路径")
+    parser.add_argument("--hours", type=int, default=24, help="主时间窗口（小时）")
+    parser.add_argument("--fallback-hours", type=int, default=48, help="无结果时的回退窗口（小时）")
+    parser.add_argument("--max-items", type=int, default=MAX_ITEMS, help="最多输出条数（去重后）")
+    parser.add_argument("--timeout", type=int, default=25, help="单个源请求超时（秒）")
+    parser.add_argument("--insecure-ssl", action="store_true", default=os.environ.get("RSS_INSECURE_SSL") == "1", help="禁用 HTTPS 证书校验（不推荐）")
+    parser.add_argument("--verbose", action="store_true", help="输出调试信息")
+    parser.add_argument("--config", action="append", default=[], help="JSON 配置文件路径，可重复指定以一次抓取生成多份日报")
+    parser.add_argument("--cache-path", default=os.environ.get("RSS_CACHE_PATH", ""), help="HTTP 缓存文件路径")
+    parser.add_argument("--cache-only", action="store_true", help="不抓取，只用缓存中的条目重新生成")
+    parser.add_argument("--archive-dir", default=os.environ.get("RSS_ARCHIVE_DIR", ""), help="历史条目归档目录（空字符串沿用配置）")
+    parser.add_argument("--at", default="", metavar="TIME", help="以过去某一时刻（ISO 8601）为准从缓存与归档回溯生成，隐含 --cache-only")
+    parser.add_argument("--proxy", default=os.environ.get("RSS_PROXY", ""), help="代理地址，如 http://your-proxy:port")
+    parser.add_argument("--snapshot-dir", default=os.environ.get("DIGEST_SNAPSHOT_DIR", ""), help="预渲染快照目录，供 digest_server.py 提供 HTTP 服务")
+    parser.add_argument("--record", default="", metavar="DIR", help="录制本次运行的全部 HTTP 交换到目录")
+    parser.add_argument("--replay", default="", metavar="DIR", help="从录制目录回放 HTTP 交换，不访问网络")
+    parser.add_argument("--replay-latency", action="store_true", help="回放时按录制的原始耗时等待")
+    parser.add_argument("--profile", default="", metavar="DIR", help="按阶段输出 cProfile / 火焰图采样 / tracemalloc 结果到目录")
+    args = parser.parse_args()
+    if args.record and args.replay:
+        parser.error("--record 与 --replay 不能同时使用")
+    at = parse_date(args.at) if args.at else None
+    if args.at and not at:
+        parser.error(f"无法解析 --at: {args.at}")
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(levelname)s: %(message)s",
+    )
+
+    if args.config:
+        profiles = [Config.from_file(path) for path in args.config]
+        for profile in profiles:
+            if args.proxy:
+                profile.proxy = args.proxy
+            if not profile.output:
+                profile.output = f"daily-ai-news-{profile.name}.md" if len(profiles) > 1 else ""
+        if len(profiles) == 1 and args.output:
+            profiles[0].output = args.output
+    else:
+        profiles = [Config(
+            hours=args.hours,
+            fallback_hours=args.fallback_hours,
+            max_items=args.max_items,
+            timeout=args.timeout,
+            cache_path=args.cache_path or "/tmp/rss-cache.json",
+            proxy=args.proxy,
+            output=args.output,
+        )]
+
+    if args.archive_dir:
+        for profile in profiles:
+            profile.archive_dir = args.archive_dir
+
+    if profiles[0].proxy:
+        print(f"🌐 使用代理: {profiles[0].proxy}")
+
+    now_utc = at or datetime.now(timezone.utc)
+    session = httprecord.start(args.record, args.replay, args.replay_latency)
+    if session:
+        # 录制时保存运行前的状态；回放时使用其副本与录制时的时间，结果与录制时一致
+        now_utc = session.now(now_utc)
+        state = {
+            "cache_path": session.state_file("rss-cache.json", profiles[0].cache_path),
+            "translation_memory_path": session.state_file("translation-memory.json", profiles[0].translation_memory_path),
+            "latency_stats_path": session.state_file("rss-latency.json", profiles[0].latency_stats_path),
+            "archive_dir": session.state_dir("archive", profiles[0].archive_dir),
+        }
+        profiles = [replace(profile, **state) for profile in profiles]
+        print(f"{'⏺️ 录制' if not session.replaying else '⏯️ 回放'} HTTP: {session.root}")
+
+    print("=" * 55)
+    print("   AI Daily News Generator")
+    print(f"   {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    print("=" * 55)
+    print()
+
+    profiling.start(args.profile)
+    formats = tuple(SNAPSHOT_FORMATS) if args.snapshot_dir else ("markdown",)
+    digests = generate_digests(
+        profiles, formats=formats, insecure_ssl=args.insecure_ssl, now=now_utc, cache_only=args.cache_only or bool(at),
+    )
+    if session:
+        session.close()
+
+    snapshots: dict[str, bytes] = {}
+    for digest in digests:
+        profile = digest.config
+        output_path = Path(profile.output) if profile.output else (Path.cwd() / "daily-ai-news.md")
+        with profiling.stage("write"):
+            write_output(output_path, digest.markdown)
+        print(f"✅ Saved: {output_path}")
+        if args.snapshot_dir:
+            prefix = f"{profile.name}/" if len(digests) > 1 else ""
+            snapshots.update(snapshot_files(prefix, digest.rendered))
+    if len(digests) == 1:
+        print()
+        print("-" * 55)
+        print(digests[0].markdown)
+
+    if snapshots:
+        import digest_server
+
+        try:
+            with profiling.stage("write"):
+                digest_server.write_snapshots(args.snapshot_dir, snapshots)
+            print(f"✅ Snapshots: {args.snapshot_dir}")
+        except OSError as e:
+            logging.warning("快照写入失败: %s", e)
+
+    profiling.finish()
+
+
+if __name__ == "__main__":
+    main()
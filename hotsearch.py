@@ -8,6 +8,8 @@
 - 飞书推送：发送到飞书群
 """
 
+import argparse
+import hashlib
 import json
 import urllib.request
 import urllib.error
@@ -15,9 +17,26 @@ import urllib.parse
 import ssl
 import re
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
 from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
+from typing import Callable
+
+import feishu
+import httprecord
+import netroute
+import profiling
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，退化为进程内无锁
+    fcntl = None
 
 # 飞书群 ID
 FEISHU_GROUP_ID = "oc_3e108939f68467ddd73cedfb796642e8"
@@ -52,24 +71,25 @@ TIANAPI_WXHOT = f"https://apis.tianapi.com/wxhottopic/index?key={TIANAPI_KEY}"
 ITAPI_KEY = os.environ.get("ITAPI_KEY", "")
 ITAPI_XIAOHONGSHU = f"https://api.itapi.cn/api/hotnews/xiaohongshu?key={ITAPI_KEY}"
 
-UAPI_PLATFORMS = {
-    "weibo": {"name": "微博热搜", "source": "微博", "weight": 1.0},
-    "baidu": {"name": "百度热搜", "source": "百度", "weight": 1.0},
-    "zhihu": {"name": "知乎热榜", "source": "知乎", "weight": 0.9},
-    "bilibili": {"name": "B站热榜", "source": "B站", "weight": 0.8},
-    "douyin": {"name": "抖音热点", "source": "抖音", "weight": 1.0},
-    "toutiao": {"name": "今日头条", "source": "今日头条", "weight": 0.9},
-}
+API_NAMES = {"uapi": "UAPI", "tianapi": "TianAPI", "itapi": "ITAPI"}
 
-TIANAPI_PLATFORMS = {
-    "weixin": {"name": "微信热搜", "source": "微信", "weight": 1.2},
+# 各 API 的本地缓存有效期（秒）、令牌桶参数（rate: 每秒补充令牌数，burst: 桶容量）
+# 以及该 API 下所有平台共享的并发上限（concurrency）；单个平台的上限见 HotProvider.concurrency
+API_LIMITS = {
+    "uapi": {"ttl": 300, "rate": 1.0, "burst": 6, "concurrency": 3},
+    "tianapi": {"ttl": 600, "rate": 0.1, "burst": 2, "concurrency": 1},
+    "itapi": {"ttl": 600, "rate": 0.1, "burst": 2, "concurrency": 1},
 }
+API_CONCURRENCY = 4
 
-ITAPI_PLATFORMS = {
-    "xiaohongshu": {"name": "小红书热点", "source": "小红书", "weight": 0.9},
-}
+CACHE_DIR = Path(os.environ.get("HOTSEARCH_CACHE_DIR", "/tmp/hotsearch-cache"))
+RATE_LIMIT_WAIT = 10.0
 
-PLATFORM_ORDER = ["weibo", "baidu", "zhihu", "bilibili", "douyin", "toutiao", "weixin", "xiaohongshu"]
+# 上次推送的 TOP 10 状态文件，以及判定“排名明显变化”的阈值
+PUSH_STATE_PATH = CACHE_DIR / "last-push.json"
+RANK_CHANGE_THRESHOLD = 3
+# 二元组下插入一两个字会拆掉多个二元组，「小米汽车发布」与「小米汽车正式发布」约为 0.5，阈值按此取值
+SIMILARITY_THRESHOLD = 0.5
 
 STOP_WORDS = {"的", "了", "是", "在", "有", "和", "与", "或", "等", "这", "那", "我", "你", "他", "她", "它", "们", "着", "过", "被", "把", "给", "向", "从", "到", "为", "以", "及", "其", "之", "上", "下", "中", "内", "外", "前", "后", "左", "右", "一", "二", "三", "四", "五", "六", "七", "八", "九", "十", "百", "千", "万", "亿", "个", "只", "条", "件", "次", "名", "位", "种", "类", "样", "些", "多", "少", "大", "小", "长", "短", "高", "低", "快", "慢", "新", "老", "好", "坏", "对", "错", "真", "假", "能", "会", "要", "可", "应", "该", "须", "必", "需", "将", "已", "正", "再", "也", "就", "才", "都", "又", "还", "更", "最", "很", "太", "真", "实", "际", "现", "当", "应", "该", "因", "所", "而", "但", "却", "只", "仅", "已", "曾", "常", "总", "全", "每", "各", "某", "任", "何", "谁", "哪", "什", "么", "怎", "样", "几", "多", "少", "多", "久", "远", "近", "这", "那", "此", "彼", "某", "各", "每", "凡", "诸", "众", "群", "些", "若", "如", "似", "像", "同", "异", "比", "较", "最", "更", "很", "太", "极", "甚", "颇", "稍", "略", "较", "更", "最", "极", "甚", "颇", "稍", "略"}
 
@@ -77,181 +97,354 @@ STOP_WORDS = {"的", "了", "是", "在", "有", "和", "与", "或", "等", "
 def fetch_json(url: str, timeout: int = 15, headers: dict = None) -> dict:
     try:
         req = urllib.request.Request(url, headers=headers or HEADERS)
-        handler = urllib.request.ProxyHandler({"http": PROXY, "https": PROXY})
-        opener = urllib.request.build_opener(handler, urllib.request.HTTPSHandler(context=SSL_CONTEXT))
-        with opener.open(req, timeout=timeout) as resp:
+
+        def live():
+            if PROXY:
+                # 代理不可用或某主机直连更快时由 netroute 改走直连
+                return netroute.get_router(PROXY).open(req, timeout=timeout, context=SSL_CONTEXT)
+            return urllib.request.urlopen(req, timeout=timeout, context=SSL_CONTEXT)
+
+        with httprecord.urlopen(req, live) as resp:
             return json.loads(resp.read().decode("utf-8"))
     except Exception as e:
         return {"error": str(e)}
 
 
-def get_uapi_hot(platform: str, limit: int = 20) -> list:
-    if platform not in UAPI_PLATFORMS:
-        return []
-    
-    config = UAPI_PLATFORMS[platform]
-    print(f"   方法: UAPI ({config['name']})")
-    
-    url = f"{UAPI_BASE}?type={platform}"
-    data = fetch_json(url)
-    
-    if "error" in data:
-        print(f"   ❌ 请求失败: {data['error']}")
-        return []
-    
-    if "list" not in data:
-        print(f"   ❌ 数据格式错误")
-        return []
-    
-    items = []
-    for idx, item in enumerate(data["list"][:limit], 1):
-        items.append({
-            "title": item.get("title", ""),
-            "hot": item.get("hot_value", ""),
-            "url": item.get("url", ""),
-            "source": config["source"],
-            "platform": platform,
-            "rank": idx,
-            "weight": config["weight"],
-        })
-    
-    print(f"   ✅ 获取 {len(items)} 条")
-    return items
+@contextmanager
+def locked_file(path: Path):
+    """以独占锁打开文件，跨进程共享状态时使用"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+", encoding="utf-8") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            f.seek(0)
+            yield f
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class ResponseCache:
+    """按 URL 缓存 API 响应，多个进程可共享同一目录"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def _path(self, url: str) -> Path:
+        return self.directory / "responses" / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def get(self, url: str, ttl: float):
+        if ttl <= 0:
+            return None
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("time", 0) > ttl:
+            return None
+        return entry.get("data")
+
+    def set(self, url: str, data: dict) -> None:
+        path = self._path(url)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"time": time.time(), "data": data}, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"   ⚠️ 缓存写入失败: {e}")
+
+
+class TokenBucket:
+    """基于文件锁的令牌桶，同一 API Key 的所有进程共用一个桶"""
+
+    def __init__(self, path: Path, rate: float, burst: float):
+        self.path = Path(path)
+        self.rate = rate
+        self.burst = burst
+
+    def try_acquire(self) -> float:
+        """尝试取一个令牌，成功返回 0，否则返回需要等待的秒数"""
+        with locked_file(self.path) as f:
+            try:
+                state = json.loads(f.read() or "{}")
+            except ValueError:
+                state = {}
+            now = time.time()
+            tokens = state.get("tokens", self.burst)
+            elapsed = max(0.0, now - state.get("time", now))
+            tokens = min(self.burst, tokens + elapsed * self.rate)
+
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate if self.rate > 0 else float("inf")
+
+            f.seek(0)
+            f.truncate()
+            json.dump({"tokens": tokens, "time": now}, f)
+            return wait
+
+    def acquire(self, max_wait: float = RATE_LIMIT_WAIT) -> bool:
+        deadline = time.time() + max_wait
+        while True:
+            wait = self.try_acquire()
+            if wait == 0:
+                return True
+            if time.time() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+RESPONSE_CACHE = ResponseCache(CACHE_DIR)
+
+
+def api_key_for(api: str) -> str:
+    if api == "tianapi":
+        return TIANAPI_KEY
+    if api == "itapi":
+        return ITAPI_KEY
+    return ""
+
+
+def get_rate_limiter(api: str) -> TokenBucket:
+    limits = API_LIMITS[api]
+    key_hash = hashlib.sha256(f"{api}:{api_key_for(api)}".encode("utf-8")).hexdigest()[:16]
+    return TokenBucket(CACHE_DIR / "ratelimit" / f"{api}-{key_hash}.json", limits["rate"], limits["burst"])
+
+
+def fetch_api_json(url: str, api: str, timeout: int = 15, is_valid=None) -> tuple[dict, bool]:
+    """带本地缓存与令牌桶限流的 API 请求，只缓存有效响应，返回 (数据, 是否命中缓存)"""
+    limits = API_LIMITS[api]
+    session = httprecord.active()
+    if session and session.replaying:
+        return fetch_json(url, timeout), False
+
+    # 录制时跳过本地缓存，保证每个接口的响应都被录下
+    cached = None if session else RESPONSE_CACHE.get(url, limits["ttl"])
+    if cached is not None:
+        return cached, True
+
+    if not get_rate_limiter(api).acquire():
+        return {"error": "本地限流，配额令牌不足"}, False
+
+    data = fetch_json(url, timeout)
+    if "error" not in data and (is_valid is None or is_valid(data)):
+        RESPONSE_CACHE.set(url, data)
+    return data, False
+
+
+@dataclass
+class HotProvider:
+    """热搜数据源声明：新增平台只需 register_provider 一次"""
+    key: str
+    name: str
+    source: str
+    api: str
+    url: str
+    parser: Callable[[dict, "HotProvider", int], list]
+    weight: float = 1.0
+    timeout: float = 15
+    concurrency: int = 4
+    is_valid: Callable[[dict], bool] = lambda data: True
+
+
+PROVIDERS: dict[str, HotProvider] = {}
+
+
+def register_provider(provider: HotProvider) -> HotProvider:
+    PROVIDERS[provider.key] = provider
+    return provider
+
+
+def make_item(provider: HotProvider, title: str, hot, url: str, rank: int) -> dict:
+    return {
+        "title": title,
+        "hot": hot,
+        "url": url,
+        "source": provider.source,
+        "platform": provider.key,
+        "rank": rank,
+        "weight": provider.weight,
+    }
+
+
+def parse_uapi(data: dict, provider: HotProvider, limit: int) -> list:
+    return [
+        make_item(provider, item.get("title", ""), item.get("hot_value", ""), item.get("url", ""), idx)
+        for idx, item in enumerate(data["list"][:limit], 1)
+    ]
 
 
-def get_weixin_hot(limit: int = 20) -> list:
-    config = TIANAPI_PLATFORMS["weixin"]
-    print(f"   方法: TianAPI ({config['name']})")
-    
-    data = fetch_json(TIANAPI_WXHOT)
-    
-    if "error" in data:
-        print(f"   ❌ 请求失败: {data['error']}")
-        return []
-    
-    if data.get("code") != 200:
-        print(f"   ❌ API错误: {data.get('msg', '未知错误')}")
-        return []
-    
-    items = []
-    for idx, item in enumerate(data.get("result", {}).get("list", [])[:limit], 1):
-        items.append({
-            "title": item.get("word", ""),
-            "hot": "",
-            "url": f"https://weixin.sogou.com/weixin?type=2&query={urllib.parse.quote(item.get('word', ''))}",
-            "source": config["source"],
-            "platform": "weixin",
-            "rank": idx,
-            "weight": config["weight"],
-        })
-    
-    print(f"   ✅ 获取 {len(items)} 条")
-    return items
+def parse_tianapi_wxhot(data: dict, provider: HotProvider, limit: int) -> list:
+    return [
+        make_item(
+            provider,
+            item.get("word", ""),
+            "",
+            f"https://weixin.sogou.com/weixin?type=2&query={urllib.parse.quote(item.get('word', ''))}",
+            idx,
+        )
+        for idx, item in enumerate(data.get("result", {}).get("list", [])[:limit], 1)
+    ]
 
 
-def get_xiaohongshu_hot(limit: int = 20) -> list:
-    config = ITAPI_PLATFORMS["xiaohongshu"]
-    print(f"   方法: ITAPI ({config['name']})")
-    
-    data = fetch_json(ITAPI_XIAOHONGSHU)
-    
+def parse_itapi_hotnews(data: dict, provider: HotProvider, limit: int) -> list:
+    return [
+        make_item(provider, item.get("name", ""), item.get("viewnum", ""), item.get("url", ""), item.get("rank", 0))
+        for item in data.get("data", [])[:limit]
+    ]
+
+
+def uapi_valid(data: dict) -> bool:
+    return "list" in data
+
+
+def code_200_valid(data: dict) -> bool:
+    return data.get("code") == 200
+
+
+for _key, _name, _source, _weight in [
+    ("weibo", "微博热搜", "微博", 1.0),
+    ("baidu", "百度热搜", "百度", 1.0),
+    ("zhihu", "知乎热榜", "知乎", 0.9),
+    ("bilibili", "B站热榜", "B站", 0.8),
+    ("douyin", "抖音热点", "抖音", 1.0),
+    ("toutiao", "今日头条", "今日头条", 0.9),
+]:
+    register_provider(HotProvider(
+        key=_key, name=_name, source=_source, weight=_weight,
+        api="uapi", url=f"{UAPI_BASE}?type={_key}",
+        parser=parse_uapi, is_valid=uapi_valid, timeout=10, concurrency=3,
+    ))
+
+register_provider(HotProvider(
+    key="weixin", name="微信热搜", source="微信", weight=1.2,
+    api="tianapi", url=TIANAPI_WXHOT,
+    parser=parse_tianapi_wxhot, is_valid=code_200_valid, timeout=15, concurrency=1,
+))
+
+register_provider(HotProvider(
+    key="xiaohongshu", name="小红书热点", source="小红书", weight=0.9,
+    api="itapi", url=ITAPI_XIAOHONGSHU,
+    parser=parse_itapi_hotnews, is_valid=code_200_valid, timeout=15, concurrency=1,
+))
+
+PLATFORM_ORDER = list(PROVIDERS)
+
+_semaphores: dict[str, threading.BoundedSemaphore] = {}
+_semaphores_lock = threading.Lock()
+
+
+def _semaphore(key: str, size: int) -> threading.BoundedSemaphore:
+    with _semaphores_lock:
+        if key not in _semaphores:
+            _semaphores[key] = threading.BoundedSemaphore(max(1, size))
+        return _semaphores[key]
+
+
+def provider_semaphores(provider: HotProvider) -> tuple[threading.BoundedSemaphore, threading.BoundedSemaphore]:
+    """返回 (平台自身的并发上限, 同一 API 所有平台共享的上限)；共享上限取自 API_LIMITS，与注册顺序无关"""
+    api_limit = API_LIMITS.get(provider.api, {}).get("concurrency", API_CONCURRENCY)
+    return _semaphore(f"provider:{provider.key}", provider.concurrency), _semaphore(f"api:{provider.api}", api_limit)
+
+
+def fetch_provider(provider: HotProvider, limit: int = 20) -> tuple[list, str]:
+    """获取单个平台热搜，返回 (条目, 状态说明)"""
+    own, shared = provider_semaphores(provider)
+    with own, shared:
+        data, cached = fetch_api_json(provider.url, provider.api, provider.timeout, provider.is_valid)
+
     if "error" in data:
-        print(f"   ❌ 请求失败: {data['error']}")
-        return []
-    
-    if data.get("code") != 200:
-        print(f"   ❌ API错误: {data.get('msg', '未知错误')}")
-        return []
-    
-    items = []
-    for item in data.get("data", [])[:limit]:
-        items.append({
-            "title": item.get("name", ""),
-            "hot": item.get("viewnum", ""),
-            "url": item.get("url", ""),
-            "source": config["source"],
-            "platform": "xiaohongshu",
-            "rank": item.get("rank", 0),
-            "weight": config["weight"],
-        })
-    
-    print(f"   ✅ 获取 {len(items)} 条")
-    return items
+        return [], f"❌ 请求失败: {data['error']}"
+    if not provider.is_valid(data):
+        return [], f"❌ API错误: {data.get('msg') or '数据格式错误'}"
+
+    with profiling.stage("parse"):
+        items = provider.parser(data, provider, limit)
+    return items, f"{'💾 缓存' if cached else '✅ 获取'} {len(items)} 条"
 
 
 def get_hot_list(platform: str, limit: int = 20) -> list:
-    if platform == "weixin":
-        return get_weixin_hot(limit)
-    elif platform == "xiaohongshu":
-        return get_xiaohongshu_hot(limit)
-    elif platform in UAPI_PLATFORMS:
-        return get_uapi_hot(platform, limit)
-    else:
+    provider = PROVIDERS.get(platform)
+    if provider is None:
         print(f"   ❌ 不支持的平台: {platform}")
         return []
+    items, status = fetch_provider(provider, limit)
+    print(f"   {provider.name} ({API_NAMES.get(provider.api, provider.api)}): {status}")
+    return items
 
 
-def get_all_hot_lists(platforms: list = None, limit: int = 20) -> dict:
+def get_all_hot_lists(platforms: list = None, limit: int = 20, max_workers: int = 16) -> dict:
     if platforms is None:
         platforms = PLATFORM_ORDER
-    
-    results = {}
+
+    supported = [p for p in platforms if p in PROVIDERS]
     for platform in platforms:
-        results[platform] = get_hot_list(platform, limit)
-    
+        if platform not in PROVIDERS:
+            print(f"   ❌ 不支持的平台: {platform}")
+
+    outcomes = {}
+    if supported:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(supported))) as executor:
+            futures = {executor.submit(fetch_provider, PROVIDERS[p], limit): p for p in supported}
+            for future in as_completed(futures):
+                platform = futures[future]
+                try:
+                    outcomes[platform] = future.result()
+                except Exception as e:
+                    outcomes[platform] = ([], f"❌ 请求失败: {e}")
+
+    results = {}
+    for platform in supported:
+        provider = PROVIDERS[platform]
+        items, status = outcomes[platform]
+        print(f"   {provider.name} ({API_NAMES.get(provider.api, provider.api)}): {status}")
+        results[platform] = items
+
     return results
 
 
 def get_platform_name(platform: str) -> str:
-    if platform in UAPI_PLATFORMS:
-        return UAPI_PLATFORMS[platform]["name"]
-    elif platform in TIANAPI_PLATFORMS:
-        return TIANAPI_PLATFORMS[platform]["name"]
-    elif platform in ITAPI_PLATFORMS:
-        return ITAPI_PLATFORMS[platform]["name"]
-    return platform
+    provider = PROVIDERS.get(platform)
+    return provider.name if provider else platform
 
 
 def get_platform_weight(platform: str) -> float:
-    if platform in UAPI_PLATFORMS:
-        return UAPI_PLATFORMS[platform]["weight"]
-    elif platform in TIANAPI_PLATFORMS:
-        return TIANAPI_PLATFORMS[platform]["weight"]
-    elif platform in ITAPI_PLATFORMS:
-        return ITAPI_PLATFORMS[platform]["weight"]
-    return 1.0
+    provider = PROVIDERS.get(platform)
+    return provider.weight if provider else 1.0
+
 
+# 中文连续片段切成二元组，英文/数字按整词保留
+NON_WORD_RE = re.compile(r'[^\w\s]')
+TOKEN_RE = re.compile(r'([\u4e00-\u9fff]+)|([^\W_\u4e00-\u9fff]+)')
 
+
+@lru_cache(maxsize=8192)
 def normalize_title(title: str) -> str:
-    title = re.sub(r'[^\w\s\u4e00-\u9fff]', '', title)
-    title = title.lower().strip()
-    return title
+    return NON_WORD_RE.sub('', title).lower().strip()
 
 
-def extract_keywords(title: str) -> set:
-    normalized = normalize_title(title)
+@lru_cache(maxsize=8192)
+def extract_keywords(title: str) -> frozenset:
     words = set()
-    current_word = ""
-    
-    for char in normalized:
-        if '\u4e00' <= char <= '\u9fff':
-            if current_word:
-                if current_word not in STOP_WORDS and len(current_word) > 1:
-                    words.add(current_word)
-                current_word = ""
-            if char not in STOP_WORDS:
-                words.add(char)
-        elif char.isalnum():
-            current_word += char
-        else:
-            if current_word and current_word not in STOP_WORDS and len(current_word) > 1:
-                words.add(current_word)
-            current_word = ""
-    
-    if current_word and current_word not in STOP_WORDS and len(current_word) > 1:
-        words.add(current_word)
-    
-    return words
+    for cjk, word in TOKEN_RE.findall(normalize_title(title)):
+        if cjk:
+            if len(cjk) == 1:
+                if cjk not in STOP_WORDS:
+                    words.add(cjk)
+            else:
+                words.update(
+                    a + b for a, b in zip(cjk, cjk[1:])
+                    if a not in STOP_WORDS or b not in STOP_WORDS
+                )
+        elif len(word) > 1 and word not in STOP_WORDS:
+            words.add(word)
+    return frozenset(words)
 
 
 def jaccard_similarity(set1: set, set2: set) -> float:
@@ -301,7 +494,7 @@ def parse_hot_value(hot_str: str) -> float:
         return 0.0
 
 
-def select_top_news(all_items: list, top_n: int = 10, similarity_threshold: float = 0.6) -> list:
+def select_top_news(all_items: list, top_n: int = 10, similarity_threshold: float = SIMILARITY_THRESHOLD) -> list:
     if not all_items:
         return []
     
@@ -477,44 +670,116 @@ def format_feishu_message(top_items: list, total_count: int, platforms: list) ->
     return "\n".join(lines)
 
 
-def send_to_feishu(message: str) -> bool:
-    """发送消息到飞书群"""
+def cluster_signature(title: str) -> str:
+    """热点簇签名：关键词集合的哈希，不受标点和词序影响"""
+    keywords = sorted(extract_keywords(title)) or [normalize_title(title)]
+    return hashlib.sha1("|".join(keywords).encode("utf-8")).hexdigest()[:12]
+
+
+def load_push_state(path: Path) -> list:
     try:
-        import subprocess
-        import os
-
-        # 设置环境变量（nvm 环境）
-        env = os.environ.copy()
-        env["PATH"] = f"/Users/linux/.nvm/versions/node/v22.22.0/bin:{env['PATH']}"
-
-        # OpenClaw 命令路径
-        openclaw_path = "/Users/linux/.nvm/versions/node/v22.22.0/bin/openclaw"
-
-        cmd = [
-            openclaw_path, "message", "send",
-            "--channel", "feishu",
-            "--target", FEISHU_GROUP_ID,
-            "--message", message
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30, env=env)
-        if result.returncode == 0:
-            print("✅ 已成功发送到飞书群")
-            return True
-        else:
-            print(f"❌ 发送到飞书失败: {result.stderr}")
-            return False
-    except Exception as e:
-        print(f"❌ 发送到飞书失败: {e}")
-        return False
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("top", [])
+    except (OSError, ValueError, AttributeError):
+        return []
 
 
-def main():
+def save_push_state(path: Path, top_items: list) -> None:
+    state = {
+        "time": time.time(),
+        "top": [
+            {"sig": cluster_signature(item["title"]), "title": item["title"], "rank": rank}
+            for rank, item in enumerate(top_items, 1)
+        ],
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️ 推送状态保存失败: {e}")
+
+
+def diff_top_news(previous: list, top_items: list, threshold: int = RANK_CHANGE_THRESHOLD,
+                  similarity_threshold: float = SIMILARITY_THRESHOLD) -> dict:
+    """对比上次推送的 TOP 10，返回新上榜、已下榜和排名变化超过阈值的条目"""
+    by_sig = {entry["sig"]: entry for entry in previous}
+    unmatched = {entry["sig"] for entry in previous}
+
+    entered, moved = [], []
+    for rank, item in enumerate(top_items, 1):
+        old = by_sig.get(cluster_signature(item["title"]))
+        if old is None or old["sig"] not in unmatched:
+            old = next(
+                (by_sig[sig] for sig in unmatched
+                 if calculate_similarity(item["title"], by_sig[sig]["title"]) >= similarity_threshold),
+                None,
+            )
+        if old is None:
+            entered.append((rank, item))
+            continue
+        unmatched.discard(old["sig"])
+        if abs(old["rank"] - rank) >= threshold:
+            moved.append((old["rank"], rank, item))
+
+    left = [entry for entry in previous if entry["sig"] in unmatched]
+    return {"entered": entered, "left": left, "moved": moved}
+
+
+def has_changes(diff: dict) -> bool:
+    return bool(diff["entered"] or diff["left"] or diff["moved"])
+
+
+def format_delta_message(diff: dict) -> str:
+    """格式化增量推送消息，只包含变化的条目"""
+    lines = ["📱 热点变化速递", ""]
+    lines.append(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    lines.append("")
+
+    if diff["entered"]:
+        lines.append("🆕 新上榜")
+        for rank, item in diff["entered"]:
+            hot_str = f" 🔥{item['hot']}" if item.get("hot") else ""
+            lines.append(f"**{rank}. {item['title']}**{hot_str}")
+            lines.append(f"   [查看详情]({item['url']})")
+        lines.append("")
+
+    if diff["moved"]:
+        lines.append("📈 排名变化")
+        for old_rank, rank, item in diff["moved"]:
+            arrow = "↑" if rank < old_rank else "↓"
+            lines.append(f"{rank}. {item['title']} {arrow} {old_rank}→{rank}")
+        lines.append("")
+
+    if diff["left"]:
+        lines.append("📉 已下榜")
+        for entry in diff["left"]:
+            lines.append(f"- {entry['title']}")
+        lines.append("")
+
+    return "\n".join(lines).rstrip()
+
+
+def send_to_feishu(message: str) -> bool:
+    """发送消息到飞书群（配置了 FEISHU_WEBHOOK 时直连 Webhook）
+
+    经发件箱投递；未送达的旧消息会被下一次推送取代，不会在恢复后连发过时的榜单
+    """
+    return feishu.send_message(message, target=os.environ.get("FEISHU_TARGET_ID") or FEISHU_GROUP_ID, group="hotsearch")
+
+
+def run(args, session) -> None:
     print("=" * 60)
     print("热搜数据获取测试 - 智能筛选版")
     print("=" * 60)
     
-    results = get_all_hot_lists(PLATFORM_ORDER)
+    with profiling.stage("fetch"):
+        results = get_all_hot_lists(PLATFORM_ORDER)
+    netroute.save_routers()
+    if session:
+        session.close()
     
     all_items = []
     for platform, items in results.items():
@@ -523,7 +788,8 @@ def main():
     print(f"\n� 共获取 {len(all_items)} 条热搜数据")
     
     print("\n🔍 智能筛选 TOP 10...")
-    top_news = select_top_news(all_items, top_n=10)
+    with profiling.stage("score"):
+        top_news = select_top_news(all_items, top_n=10)
     
     print("\n" + "=" * 60)
     print("🔥 今日热点 TOP 10:")
@@ -538,7 +804,8 @@ def main():
     print("\n" + "=" * 60)
     print("生成完整报告...")
     
-    report = generate_markdown_report(results, top_news)
+    with profiling.stage("render"):
+        report = generate_markdown_report(results, top_news)
     
     output_file = "/tmp/hotsearch-test.md"
     with open(output_file, "w", encoding="utf-8") as f:
@@ -547,16 +814,57 @@ def main():
     print("\n" + "=" * 60)
     print(f"✅ 已保存到: {output_file}")
 
+    if session and session.replaying:
+        print("⏯️ 回放模式，跳过飞书推送")
+        return
+
     # 发送到飞书群
     print("\n" + "=" * 60)
     print("📤 发送到飞书群...")
 
-    feishu_message = format_feishu_message(top_news, len(all_items), list(results.keys()))
-    if send_to_feishu(feishu_message):
+    state_path = Path(args.state_path)
+    previous = load_push_state(state_path)
+    if args.force_push or not previous:
+        with profiling.stage("render"):
+            feishu_message = format_feishu_message(top_news, len(all_items), list(results.keys()))
+    else:
+        with profiling.stage("score"):
+            diff = diff_top_news(previous, top_news, args.rank_threshold)
+        if not has_changes(diff):
+            print("💤 TOP 10 无明显变化，跳过推送")
+            return
+        print(f"🔄 新上榜 {len(diff['entered'])} | 下榜 {len(diff['left'])} | 排名变化 {len(diff['moved'])}")
+        with profiling.stage("render"):
+            feishu_message = format_delta_message(diff)
+
+    with profiling.stage("push"):
+        pushed = send_to_feishu(feishu_message)
+    if pushed:
+        save_push_state(state_path, top_news)
         print("✅ 已成功发送到飞书群")
     else:
         print("❌ 发送到飞书群失败")
 
 
+def main():
+    parser = argparse.ArgumentParser(description="热搜聚合与飞书推送")
+    parser.add_argument("--rank-threshold", type=int, default=RANK_CHANGE_THRESHOLD, help="排名变化达到该值才推送")
+    parser.add_argument("--state-path", default=str(PUSH_STATE_PATH), help="上次推送状态文件路径")
+    parser.add_argument("--force-push", action="store_true", help="忽略变化检测，推送完整消息")
+    parser.add_argument("--record", default="", metavar="DIR", help="录制本次运行的全部 HTTP 交换到目录")
+    parser.add_argument("--replay", default="", metavar="DIR", help="从录制目录回放 HTTP 交换，不访问网络、不推送")
+    parser.add_argument("--replay-latency", action="store_true", help="回放时按录制的原始耗时等待")
+    parser.add_argument("--profile", default="", metavar="DIR", help="按阶段输出 cProfile / 火焰图采样 / tracemalloc 结果到目录")
+    args = parser.parse_args()
+    if args.record and args.replay:
+        parser.error("--record 与 --replay 不能同时使用")
+    session = httprecord.start(args.record, args.replay, args.replay_latency)
+    profiling.start(args.profile)
+    try:
+        run(args, session)
+    finally:
+        profiling.finish()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+HTTP 录制与回放
+- 录制模式：真实请求照常发出，每次交换（请求、状态码、响应头、响应体、耗时、连接错误）写入目录
+- 回放模式：按 方法+URL+请求体 匹配录制结果，从磁盘返回，不访问网络；可选按原始耗时等待
+- 同一 URL 的多次请求（重试等）按顺序依次回放，用完后重复最后一次
+- 同时保存运行开始时间与状态文件（缓存、翻译记忆等），回放时使用副本，结果可重复
+"""
+
+import hashlib
+import http.client
+import io
+import json
+import os
+import shutil
+import threading
+import time
+import urllib.error
+import urllib.request
+import urllib.response
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+RECORD = "record"
+REPLAY = "replay"
+SESSION_FILE = "session.json"
+
+
+def exchange_key(req: urllib.request.Request) -> str:
+    h = hashlib.sha256(f"{req.get_method()} {req.full_url}".encode("utf-8"))
+    if req.data:
+        h.update(req.data if isinstance(req.data, bytes) else str(req.data).encode("utf-8"))
+    return h.hexdigest()[:24]
+
+
+def build_headers(pairs: list[list[str]]) -> http.client.HTTPMessage:
+    headers = http.client.HTTPMessage()
+    for name, value in pairs:
+        headers[name] = value
+    return headers
+
+
+class HTTPSession:
+    def __init__(self, directory: str, mode: str, realtime: bool = False):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"未知模式: {mode}")
+        self.root = Path(directory)
+        self.mode = mode
+        self.realtime = realtime
+        self._counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._meta: dict[str, Any] = {}
+        self._state_dir: Optional[Path] = None
+        if mode == RECORD:
+            (self.root / "exchanges").mkdir(parents=True, exist_ok=True)
+        else:
+            try:
+                self._meta = json.loads((self.root / SESSION_FILE).read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                raise ValueError(f"录制目录无效: {directory} ({e})") from e
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def _next_index(self, key: str) -> int:
+        with self._lock:
+            index = self._counts.get(key, 0)
+            self._counts[key] = index + 1
+            return index
+
+    def _path(self, key: str, index: int) -> Path:
+        return self.root / "exchanges" / f"{key}-{index}.json"
+
+    def now(self, current: datetime) -> datetime:
+        """录制时记下运行开始时间，回放时返回录制时的时间，使时间窗口过滤结果一致"""
+        if self.replaying:
+            recorded = self._meta.get("started_at")
+            return datetime.fromisoformat(recorded) if recorded else current
+        self._meta["started_at"] = current.isoformat()
+        self._write_meta()
+        return current
+
+    def state_file(self, name: str, path: str) -> str:
+        """录制时保存运行前的状态文件；回放时返回该副本在临时目录中的路径，不触碰真实状态"""
+        if not path:
+            return path
+        saved = self.root / "state" / name
+        if not self.replaying:
+            if os.path.exists(path):
+                saved.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(path, saved)
+            return path
+        target = self._replay_state() / name
+        if saved.exists():
+            shutil.copyfile(saved, target)
+        return str(target)
+
+    def state_dir(self, name: str, path: str) -> str:
+        """同 state_file，用于状态目录（如条目归档）"""
+        if not path:
+            return path
+        saved = self.root / "state" / name
+        if not self.replaying:
+            if os.path.isdir(path):
+                shutil.copytree(path, saved, dirs_exist_ok=True)
+            return path
+        target = self._replay_state() / name
+        if saved.is_dir():
+            shutil.copytree(saved, target, dirs_exist_ok=True)
+        return str(target)
+
+    def _replay_state(self) -> Path:
+        if self._state_dir is None:
+            import tempfile
+
+            self._state_dir = Path(tempfile.mkdtemp(prefix="httpreplay-"))
+        return self._state_dir
+
+    def open(self, req: urllib.request.Request, live: Callable[[], Any]):
+        key = exchange_key(req)
+        index = self._next_index(key)
+        if self.replaying:
+            return self._replay(req, key, index)
+        return self._record(req, key, index, live)
+
+    def _record(self, req: urllib.request.Request, key: str, index: int, live: Callable[[], Any]):
+        exchange: dict[str, Any] = {
+            "method": req.get_method(),
+            "url": req.full_url,
+            "request_headers": [list(pair) for pair in req.header_items()],
+        }
+        started = time.monotonic()
+        try:
+            with live() as resp:
+                body = resp.read()
+                status, reason, headers = resp.status, resp.reason, resp.headers
+        except urllib.error.HTTPError as e:
+            body = e.read() if e.fp else b""
+            exchange.update(status=e.code, reason=str(e.reason), headers=[list(p) for p in e.headers.items()])
+            self._save(key, index, exchange, time.monotonic() - started, body)
+            raise urllib.error.HTTPError(req.full_url, e.code, str(e.reason), e.headers, io.BytesIO(body)) from None
+        except OSError as e:
+            reason = getattr(e, "reason", e)
+            exchange["error"] = {
+                "kind": "timeout" if isinstance(reason, TimeoutError) or "timed out" in str(reason).lower() else "url",
+                "reason": str(reason),
+            }
+            self._save(key, index, exchange, time.monotonic() - started, b"")
+            raise
+        exchange.update(status=status, reason=reason, headers=[list(p) for p in headers.items()])
+        self._save(key, index, exchange, time.monotonic() - started, body)
+        return urllib.response.addinfourl(io.BytesIO(body), headers, req.full_url, status)
+
+    def _save(self, key: str, index: int, exchange: dict[str, Any], elapsed: float, body: bytes) -> None:
+        exchange["elapsed"] = round(elapsed, 4)
+        exchange["size"] = len(body)
+        path = self._path(key, index)
+        path.with_suffix(".body").write_bytes(body)
+        path.write_text(json.dumps(exchange, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def _replay(self, req: urllib.request.Request, key: str, index: int):
+        path = self._path(key, index)
+        while index and not path.exists():
+            index -= 1
+            path = self._path(key, index)
+        try:
+            exchange = json.loads(path.read_text(encoding="utf-8"))
+            body = path.with_suffix(".body").read_bytes()
+        except (OSError, ValueError):
+            raise urllib.error.URLError(f"未录制: {req.get_method()} {req.full_url}") from None
+
+        if self.realtime:
+            time.sleep(exchange.get("elapsed", 0))
+        error = exchange.get("error")
+        if error:
+            if error["kind"] == "timeout":
+                raise urllib.error.URLError(TimeoutError(error["reason"]))
+            raise urllib.error.URLError(error["reason"])
+        headers = build_headers(exchange.get("headers", []))
+        if exchange["status"] >= 300:
+            raise urllib.error.HTTPError(req.full_url, exchange["status"], exchange.get("reason", ""), headers, io.BytesIO(body))
+        return urllib.response.addinfourl(io.BytesIO(body), headers, req.full_url, exchange["status"])
+
+    def close(self) -> None:
+        if self.replaying:
+            if self._state_dir is not None:
+                shutil.rmtree(self._state_dir, ignore_errors=True)
+            return
+        self._meta["exchanges"] = sum(self._counts.values())
+        self._write_meta()
+
+    def _write_meta(self) -> None:
+        (self.root / SESSION_FILE).write_text(json.dumps(self._meta, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+_session: Optional[HTTPSession] = None
+
+
+def install(session: Optional[HTTPSession]) -> None:
+    global _session
+    _session = session
+
+
+def active() -> Optional[HTTPSession]:
+    return _session
+
+
+def start(record_dir: str = "", replay_dir: str = "", realtime: bool = False) -> Optional[HTTPSession]:
+    """按命令行参数开启录制或回放，两者都未指定时返回 None"""
+    if record_dir and replay_dir:
+        raise ValueError("--record 与 --replay 不能同时使用")
+    if not record_dir and not replay_dir:
+        return None
+    session = HTTPSession(record_dir or replay_dir, RECORD if record_dir else REPLAY, realtime)
+    install(session)
+    return session
+
+
+def urlopen(req: urllib.request.Request, live: Callable[[], Any]):
+    """出站请求的录制/回放钩子：未开启时直接调用 live()"""
+    if _session is None:
+        return live()
+    return _session.open(req, live)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+按主机学习的直连/代理路由
+- 每次运行对代理做一次亚秒级 TCP 探测，代理不可用时所有请求直接走直连
+- 按主机记录两条路由的耗时 EWMA 与失败次数，持久化到文件，跨运行学习
+- 每个请求按得分选择更优路由，连接被拒绝或重置时在剩余超时内改走另一条；超时不换路由，避免慢源的等待时间翻倍
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，退化为不加锁
+    fcntl = None
+
+ROUTE_STATE_PATH = os.environ.get("NETROUTE_STATE_PATH", "/tmp/netroute.json")
+PROBE_TIMEOUT = 0.5
+EWMA_ALPHA = 0.3
+FAILURE_PENALTY = 10.0
+EXPLORE_AFTER = 5
+EXPLORE_INTERVAL = 20
+
+# 没有历史数据时优先直连的国内主机（其余主机默认先走代理，与原有行为一致）
+DIRECT_HINTS = (
+    ".cn", "36kr.com", "ithome.com", "tianapi.com", "baidu.com", "weibo.com", "zhihu.com",
+    "bilibili.com", "douyin.com", "toutiao.com", "qq.com", "xiaohongshu.com",
+)
+
+DIRECT = "direct"
+PROXY = "proxy"
+
+
+def is_timeout(error: BaseException) -> bool:
+    reason = getattr(error, "reason", error)
+    return isinstance(reason, TimeoutError) or isinstance(error, TimeoutError)
+
+
+def probe_proxy(proxy: str, timeout: float = PROBE_TIMEOUT) -> bool:
+    """只做 TCP 连接探测，不发请求"""
+    parsed = urlparse(proxy if "://" in proxy else f"http://{proxy}")
+    if not parsed.hostname:
+        return False
+    port = parsed.port or (443 if parsed.scheme == "https" else 1080 if parsed.scheme.startswith("socks") else 80)
+    try:
+        with socket.create_connection((parsed.hostname, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+@dataclass
+class RouteStats:
+    ewma: float = 0.0
+    samples: int = 0
+    failures: float = 0.0
+
+    def score(self) -> float:
+        return self.ewma + self.failures * FAILURE_PENALTY
+
+    def record(self, seconds: float, ok: bool) -> None:
+        if ok:
+            self.ewma = seconds if not self.samples else EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * self.ewma
+            self.samples += 1
+            self.failures *= 0.5
+        else:
+            self.failures += 1
+
+
+@contextmanager
+def locked(path: str):
+    with open(f"{path}.lock", "a", encoding="utf-8") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class Router:
+    def __init__(self, proxy: str, state_path: str = ROUTE_STATE_PATH, probe: bool = True):
+        self.proxy = proxy
+        self.state_path = state_path
+        self.proxy_alive = bool(proxy) and (probe_proxy(proxy) if probe else True)
+        self.hosts: dict[str, dict[str, RouteStats]] = self._load()
+        self.requests: dict[str, int] = {}
+        self._touched: set[str] = set()
+        self._lock = threading.Lock()
+        if proxy and not self.proxy_alive:
+            logging.warning("代理不可用，本次运行全部直连: %s", proxy)
+
+    def _load(self) -> dict[str, dict[str, RouteStats]]:
+        if not self.state_path:
+            return {}
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {
+            host: {route: RouteStats(**stats) for route, stats in routes.items() if route in (DIRECT, PROXY)}
+            for host, routes in data.items()
+            if isinstance(routes, dict)
+        }
+
+    def save(self) -> None:
+        """加锁后只覆盖本次访问过的主机，其他进程学到的路由保留"""
+        if not self.state_path or not self._touched:
+            return
+        try:
+            Path(self.state_path).parent.mkdir(parents=True, exist_ok=True)
+            with locked(self.state_path):
+                merged = self._load()
+                with self._lock:
+                    for host in self._touched:
+                        merged[host] = self.hosts[host]
+                data = {host: {route: asdict(s) for route, s in routes.items()} for host, routes in merged.items()}
+                tmp = f"{self.state_path}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp, self.state_path)
+        except OSError as e:
+            logging.warning("路由表保存失败: %s", e)
+
+    def choose(self, host: str) -> list[str]:
+        """返回按优先级排列的路由；代理不可用时只有直连"""
+        if not self.proxy_alive:
+            return [DIRECT]
+        with self._lock:
+            stats = self.hosts.get(host, {})
+            count = self.requests.get(host, 0)
+            self.requests[host] = count + 1
+
+        prior = [DIRECT, PROXY] if host.endswith(DIRECT_HINTS) else [PROXY, DIRECT]
+        known = [r for r in prior if r in stats]
+        if not known:
+            return prior
+        if len(known) == 1:
+            other = PROXY if known[0] == DIRECT else DIRECT
+            explore = stats[known[0]].failures >= 1 or stats[known[0]].samples >= EXPLORE_AFTER
+            return [other, known[0]] if explore else [known[0], other]
+
+        ranked = sorted(prior, key=lambda r: stats[r].score())
+        if count and count % EXPLORE_INTERVAL == 0:
+            ranked.reverse()
+        return ranked
+
+    def record(self, host: str, route: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.hosts.setdefault(host, {}).setdefault(route, RouteStats()).record(seconds, ok)
+            self._touched.add(host)
+
+    def _opener(self, route: str, context: Any) -> urllib.request.OpenerDirector:
+        proxies = {"http": self.proxy, "https": self.proxy} if route == PROXY else {}
+        return urllib.request.build_opener(
+            urllib.request.ProxyHandler(proxies),
+            urllib.request.HTTPSHandler(context=context),
+        )
+
+    def open(self, req: urllib.request.Request, timeout: float, context: Any = None):
+        """按路由顺序尝试；HTTP 错误说明已连通，直接抛出，只有连接层失败才换路由
+
+        所有路由共用一个 timeout：超时直接抛出，改走另一条路由时只给原超时中剩余的时间
+        """
+        host = urlparse(req.full_url).hostname or ""
+        routes = self.choose(host)
+        deadline = time.monotonic() + timeout
+        last_error: Optional[BaseException] = None
+        for i, route in enumerate(routes):
+            remaining = deadline - time.monotonic()
+            if last_error is not None and remaining <= 0:
+                break
+            # ProxyHandler 会原地改写 Request 的目标主机，每条路由使用独立副本
+            attempt = urllib.request.Request(
+                req.full_url, data=req.data, headers=dict(req.header_items()), method=req.get_method(),
+            )
+            started = time.monotonic()
+            try:
+                resp = self._opener(route, context).open(attempt, timeout=remaining)
+            except urllib.error.HTTPError:
+                self.record(host, route, time.monotonic() - started, True)
+                raise
+            except OSError as e:
+                self.record(host, route, time.monotonic() - started, False)
+                if is_timeout(e):
+                    raise
+                last_error = e
+                if i + 1 < len(routes):
+                    logging.debug("%s 经 %s 连接失败 (%s)，改走 %s", host, route, e, routes[i + 1])
+                continue
+            self.record(host, route, time.monotonic() - started, True)
+            return resp
+        raise last_error
+
+
+_routers: dict[str, Router] = {}
+_routers_lock = threading.Lock()
+
+
+def get_router(proxy: str) -> Router:
+    """同一代理地址在进程内共享一个路由器（只探测一次）"""
+    with _routers_lock:
+        if proxy not in _routers:
+            _routers[proxy] = Router(proxy)
+        return _routers[proxy]
+
+
+def save_routers() -> None:
+    with _routers_lock:
+        routers = list(_routers.values())
+    for router in routers:
+        router.save()
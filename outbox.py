@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+持久化发件箱
+- 渲染好的消息先写入 pending/<键>.json 再投递；投递失败只需重新投递，不必重跑抓取、翻译和渲染
+- 幂等键默认取消息内容的哈希，按 (消息, 目标) 去重：同一条消息重复入队只保留一份，已送达的目标不会重复发送；
+  新目标会加入已有消息，失败或作废的目标在重新入队时恢复投递
+- 每个目标（webhook / openclaw / 文件）各用一个线程并行投递，同一目标内按入队顺序逐条发送，失败即停，保证顺序
+- 失败的目标按全抖动指数退避安排下次投递时间，超过次数上限或消息过期后放弃；force 时忽略退避时间立即重试
+- 同一分组（group）中有更新的消息待发送时，尚未开始发送的旧消息直接作废
+- 全部目标处理完毕的消息移入 sent/，保留一段时间用于去重
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，退化为不加锁
+    fcntl = None
+
+OUTBOX_DIR = "/tmp/feishu-outbox"
+MAX_TRIES = 8
+RETRY_BASE = 60.0
+RETRY_CAP = 1800.0
+MAX_AGE = 24 * 3600
+KEEP_SENT = 7 * 24 * 3600
+
+PENDING, SENT, FAILED, SUPERSEDED = "pending", "sent", "failed", "superseded"
+
+
+@dataclass
+class Delivery:
+    """消息在单个目标上的投递状态；progress 为已送达的分片数，重试时从断点继续"""
+    status: str = PENDING
+    tries: int = 0
+    due: float = 0.0
+    progress: int = 0
+    error: str = ""
+
+
+@dataclass
+class Message:
+    key: str
+    kind: str
+    body: Any
+    created: float
+    group: str = ""
+    targets: dict[str, Delivery] = field(default_factory=dict)
+
+    @property
+    def done(self) -> bool:
+        return all(d.status != PENDING for d in self.targets.values())
+
+    @property
+    def delivered(self) -> bool:
+        return all(d.status == SENT for d in self.targets.values())
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Message":
+        targets = {name: Delivery(**d) for name, d in data.get("targets", {}).items()}
+        return cls(**{**data, "targets": targets})
+
+
+# 投递函数：成功返回空字符串，失败返回错误信息；可在过程中推进 delivery.progress
+Deliver = Callable[[str, Message, Delivery], str]
+
+
+def message_key(kind: str, body: Any) -> str:
+    data = json.dumps([kind, body], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:20]
+
+
+@contextmanager
+def locked(path: Path):
+    with open(path, "a", encoding="utf-8") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class Outbox:
+    def __init__(
+        self,
+        directory: str = OUTBOX_DIR,
+        *,
+        max_tries: int = MAX_TRIES,
+        max_age: float = MAX_AGE,
+        base: float = RETRY_BASE,
+        cap: float = RETRY_CAP,
+        rng: Optional[random.Random] = None,
+    ):
+        self.root = Path(directory)
+        self.max_tries = max_tries
+        self.max_age = max_age
+        self.base = base
+        self.cap = cap
+        self._rng = rng or random.Random()
+        self._write_lock = threading.Lock()
+
+    def _dir(self, name: str) -> Path:
+        path = self.root / name
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _read(self, path: Path) -> Optional[Message]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return Message.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logging.warning("发件箱消息读取失败 [%s]: %s", path.name, e)
+            return None
+
+    def _write(self, message: Message) -> None:
+        path = self._dir("pending") / f"{message.key}.json"
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._write_lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(message.to_dict(), f, ensure_ascii=False)
+            os.replace(tmp, path)
+
+    def _locked(self):
+        return locked(self._dir("") / "outbox.lock")
+
+    def enqueue(
+        self,
+        kind: str,
+        body: Any,
+        targets: list[str],
+        *,
+        key: str = "",
+        group: str = "",
+        now: Optional[float] = None,
+    ) -> Message:
+        """写入一条待发送消息；同一幂等键已存在时按目标合并，已送达的目标保持不变"""
+        key = key or message_key(kind, body)
+        now = time.time() if now is None else now
+        with self._locked():
+            message = self.get(key)
+            if message is None:
+                message = Message(key, kind, body, now, group, {name: Delivery() for name in dict.fromkeys(targets)})
+                self._write(message)
+                return message
+
+            revived = False
+            for name in targets:
+                delivery = message.targets.get(name)
+                if delivery is None or delivery.status in (FAILED, SUPERSEDED):
+                    message.targets[name] = Delivery(progress=delivery.progress if delivery else 0)
+                    revived = True
+            if revived:
+                # 重新入队的消息从现在起重新计算过期时间，并回到待发送队列
+                message.created = now
+                self._write(message)
+                try:
+                    (self._dir("sent") / f"{key}.json").unlink()
+                except FileNotFoundError:
+                    pass
+            else:
+                logging.debug("发件箱已有相同消息: %s", key)
+        return message
+
+    def pending(self) -> list[Message]:
+        messages = [m for m in map(self._read, self._dir("pending").glob("*.json")) if m is not None]
+        return sorted(messages, key=lambda m: (m.created, m.key))
+
+    def get(self, key: str) -> Optional[Message]:
+        for state in ("pending", "sent"):
+            message = self._read(self._dir(state) / f"{key}.json")
+            if message is not None:
+                return message
+        return None
+
+    def backoff(self, tries: int) -> float:
+        return self._rng.uniform(0, min(self.cap, self.base * (2 ** (tries - 1))))
+
+    def _drain_target(self, target: str, queue: list[Message], deliver: Deliver, now: float, force: bool) -> None:
+        newest: dict[str, str] = {}
+        for message in queue:
+            if message.group:
+                newest[message.group] = message.key
+
+        for message in queue:
+            delivery = message.targets[target]
+            if message.created + self.max_age < now:
+                delivery.status, delivery.error = FAILED, "消息已过期"
+            elif message.group and newest[message.group] != message.key and delivery.progress == 0:
+                delivery.status = SUPERSEDED
+            elif delivery.due > now and not force:
+                break
+            else:
+                try:
+                    error = deliver(target, message, delivery)
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                if error:
+                    delivery.tries += 1
+                    delivery.error = error
+                    if delivery.tries >= self.max_tries:
+                        delivery.status = FAILED
+                    else:
+                        delivery.due = now + self.backoff(delivery.tries)
+                else:
+                    delivery.status, delivery.error = SENT, ""
+            self._write(message)
+            if delivery.status == PENDING:
+                break
+
+    def drain(self, deliver: Deliver, now: Optional[float] = None, force: bool = False) -> list[Message]:
+        """投递所有到期的消息（force 时不等退避时间），各目标并行；返回本次处理的消息（含最新状态）"""
+        now = time.time() if now is None else now
+        with self._locked():
+            messages = self.pending()
+            queues: dict[str, list[Message]] = {}
+            for message in messages:
+                for target, delivery in message.targets.items():
+                    if delivery.status == PENDING:
+                        queues.setdefault(target, []).append(message)
+
+            if queues:
+                with ThreadPoolExecutor(max_workers=len(queues), thread_name_prefix="outbox") as executor:
+                    futures = [
+                        executor.submit(self._drain_target, target, queue, deliver, now, force)
+                        for target, queue in queues.items()
+                    ]
+                for future in futures:
+                    future.result()
+
+            for message in messages:
+                if message.done:
+                    os.replace(self._dir("pending") / f"{message.key}.json", self._dir("sent") / f"{message.key}.json")
+            self._prune(now)
+        return messages
+
+    def _prune(self, now: float) -> None:
+        for path in self._dir("sent").glob("*.json"):
+            try:
+                if path.stat().st_mtime + KEEP_SENT < now:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
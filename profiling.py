@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+按阶段的性能分析（--profile DIR）
+- 每个阶段在发起线程上单独挂 cProfile，输出 <阶段>.pstats；阶段可嵌套，嵌套时耗时只计入最内层阶段
+- 采样线程定时抓取所有线程的调用栈，输出 profile.collapsed（阶段;线程;栈帧... 次数），可直接交给 flamegraph.pl / speedscope
+  线程池中的工作线程没有自己的阶段时，计入主线程当前所在阶段
+- tracemalloc 记录每个阶段的内存峰值和新增分配最多的代码行，输出 memory.txt
+- 生成器流水线用 stage_iter() 按条目计入阶段：每次取下一条的耗时计入该阶段，上游生成器各自计入自己的阶段
+- 未开启时 stage() 返回空上下文，几乎没有开销；cProfile / tracemalloc 只在开启时导入，不拖慢冷启动
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, TypeVar
+
+SAMPLE_INTERVAL = 0.005
+TOP_ALLOCATIONS = 10
+MAX_STACK_DEPTH = 64
+
+T = TypeVar("T")
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    seconds: float = 0.0
+    peak: int = 0
+    growth: int = 0
+    top: list[Any] = field(default_factory=list)
+
+
+@dataclass
+class _Frame:
+    name: str
+    started: float
+    profile: Any = None
+    snapshot: Any = None
+    base: int = 0
+    peak: int = 0
+
+
+def frame_label(code: Any) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def safe_name(name: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "stage"
+
+
+class StageProfiler:
+    def __init__(self, directory: str, interval: float = SAMPLE_INTERVAL, memory: bool = True):
+        self.root = Path(directory)
+        self.interval = interval
+        self.memory = memory
+        self.owner = threading.get_ident()
+        self.stats: dict[str, StageStats] = {}
+        self.profiles: dict[str, Any] = {}
+        self.samples: Counter = Counter()
+        self._stacks: dict[int, list[_Frame]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        import tracemalloc
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        import tracemalloc
+
+        self._stop.set()
+        if self._sampler:
+            self._sampler.join()
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _snapshot(self) -> Any:
+        import tracemalloc
+
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    @contextmanager
+    def stage(self, name: str, snapshots: bool = True):
+        """snapshots=False 时只记录内存峰值，不做 tracemalloc 快照对比（用于逐条进入的阶段）"""
+        import cProfile
+        import tracemalloc
+
+        ident = threading.get_ident()
+        on_owner = ident == self.owner
+        with self._lock:
+            stack = self._stacks.setdefault(ident, [])
+            parent = stack[-1] if stack else None
+        frame = _Frame(name, time.perf_counter())
+
+        if on_owner:
+            if parent and parent.profile:
+                parent.profile.disable()
+            if self.memory:
+                if parent:
+                    parent.peak = max(parent.peak, tracemalloc.get_traced_memory()[1])
+                if snapshots:
+                    frame.snapshot = self._snapshot()
+                frame.base = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+            frame.profile = self.profiles.setdefault(name, cProfile.Profile())
+        with self._lock:
+            stack.append(frame)
+        if frame.profile:
+            frame.profile.enable()
+        try:
+            yield
+        finally:
+            if frame.profile:
+                frame.profile.disable()
+            elapsed = time.perf_counter() - frame.started
+            with self._lock:
+                stack.pop()
+                stats = self.stats.setdefault(name, StageStats())
+                stats.calls += 1
+                stats.seconds += elapsed
+            if on_owner and self.memory:
+                peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+                growth = peak - frame.base
+                if frame.snapshot is not None and growth >= stats.growth:
+                    stats.top = self._snapshot().compare_to(frame.snapshot, "lineno")[:TOP_ALLOCATIONS]
+                stats.peak = max(stats.peak, peak)
+                stats.growth = max(stats.growth, growth)
+                if parent:
+                    parent.peak = max(parent.peak, peak)
+                tracemalloc.reset_peak()
+            if on_owner and parent and parent.profile:
+                parent.profile.enable()
+
+    def iter_stage(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name, snapshots=False):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def _current_stage(self, ident: int) -> str:
+        stack = self._stacks.get(ident) or self._stacks.get(self.owner)
+        return stack[-1].name if stack else ""
+
+    def _sample_loop(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            frames = sys._current_frames()
+            with self._lock:
+                stages = {ident: self._current_stage(ident) for ident in frames}
+            for ident, frame in frames.items():
+                stage = stages.get(ident)
+                if ident == me or not stage:
+                    continue
+                labels = []
+                while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                    labels.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                labels.reverse()
+                self.samples[";".join([stage, names.get(ident, str(ident)), *labels])] += 1
+
+    def write(self) -> list[str]:
+        """写出全部结果文件，返回摘要行"""
+        for name, profile in self.profiles.items():
+            if profile.getstats():
+                profile.dump_stats(str(self.root / f"{safe_name(name)}.pstats"))
+        with open(self.root / "profile.collapsed", "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+
+        lines = []
+        for name, stats in self.stats.items():
+            line = f"{name:<12} {stats.calls:>4} 次 {stats.seconds:>8.3f}s"
+            if self.memory and stats.peak:
+                line += f"  峰值 {stats.peak / 1048576:.1f}MB (+{stats.growth / 1048576:.1f}MB)"
+            lines.append(line)
+        if self.memory:
+            with open(self.root / "memory.txt", "w", encoding="utf-8") as f:
+                for name, stats in self.stats.items():
+                    if not stats.peak:
+                        continue
+                    f.write(f"## {name}: 峰值 {stats.peak} B，阶段内增长 {stats.growth} B\n")
+                    for diff in stats.top:
+                        f.write(f"{diff}\n")
+                    f.write("\n")
+        with open(self.root / "summary.txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return lines
+
+
+_profiler: Optional[StageProfiler] = None
+_NULL = nullcontext()
+
+
+def start(directory: str) -> Optional[StageProfiler]:
+    global _profiler
+    if not directory:
+        return None
+    _profiler = StageProfiler(directory)
+    _profiler.start()
+    return _profiler
+
+
+def stage(name: str):
+    """包裹一个流水线阶段；未开启 --profile 时为空操作"""
+    if _profiler is None:
+        return _NULL
+    return _profiler.stage(name)
+
+
+def stage_iter(name: str, iterable: Iterable[T]) -> Iterable[T]:
+    """包裹生成器流水线的一段；未开启 --profile 时原样返回"""
+    if _profiler is None:
+        return iterable
+    return _profiler.iter_stage(name, iterable)
+
+
+def finish() -> None:
+    """停止采样并写出结果，打印各阶段摘要"""
+    global _profiler
+    if _profiler is None:
+        return
+    profiler, _profiler = _profiler, None
+    profiler.stop()
+    lines = profiler.write()
+    print()
+    print(f"⏱️ 性能分析结果: {profiler.root}")
+    for line in lines:
+        print(f"   {line}")
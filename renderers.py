@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+日报渲染层
+- 输入为已完成翻译、评分和重点标记的条目，渲染阶段不做任何网络请求
+- render_digest 只遍历一次条目，每条同时分发给所有写入器
+- 写入器把片段直接写入文本流，不反复拼接字符串
+"""
+
+import io
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import format_datetime
+from html import escape as html_escape
+from typing import Any, Iterable, Optional, TextIO
+
+DIGEST_TITLE = "AI 精选日报"
+CONCLUSIONS = [
+    "关注模型能力边界与端侧部署进展",
+    "持续跟踪智能体工具链成熟度",
+]
+
+
+@dataclass
+class DigestMeta:
+    hours: int
+    generated_at: datetime
+    sources: list[str]
+    hot_count: int
+    normal_count: int
+    title: str = DIGEST_TITLE
+
+    @property
+    def description(self) -> str:
+        return f"过去 {self.hours} 小时的 AI 资讯精选"
+
+
+def xml_escape(text: str) -> str:
+    """等价于 xml.sax.saxutils.escape；后者会连带导入 urllib.request 与 ssl，拖慢只渲染的冷启动"""
+    return html_escape(text, quote=False)
+
+
+def local_time(dt: Optional[datetime], fmt: str = "%m-%d %H:%M") -> str:
+    return dt.astimezone().strftime(fmt) if dt else ""
+
+
+def item_summary(item: Any) -> str:
+    return item.summary or item.description[:100]
+
+
+class DigestWriter:
+    """写入器基类：begin → (section → item*)* → end，每个回调只写入自己负责的片段"""
+
+    def __init__(self, out: TextIO):
+        self.out = out
+
+    def begin(self, meta: DigestMeta) -> None:
+        pass
+
+    def section(self, hot: bool) -> None:
+        pass
+
+    def item(self, index: int, item: Any, hot: bool) -> None:
+        pass
+
+    def end(self, meta: DigestMeta) -> None:
+        pass
+
+
+class MarkdownWriter(DigestWriter):
+    def begin(self, meta: DigestMeta) -> None:
+        w = self.out.write
+        w(f"# 🚨 {meta.title}\n\n")
+        w(f"**生成时间**: {local_time(meta.generated_at, '%Y-%m-%d %H:%M')}  \n")
+        w(f"**时间范围**: 过去 {meta.hours} 小时  \n")
+        w(f"**数据源**: {', '.join(meta.sources) if meta.sources else 'RSS 聚合'}\n\n")
+        w("---\n\n")
+        if not meta.hot_count and not meta.normal_count:
+            w("⚠️ 暂无符合条件的资讯\n")
+
+    def section(self, hot: bool) -> None:
+        self.out.write("## 🔥 重点速递\n\n" if hot else "## 📊 技术动态\n\n")
+
+    def item(self, index: int, item: Any, hot: bool) -> None:
+        w = self.out.write
+        pub = local_time(item.dt)
+        if hot:
+            w(f"**{index}. {item.title}**\n")
+            if pub:
+                w(f"- ⏰ {pub}\n")
+            w(f"- 📰 {item.source}\n")
+            w(f"- 🔗 [原文链接]({item.link})\n")
+            if item.description:
+                w(f"- 💬 {item_summary(item)}...\n")
+            w("\n")
+        else:
+            w(f"{index}. [{item.title}]({item.link})\n")
+            if pub:
+                w(f"   - ⏰ {pub}\n")
+            w(f"   - {item.source}\n\n")
+
+    def end(self, meta: DigestMeta) -> None:
+        if not meta.hot_count and not meta.normal_count:
+            return
+        w = self.out.write
+        w("## 📌 今日结论\n\n")
+        for line in CONCLUSIONS:
+            w(f"• {line}\n")
+        w("\n---\n\n")
+        w(f"**统计**: 🔥 {meta.hot_count} + 📊 {meta.normal_count} | cron: 每天 08:00\n\n")
+
+
+class FeishuCardWriter(DigestWriter):
+    """飞书消息卡片（interactive）的 card 字段，元素逐个序列化写出"""
+
+    def _element(self, element: dict[str, Any]) -> None:
+        if self._elements:
+            self.out.write(",")
+        self.out.write(json.dumps(element, ensure_ascii=False))
+        self._elements += 1
+
+    def _markdown(self, content: str) -> None:
+        self._element({"tag": "div", "text": {"tag": "lark_md", "content": content}})
+
+    def begin(self, meta: DigestMeta) -> None:
+        self._elements = 0
+        header = {"title": {"tag": "plain_text", "content": f"🚨 {meta.title}"}, "template": "red"}
+        self.out.write('{"config":{"wide_screen_mode":true},"header":')
+        self.out.write(json.dumps(header, ensure_ascii=False))
+        self.out.write(',"elements":[')
+        self._element({"tag": "note", "elements": [{"tag": "plain_text", "content": (
+            f"{local_time(meta.generated_at, '%Y-%m-%d %H:%M')} · 过去 {meta.hours} 小时 · "
+            f"{', '.join(meta.sources) if meta.sources else 'RSS 聚合'}"
+        )}]})
+        if not meta.hot_count and not meta.normal_count:
+            self._markdown("⚠️ 暂无符合条件的资讯")
+
+    def section(self, hot: bool) -> None:
+        if self._elements > 1:
+            self._element({"tag": "hr"})
+        self._markdown("**🔥 重点速递**" if hot else "**📊 技术动态**")
+
+    def item(self, index: int, item: Any, hot: bool) -> None:
+        lines = [f"{index}. [{item.title}]({item.link})"]
+        meta = " · ".join(part for part in (local_time(item.dt), item.source) if part)
+        if meta:
+            lines.append(meta)
+        if hot and item.description:
+            lines.append(f"💬 {item_summary(item)}...")
+        self._markdown("\n".join(lines))
+
+    def end(self, meta: DigestMeta) -> None:
+        self._element({"tag": "hr"})
+        self._element({"tag": "note", "elements": [
+            {"tag": "plain_text", "content": f"🔥 {meta.hot_count} + 📊 {meta.normal_count}"},
+        ]})
+        self.out.write("]}")
+
+
+class HTMLWriter(DigestWriter):
+    def begin(self, meta: DigestMeta) -> None:
+        w = self.out.write
+        title = html_escape(meta.title)
+        w(f'<!DOCTYPE html>\n<html lang="zh-CN">\n<head>\n<meta charset="utf-8">\n<title>{title}</title>\n</head>\n<body>\n')
+        w(f"<h1>🚨 {title}</h1>\n")
+        w(f"<p>生成时间: {local_time(meta.generated_at, '%Y-%m-%d %H:%M')} · 时间范围: 过去 {meta.hours} 小时 · "
+          f"数据源: {html_escape(', '.join(meta.sources) if meta.sources else 'RSS 聚合')}</p>\n")
+        if not meta.hot_count and not meta.normal_count:
+            w("<p>⚠️ 暂无符合条件的资讯</p>\n")
+        self._open = False
+
+    def section(self, hot: bool) -> None:
+        if self._open:
+            self.out.write("</ol>\n")
+        self.out.write("<h2>🔥 重点速递</h2>\n<ol>\n" if hot else "<h2>📊 技术动态</h2>\n<ol>\n")
+        self._open = True
+
+    def item(self, index: int, item: Any, hot: bool) -> None:
+        w = self.out.write
+        w(f'<li><a href="{html_escape(item.link)}">{html_escape(item.title)}</a>')
+        pub = local_time(item.dt)
+        w(f" <small>{html_escape(' · '.join(part for part in (pub, item.source) if part))}</small>")
+        if hot and item.description:
+            w(f"<p>{html_escape(item_summary(item))}...</p>")
+        w("</li>\n")
+
+    def end(self, meta: DigestMeta) -> None:
+        if self._open:
+            self.out.write("</ol>\n")
+        self.out.write(f"<p>🔥 {meta.hot_count} + 📊 {meta.normal_count}</p>\n</body>\n</html>\n")
+
+
+class JSONFeedWriter(DigestWriter):
+    """JSON Feed 1.1，供看板等下游直接拉取"""
+
+    def begin(self, meta: DigestMeta) -> None:
+        head = {
+            "version": "https://jsonfeed.org/version/1.1",
+            "title": meta.title,
+            "description": meta.description,
+            "_generated_at": meta.generated_at.isoformat(),
+        }
+        self.out.write(json.dumps(head, ensure_ascii=False)[:-1])
+        self.out.write(', "items": [')
+        self._first = True
+
+    def item(self, index: int, item: Any, hot: bool) -> None:
+        entry = {
+            "id": item.link,
+            "url": item.link,
+            "title": item.title,
+            "content_text": item.description,
+        }
+        if item.dt:
+            entry["date_published"] = item.dt.isoformat()
+        entry.update({
+            "tags": [item.source],
+            "_score": round(item.score, 3),
+            "_hot": hot,
+            "_original_title": item.original_title,
+        })
+        if not self._first:
+            self.out.write(", ")
+        self.out.write(json.dumps(entry, ensure_ascii=False))
+        self._first = False
+
+    def end(self, meta: DigestMeta) -> None:
+        self.out.write("]}\n")
+
+
+class RSSWriter(DigestWriter):
+    def begin(self, meta: DigestMeta) -> None:
+        w = self.out.write
+        w('<?xml version="1.0" encoding="utf-8"?>\n<rss version="2.0">\n<channel>\n')
+        w(f"<title>{xml_escape(meta.title)}</title>\n")
+        w(f"<description>{xml_escape(meta.description)}</description>\n")
+        w(f"<lastBuildDate>{format_datetime(meta.generated_at)}</lastBuildDate>\n")
+
+    def item(self, index: int, item: Any, hot: bool) -> None:
+        w = self.out.write
+        w("<item>\n")
+        w(f"<title>{xml_escape(item.title)}</title>\n")
+        w(f"<link>{xml_escape(item.link)}</link>\n")
+        w(f'<guid isPermaLink="true">{xml_escape(item.link)}</guid>\n')
+        if item.dt:
+            w(f"<pubDate>{format_datetime(item.dt)}</pubDate>\n")
+        w(f"<category>{xml_escape(item.source)}</category>\n")
+        if item.description:
+            w(f"<description>{xml_escape(item.description)}</description>\n")
+        w("</item>\n")
+
+    def end(self, meta: DigestMeta) -> None:
+        self.out.write("</channel>\n</rss>\n")
+
+
+WRITERS: dict[str, type[DigestWriter]] = {
+    "markdown": MarkdownWriter,
+    "feishu_card": FeishuCardWriter,
+    "html": HTMLWriter,
+    "json_feed": JSONFeedWriter,
+    "rss": RSSWriter,
+}
+
+
+def render_to(items: Iterable[Any], hours: int, generated_at: datetime, writers: list[DigestWriter]) -> DigestMeta:
+    """一次分区、一次遍历，把每条条目同时交给所有写入器"""
+    hot: list[Any] = []
+    normal: list[Any] = []
+    sources: set[str] = set()
+    for item in items:
+        (hot if item.hot else normal).append(item)
+        sources.add(item.source)
+
+    meta = DigestMeta(
+        hours=hours,
+        generated_at=generated_at,
+        sources=sorted(sources),
+        hot_count=len(hot),
+        normal_count=len(normal),
+    )
+    for writer in writers:
+        writer.begin(meta)
+    for is_hot_section, group in ((True, hot), (False, normal)):
+        if not group:
+            continue
+        for writer in writers:
+            writer.section(is_hot_section)
+        for index, item in enumerate(group, 1):
+            for writer in writers:
+                writer.item(index, item, is_hot_section)
+    for writer in writers:
+        writer.end(meta)
+    return meta
+
+
+def render_digest(
+    items: Iterable[Any],
+    hours: int,
+    generated_at: datetime,
+    formats: Iterable[str] = ("markdown",),
+) -> dict[str, str]:
+    buffers = {name: io.StringIO() for name in formats}
+    render_to(items, hours, generated_at, [WRITERS[name](buf) for name, buf in buffers.items()])
+    return {name: buf.getvalue() for name, buf in buffers.items()}
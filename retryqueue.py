@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+集中调度的重试队列
+- 每次尝试在调用方的线程池中执行；等待重试期间任务只留在调度器的定时堆里，不占用线程池
+- 全抖动指数退避：等待 uniform(0, min(上限, 基数 × 2^次数))，同一主机的多次失败不会同步重试
+- 服务端给出 Retry-After（429 / 503）时至少等待该时长；超过上限则不再重试，而不是提前重试
+- 每个主机在调度器生命周期内有固定的重试预算，出问题的主机不会被反复重试；调度器按次运行创建，预算随之重置
+- submit(delay=...) 可延后首次执行（如分页请求之间的间隔），同样不占用线程池
+- 定时线程只在有等待中的任务时运行，堆清空后退出
+"""
+
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Optional
+
+BASE_DELAY = 0.8
+MAX_DELAY = 20.0
+MAX_RETRY_AFTER = 60.0
+HOST_BUDGET = 4
+DEFAULT_RETRIES = 2
+
+# 一次尝试返回 (结果, 重试提示)：提示为 None 表示结束；否则为服务端要求的最短等待秒数（没有要求时为 0）
+Attempt = Callable[[], tuple[Any, Optional[float]]]
+
+
+def retry_after_seconds(value: Optional[str], now: Optional[datetime] = None) -> float:
+    """解析 Retry-After（秒数或 HTTP 日期），无法解析时返回 0"""
+    if not value:
+        return 0.0
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return max(0.0, (at - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+@dataclass(order=True)
+class _Job:
+    due: float
+    seq: int
+    attempt: Attempt = field(compare=False)
+    key: str = field(compare=False)
+    retries: int = field(compare=False)
+    future: Future = field(compare=False)
+    tries: int = field(default=0, compare=False)
+
+
+class RetryScheduler:
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        *,
+        base: float = BASE_DELAY,
+        cap: float = MAX_DELAY,
+        host_budget: int = HOST_BUDGET,
+        max_retry_after: float = MAX_RETRY_AFTER,
+        rng: Optional[random.Random] = None,
+    ):
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=4, thread_name_prefix="retry")
+        self.base = base
+        self.cap = cap
+        self.host_budget = host_budget
+        self.max_retry_after = max_retry_after
+        self._rng = rng or random.Random()
+        self._heap: list[_Job] = []
+        self._seq = itertools.count()
+        self._budgets: dict[str, int] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self.retried = 0
+
+    def __enter__(self) -> "RetryScheduler":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """关闭调度器自己创建的线程池；调用方传入的线程池由调用方负责"""
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+    def submit(self, attempt: Attempt, key: str = "", retries: int = DEFAULT_RETRIES, delay: float = 0.0) -> Future:
+        """提交一个可重试的任务，delay 秒后首次执行，返回最终结果的 Future"""
+        job = _Job(0.0, next(self._seq), attempt, key, retries, Future())
+        if delay > 0:
+            self._schedule(job, time.monotonic() + delay)
+        else:
+            self._executor.submit(self._run, job)
+        return job.future
+
+    def delay(self, tries: int, retry_after: float = 0.0) -> float:
+        return max(retry_after, self._rng.uniform(0, min(self.cap, self.base * (2 ** tries))))
+
+    def _take_budget(self, key: str) -> bool:
+        with self._cond:
+            left = self._budgets.get(key, self.host_budget)
+            if left <= 0:
+                return False
+            self._budgets[key] = left - 1
+            return True
+
+    def _run(self, job: _Job) -> None:
+        try:
+            result, hint = job.attempt()
+        except BaseException as e:
+            job.future.set_exception(e)
+            return
+        if hint is None or job.tries >= job.retries:
+            job.future.set_result(result)
+            return
+        if hint > self.max_retry_after:
+            logging.debug("Retry-After %.0fs 超过上限，放弃重试: %s", hint, job.key)
+            job.future.set_result(result)
+            return
+        if not self._take_budget(job.key):
+            logging.debug("重试预算已用完: %s", job.key)
+            job.future.set_result(result)
+            return
+
+        job.tries += 1
+        with self._cond:
+            self.retried += 1
+        self._schedule(job, time.monotonic() + self.delay(job.tries - 1, hint))
+
+    def _schedule(self, job: _Job, due: float) -> None:
+        job.due = due
+        with self._cond:
+            heapq.heappush(self._heap, job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="retry-scheduler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _loop(self) -> None:
+        with self._cond:
+            while True:
+                if not self._heap:
+                    self._thread = None
+                    return
+                wait = self._heap[0].due - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                job = heapq.heappop(self._heap)
+                try:
+                    self._executor.submit(self._run, job)
+                except RuntimeError as e:  # 线程池已关闭
+                    job.future.set_exception(e)
+
@@ -15,20 +15,9 @@ cd "$SCRIPT_DIR" && python3 generate-rss-news.py \
   ${RSS_PROXY:+--proxy "$RSS_PROXY"} \
   ${RSS_INSECURE_SSL:+--insecure-ssl}
 
-if [ -n "$FEISHU_WEBHOOK" ]; then
-  curl -X POST "$FEISHU_WEBHOOK" \
-    -H "Content-Type: application/json" \
-    -d "{\"msg_type\":\"text\",\"content\":{\"text\":\"$(cat "$OUTPUT_FILE" | sed 's/"/\\"/g' | tr '\n' '\\n')\"}}"
-elif [ -n "$FEISHU_TARGET_ID" ]; then
-  if command -v openclaw &> /dev/null; then
-    openclaw message send \
-      --channel feishu \
-      --target "$FEISHU_TARGET_ID" \
-      --message "$(cat "$OUTPUT_FILE")"
-  else
-    echo "⚠️ openclaw CLI 未安装，请使用 FEISHU_WEBHOOK 方式"
-    echo "📄 报告已保存到: $OUTPUT_FILE"
-  fi
+if [ -n "$FEISHU_WEBHOOK" ] || [ -n "$FEISHU_TARGET_ID" ] || [ -n "$FEISHU_DELIVERY_TARGETS" ]; then
+  # 消息先写入发件箱再投递；失败时无需重新生成，运行 feishu.py --drain 重新投递即可
+  python3 "$SCRIPT_DIR/feishu.py" --file "$OUTPUT_FILE" || echo "📄 报告已保存到: $OUTPUT_FILE"
 else
   echo "⚠️ 未配置飞书推送，请设置 FEISHU_WEBHOOK 或 FEISHU_TARGET_ID 环境变量"
   echo "📄 报告已保存到: $OUTPUT_FILE"
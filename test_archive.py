@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from archive import ItemArchive
+from generate_rss_news import NewsItem
+
+
+def item(source, hours_ago, n, now):
+    dt = now - timedelta(hours=hours_ago)
+    return NewsItem(
+        title=f"{source} item {n}",
+        link=f"https://{source.lower()}/{n}",
+        pubdate=dt.strftime("%a, %d %b %Y %H:%M:%S +0000"),
+        source=source,
+    )
+
+
+class TestItemArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.now = datetime(2024, 5, 10, 12, 0, tzinfo=timezone.utc)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_and_range_query(self):
+        store = ItemArchive(self.dir)
+        items = [item("A", h, i, self.now) for i, h in enumerate([1, 5, 30, 60])] + [item("B", 2, 9, self.now)]
+        self.assertEqual(store.append(items, self.now), 5)
+
+        reopened = ItemArchive(self.dir)
+        self.assertEqual(reopened.count, 5)
+        recent = list(reopened.query(["A"], since=self.now - timedelta(hours=24)))
+        self.assertEqual(sorted(r["title"] for r in recent), ["A item 0", "A item 1"])
+        window = list(reopened.query(["A"], since=self.now - timedelta(hours=48), until=self.now - timedelta(hours=4)))
+        self.assertEqual(sorted(r["title"] for r in window), ["A item 1", "A item 2"])
+        self.assertEqual([r["source"] for r in reopened.query(["B"])], ["B"])
+        self.assertEqual(NewsItem.from_dict(recent[0]).source, "A")
+
+    def test_same_link_archived_once(self):
+        store = ItemArchive(self.dir)
+        self.assertEqual(store.append([item("A", 1, 0, self.now)], self.now), 1)
+        self.assertEqual(store.append([item("A", 1, 0, self.now), item("A", 2, 1, self.now)], self.now), 1)
+        self.assertEqual(len(list(store.query())), 2)
+
+    def test_query_reads_only_matching_members(self):
+        store = ItemArchive(self.dir)
+        store.append([item("A", 1, 0, self.now), item("B", 50, 1, self.now)], self.now)
+        old = next(m for m in store.members if m.source == "B")
+        path = Path(self.dir, "segments", old.segment)
+        data = bytearray(path.read_bytes())
+        data[old.offset:old.offset + old.length] = b"x" * old.length
+        path.write_bytes(bytes(data))
+        self.assertEqual([r["source"] for r in store.query(["A"], since=self.now - timedelta(hours=24))], ["A"])
+
+    def test_retention_drops_old_segments(self):
+        store = ItemArchive(self.dir, retention_days=2)
+        store.append([item("A", 1, 0, self.now), item("A", 40, 1, self.now)], self.now)
+        later = self.now + timedelta(days=2)
+        store.append([item("A", 0, 2, later), item("A", 24 * 10, 3, later)], later)
+        self.assertEqual(sorted(r["title"] for r in store.query()), ["A item 0", "A item 2"])
+        self.assertEqual(len(list(Path(self.dir, "segments").iterdir())), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+import gzip
+import http.client
+import os
+import tempfile
+import threading
+import unittest
+
+from digest_server import accepts_gzip, content_etag, etag_matches, make_server, write_snapshots
+
+
+class TestHeaderParsing(unittest.TestCase):
+    def test_accepts_gzip(self):
+        self.assertTrue(accepts_gzip("gzip, deflate, br"))
+        self.assertTrue(accepts_gzip("br;q=1.0, gzip;q=0.8"))
+        self.assertFalse(accepts_gzip("gzip;q=0"))
+        self.assertFalse(accepts_gzip("identity"))
+        self.assertFalse(accepts_gzip(""))
+
+    def test_etag_matches(self):
+        self.assertTrue(etag_matches('"a", "b"', '"b"'))
+        self.assertTrue(etag_matches('W/"b"', '"b"'))
+        self.assertTrue(etag_matches("*", '"b"'))
+        self.assertFalse(etag_matches('"a"', '"b"'))
+        self.assertFalse(etag_matches("", '"b"'))
+
+
+class TestDigestServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        write_snapshots(self.tmp.name, {
+            "digest.md": "# 日报\n".encode("utf-8"),
+            "feed.json": b'{"version": "https://jsonfeed.org/version/1.1", "items": []}',
+            "finance/feed.xml": b"<rss version=\"2.0\"></rss>",
+            "finance/digest.md": "# 财经日报\n".encode("utf-8"),
+        })
+        self.server = make_server(self.tmp.name, port=0)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def request(self, path, headers=None, method="GET"):
+        conn = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+        conn.request(method, path, headers=headers or {})
+        resp = conn.getresponse()
+        body = resp.read()
+        conn.close()
+        return resp, body
+
+    def test_serves_snapshot(self):
+        resp, body = self.request("/digest.md")
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(body.decode("utf-8"), "# 日报\n")
+        self.assertTrue(resp.getheader("Content-Type").startswith("text/markdown"))
+        self.assertTrue(resp.getheader("ETag").startswith('"'))
+
+    def test_root_and_prefix(self):
+        self.assertEqual(self.request("/")[0].status, 200)
+        self.assertEqual(self.request("/finance/feed.xml")[0].status, 200)
+        self.assertEqual(self.request("/missing.json")[0].status, 404)
+
+    def test_profile_index(self):
+        resp, body = self.request("/finance/")
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(body.decode("utf-8"), "# 财经日报\n")
+
+    def test_conditional_request(self):
+        resp, _ = self.request("/feed.json")
+        etag = resp.getheader("ETag")
+        resp, body = self.request("/feed.json", {"If-None-Match": etag})
+        self.assertEqual(resp.status, 304)
+        self.assertEqual(body, b"")
+
+    def test_gzip_variant(self):
+        plain, _ = self.request("/digest.md")
+        resp, body = self.request("/digest.md", {"Accept-Encoding": "gzip"})
+        self.assertEqual(resp.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(gzip.decompress(body).decode("utf-8"), "# 日报\n")
+        self.assertNotEqual(resp.getheader("ETag"), plain.getheader("ETag"))
+
+    def test_head(self):
+        resp, body = self.request("/digest.md", method="HEAD")
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(body, b"")
+
+    def test_reload_on_new_manifest(self):
+        old_etag = self.request("/digest.md")[0].getheader("ETag")
+        manifest = write_snapshots(self.tmp.name, {"digest.md": "# 新日报\n".encode("utf-8")})
+        stat = os.stat(manifest)
+        os.utime(manifest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        resp, body = self.request("/digest.md", {"If-None-Match": old_etag})
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(body.decode("utf-8"), "# 新日报\n")
+        self.assertEqual(self.request("/feed.json")[0].status, 404)
+
+    def test_etag_follows_loaded_bytes(self):
+        # 数据文件已更新而 manifest 仍是旧的：ETag 必须与实际返回的内容一致
+        path = os.path.join(self.tmp.name, "digest.md")
+        with open(path, "wb") as f:
+            f.write("# 半途更新\n".encode("utf-8"))
+        manifest = os.path.join(self.tmp.name, "manifest.json")
+        stat = os.stat(manifest)
+        os.utime(manifest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        resp, body = self.request("/digest.md")
+        self.assertEqual(resp.getheader("ETag"), content_etag(body))
+
+
+if __name__ == "__main__":
+    unittest.main()
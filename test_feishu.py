@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import feishu
+from feishu import Deliverer, FeishuWebhookSender, resolve_targets, split_message
+from outbox import Outbox
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        server.requests.append(json.loads(body.decode("utf-8")))
+        server.clients.add(self.client_address)
+        status, payload = server.responses.pop(0) if server.responses else (200, {"code": 0, "msg": "success"})
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.requests = []
+        self.server.clients = set()
+        self.server.responses = []
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.webhook = f"http://127.0.0.1:{self.server.server_address[1]}/open-apis/bot/v2/hook/test"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestFeishuWebhookSender(StubServerTestCase):
+    def test_json_escaping(self):
+        text = '标题 "quoted" \\ backslash\n第二行\t制表'
+        with FeishuWebhookSender(self.webhook) as sender:
+            self.assertTrue(sender.send_text(text))
+        self.assertEqual(self.server.requests[0]["content"]["text"], text)
+        self.assertEqual(self.server.requests[0]["msg_type"], "text")
+
+    def test_persistent_connection(self):
+        with FeishuWebhookSender(self.webhook) as sender:
+            for i in range(3):
+                self.assertTrue(sender.send_text(f"message {i}"))
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(len(self.server.clients), 1)
+
+    def test_retry_on_server_error(self):
+        self.server.responses = [(500, {}), (200, {"code": 11232, "msg": "frequency limited"})]
+        with FeishuWebhookSender(self.webhook, backoff=0) as sender:
+            self.assertTrue(sender.send_text("hello"))
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_no_retry_on_client_error(self):
+        self.server.responses = [(200, {"code": 19021, "msg": "sign match fail"})]
+        with FeishuWebhookSender(self.webhook, backoff=0) as sender:
+            self.assertFalse(sender.send_text("hello"))
+            self.assertIn("19021", sender.last_error)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_split_oversized(self):
+        text = "\n".join(f"第{i}行内容" * 20 for i in range(100))
+        with FeishuWebhookSender(self.webhook, max_bytes=2048) as sender:
+            self.assertTrue(sender.send_text(text))
+        self.assertGreater(len(self.server.requests), 1)
+        self.assertTrue(self.server.requests[0]["content"]["text"].startswith("(1/"))
+
+    def test_send_card(self):
+        card = {"header": {"title": {"tag": "plain_text", "content": "日报"}}, "elements": []}
+        with FeishuWebhookSender(self.webhook) as sender:
+            self.assertTrue(sender.send_card(card))
+        self.assertEqual(self.server.requests[0]["msg_type"], "interactive")
+        self.assertEqual(self.server.requests[0]["card"], card)
+
+    def test_signature(self):
+        with FeishuWebhookSender(self.webhook, secret="s3cret") as sender:
+            sender.send_text("hello")
+        self.assertIn("sign", self.server.requests[0])
+        self.assertIn("timestamp", self.server.requests[0])
+
+
+class TestOutboxDelivery(StubServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.outbox_dir = os.path.join(self.tmp.name, "outbox")
+        self.env = mock.patch.dict(os.environ, {"FEISHU_WEBHOOK": self.webhook}, clear=False)
+        self.env.start()
+        os.environ.pop("FEISHU_DELIVERY_TARGETS", None)
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def test_send_to_several_targets(self):
+        files = os.path.join(self.tmp.name, "files")
+        with mock.patch.object(feishu, "OUTBOX_DIR", self.outbox_dir):
+            self.assertTrue(feishu.send_message("hello", to=f"webhook,file:{files}"))
+            # 相同内容再次发送由发件箱去重
+            self.assertTrue(feishu.send_message("hello", to=f"webhook,file:{files}"))
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual([p.read_text(encoding="utf-8") for p in Path(files).iterdir()], ["hello"])
+
+    def test_new_target_for_sent_message(self):
+        files = os.path.join(self.tmp.name, "files")
+        with mock.patch.object(feishu, "OUTBOX_DIR", self.outbox_dir):
+            self.assertTrue(feishu.send_message("hello"))
+            self.assertTrue(feishu.send_message("hello", to=f"file:{files}"))
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual([p.read_text(encoding="utf-8") for p in Path(files).iterdir()], ["hello"])
+
+    def test_failed_delivery_resumes_from_chunk(self):
+        text = "\n".join(f"第{i}行内容" * 20 for i in range(100))
+        chunks = len(feishu.text_payloads(text, 4096))
+        self.server.responses = [(200, {"code": 0}), (200, {"code": 19021, "msg": "sign match fail"})]
+        box = Outbox(self.outbox_dir, base=0)
+        message = box.enqueue("text", text, ["webhook"])
+        with Deliverer() as deliverer:
+            deliverer._sender = FeishuWebhookSender(self.webhook, max_bytes=4096, backoff=0)
+            box.drain(deliverer)
+            self.assertEqual(box.get(message.key).targets["webhook"].progress, 1)
+            box.drain(deliverer)
+        self.assertTrue(box.get(message.key).delivered)
+        self.assertEqual(len(self.server.requests), chunks + 1)
+        self.assertTrue(self.server.requests[2]["content"]["text"].startswith("(2/"))
+
+    def test_resolve_targets(self):
+        self.assertEqual(resolve_targets("text", target="oc_1"), ["webhook"])
+        self.assertEqual(resolve_targets("text", target="oc_1", spec="openclaw,file:/tmp/x"), ["openclaw:oc_1", "file:/tmp/x"])
+        self.assertEqual(resolve_targets("card", target="oc_1", spec="openclaw,webhook"), ["webhook"])
+
+
+class TestSplitMessage(unittest.TestCase):
+    def test_short_message(self):
+        self.assertEqual(split_message("a\nb"), ["a\nb"])
+
+    def test_respects_limit(self):
+        text = "\n".join("x" * 50 for _ in range(20))
+        chunks = split_message(text, max_bytes=200)
+        self.assertTrue(all(len(c.encode("utf-8")) <= 200 for c in chunks))
+        self.assertEqual("\n".join(chunks), text)
+
+    def test_long_line(self):
+        chunks = split_message("中" * 100, max_bytes=30)
+        self.assertTrue(all(len(c.encode("utf-8")) <= 30 for c in chunks))
+        self.assertEqual("".join(chunks), "中" * 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,20 +1,20 @@
 #!/usr/bin/env python3
 
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
 from unittest.mock import patch, MagicMock
 
-import importlib.util
-import sys
-from pathlib import Path
-
-spec = importlib.util.spec_from_file_location(
-    "generate_rss_news",
-    Path(__file__).parent / "generate-rss-news.py",
-)
-module = importlib.util.module_from_spec(spec)
-sys.modules["generate_rss_news"] = module
-spec.loader.exec_module(module)
+from archive import ItemArchive
+from retryqueue import RetryScheduler
 
 from generate_rss_news import (
     NewsItem,
@@ -26,7 +26,34 @@ from generate_rss_news import (
     compute_score,
     dedupe_items,
     filter_items,
+    iter_deduped,
+    select_top,
     generate_markdown,
+    split_arxiv_sources,
+    arxiv_query_url,
+    arxiv_cache_key,
+    fetch_arxiv,
+    submit_arxiv,
+    content_fingerprint,
+    merge_stored_items,
+    parse_html_listing,
+    enrich_html_items,
+    load_cache,
+    save_cache,
+    merge_profiles,
+    build_digest,
+    generate_digest,
+    generate_digests,
+    Digest,
+    TranslationStage,
+    make_prefilter,
+    fetch,
+    fetch_all_sources,
+    freshness_lifetime,
+    Histogram,
+    LatencyStats,
+    LATENCY_BUCKETS,
+    TIMEOUT_MIN,
 )
 
 
@@ -56,6 +83,34 @@ class TestNewsItem(unittest.TestCase):
         self.assertEqual(item.title, "Test")
         self.assertEqual(item.link, "https://example.com")
 
+    def test_compact_and_lazy(self):
+        item = NewsItem(title="AI", link="https://example.com", pubdate="2024-01-01",
+                        source="".join(["Hacker", " News"]), html_description="<p>a &amp; b</p>")
+        self.assertFalse(hasattr(item, "__dict__"))
+        self.assertIs(item.source, NewsItem(title="", link="", source="Hacker News").source)
+        self.assertIsNone(item._description)
+        self.assertEqual(item.description, "a & b")
+        self.assertEqual(item.folded_description, "a & b")
+        self.assertEqual(item.dt, datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+    def test_derived_fields_follow_updates(self):
+        item = NewsItem(title="OpenAI", link="", pubdate="2024-01-01", description="Desc")
+        self.assertEqual(item.folded_title, "openai")
+        item.title = "Anthropic"
+        item.description = "Other"
+        item.pubdate = "2024-02-01"
+        self.assertEqual(item.folded_title, "anthropic")
+        self.assertEqual(item.folded_description, "other")
+        self.assertEqual(item.dt.month, 2)
+
+    def test_copy_is_independent(self):
+        item = NewsItem(title="AI", link="https://a/1", pubdate="2024-01-01", score=1.0)
+        other = item.copy()
+        self.assertEqual(other, item)
+        other.title = "changed"
+        self.assertEqual(item.title, "AI")
+        self.assertEqual(item.folded_title, "ai")
+
 
 class TestCacheEntry(unittest.TestCase):
     def test_is_expired(self):
@@ -78,6 +133,197 @@ class TestCacheEntry(unittest.TestCase):
         self.assertEqual(restored.etag, "etag123")
         self.assertEqual(restored.timestamp, 12345.0)
 
+    def test_stored_items_roundtrip(self):
+        import json
+        entry = CacheEntry(content_hash="abc")
+        entry.store_items([
+            NewsItem(title="T", link="https://example.com", pubdate="2024-01-01", source="S",
+                     dt=datetime.now(timezone.utc), score=3.0),
+        ])
+        restored = CacheEntry.from_dict(json.loads(json.dumps(entry.to_dict())))
+        items = restored.stored_items()
+        self.assertEqual(restored.content_hash, "abc")
+        self.assertEqual(items[0].title, "T")
+        self.assertEqual(items[0].source, "S")
+        self.assertNotIn("_dt", restored.items[0])
+        self.assertEqual(items[0].dt, datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+
+class TestFreshness(unittest.TestCase):
+    def test_lifetime_from_headers(self):
+        self.assertEqual(freshness_lifetime({"Cache-Control": "public, max-age=600"}), 600)
+        self.assertEqual(freshness_lifetime({"Cache-Control": "max-age=600, no-cache"}), 0)
+        self.assertEqual(freshness_lifetime({"Cache-Control": "no-store"}), 0)
+        self.assertEqual(freshness_lifetime({
+            "Date": "Mon, 01 Jan 2024 12:00:00 GMT",
+            "Expires": "Mon, 01 Jan 2024 13:00:00 GMT",
+        }), 3600)
+        self.assertEqual(freshness_lifetime({"Cache-Control": "max-age=60", "Expires": "Mon, 01 Jan 2024 13:00:00 GMT"}), 60)
+        self.assertEqual(freshness_lifetime({"Expires": "0"}), 0)
+        self.assertEqual(freshness_lifetime({}), 0)
+
+    def test_is_fresh_honors_age_and_bounds(self):
+        entry = CacheEntry(timestamp=1000.0, items=[{"title": "T"}])
+        entry.update_freshness({"Cache-Control": "max-age=600", "Age": "100"})
+        self.assertTrue(entry.is_fresh(1400.0))
+        self.assertFalse(entry.is_fresh(1600.0))
+        self.assertFalse(entry.is_fresh(1400.0, max_fresh=300))
+        self.assertTrue(entry.is_fresh(1900.0, min_fresh=1200))
+        self.assertFalse(CacheEntry(timestamp=1000.0, freshness=600).is_fresh(1100.0))
+        self.assertFalse(entry.is_fresh(900.0))
+
+        restored = CacheEntry.from_dict(json.loads(json.dumps(entry.to_dict())))
+        self.assertEqual((restored.freshness, restored.age), (600, 100))
+
+    def test_source_bounds(self):
+        cfg = Config(freshness={"*": {"max": 1800}, "Hacker News": {"min": 300}})
+        self.assertEqual(cfg.freshness_bounds("Hacker News"), (300, 1800))
+        self.assertEqual(cfg.freshness_bounds("OpenAI"), (0, 1800))
+        self.assertEqual(Config().freshness_bounds("OpenAI")[0], 0)
+
+    @patch("generate_rss_news.fetch_attempt")
+    def test_fresh_entry_skips_request(self, mock_fetch):
+        mock_fetch.return_value = (("", CacheEntry(), False, "超时"), None)
+        now = datetime.now(timezone.utc)
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = Config(
+                sources={"A": "https://a/feed", "B": "https://b/feed"},
+                cache_path=str(Path(tmp) / "cache.json"),
+                freshness={"B": {"max": 0}},
+            )
+            cache = {}
+            for url in cfg.sources.values():
+                entry = CacheEntry(timestamp=now.timestamp() - 60, freshness=3600)
+                entry.store_items([NewsItem(title="AI", link=f"{url}/1", source="A")])
+                cache[url] = entry
+            save_cache(cfg.cache_path, cache)
+            items, results, stats = fetch_all_sources(cfg, insecure_ssl=False, now_utc=now)
+        self.assertEqual([c[0][0] for c in mock_fetch.call_args_list], ["https://b/feed"])
+        self.assertEqual(results["A"], (1, "fresh", ""))
+        self.assertEqual(len(items), 1)
+
+
+class FlakyFeedHandler(BaseHTTPRequestHandler):
+    hits: dict[str, int] = {}
+
+    def do_GET(self):
+        hits = self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        if self.path == "/busy" and hits == 1:
+            self.send_response(503)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path == "/missing":
+            self.send_error(404)
+            return
+        body = b"<rss></rss>"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestFetchRetries(unittest.TestCase):
+    def setUp(self):
+        FlakyFeedHandler.hits = {}
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyFeedHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.scheduler = RetryScheduler(base=0.01)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_retry_after_on_503(self):
+        started = time.monotonic()
+        body, _, _, error = fetch(self.base + "/busy", scheduler=self.scheduler)
+        self.assertEqual((body, error), ("<rss></rss>", ""))
+        self.assertEqual(FlakyFeedHandler.hits["/busy"], 2)
+        self.assertGreaterEqual(time.monotonic() - started, 1.0)
+
+    def test_client_error_not_retried(self):
+        _, _, _, error = fetch(self.base + "/missing", scheduler=self.scheduler)
+        self.assertEqual(error, "HTTP 404")
+        self.assertEqual(FlakyFeedHandler.hits["/missing"], 1)
+
+
+class TestSaveCache(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name) / "cache.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_concurrent_writers_merge(self):
+        worker_a = load_cache(self.path)
+        worker_b = load_cache(self.path)
+        worker_a["https://a"] = CacheEntry(etag="a", timestamp=100.0)
+        worker_b["https://b"] = CacheEntry(etag="b", timestamp=100.0)
+        save_cache(self.path, worker_a)
+        save_cache(self.path, worker_b)
+        merged = load_cache(self.path)
+        self.assertEqual(merged["https://a"].etag, "a")
+        self.assertEqual(merged["https://b"].etag, "b")
+
+    def test_newer_entry_wins(self):
+        save_cache(self.path, {"https://a": CacheEntry(etag="old", timestamp=100.0)})
+        stale = load_cache(self.path)
+        save_cache(self.path, {"https://a": CacheEntry(etag="new", timestamp=200.0)})
+        save_cache(self.path, stale)
+        self.assertEqual(load_cache(self.path)["https://a"].etag, "new")
+
+    def test_no_temp_files_left(self):
+        save_cache(self.path, {"https://a": CacheEntry(etag="a", timestamp=1.0)})
+        leftovers = [p.name for p in Path(self.tmp.name).iterdir() if p.name.endswith(".tmp")]
+        self.assertEqual(leftovers, [])
+
+    def test_parallel_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+        def write(i):
+            save_cache(self.path, {f"https://{i}": CacheEntry(etag=str(i), timestamp=float(i))})
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(write, range(20)))
+        self.assertEqual(len(load_cache(self.path)), 20)
+
+
+class TestContentFingerprint(unittest.TestCase):
+    def test_whitespace_insensitive(self):
+        self.assertEqual(
+            content_fingerprint("<rss>\n  <item>a</item>\n</rss>"),
+            content_fingerprint("<rss> <item>a</item> </rss>"),
+        )
+
+    def test_volatile_regions_stripped(self):
+        patterns = [r"<lastBuildDate>.*?</lastBuildDate>"]
+        a = "<rss><lastBuildDate>Mon, 01 Jan 2024</lastBuildDate><item>a</item></rss>"
+        b = "<rss><lastBuildDate>Tue, 02 Jan 2024</lastBuildDate><item>a</item></rss>"
+        self.assertNotEqual(content_fingerprint(a), content_fingerprint(b))
+        self.assertEqual(content_fingerprint(a, patterns), content_fingerprint(b, patterns))
+
+    def test_content_change(self):
+        self.assertNotEqual(content_fingerprint("<item>a</item>"), content_fingerprint("<item>b</item>"))
+
+
+class TestMergeStoredItems(unittest.TestCase):
+    def test_merge(self):
+        now = datetime.now(timezone.utc)
+        fmt = "%a, %d %b %Y %H:%M:%S +0000"
+        fresh = [NewsItem(title="New", link="https://a/1", pubdate=now.strftime(fmt))]
+        previous = [
+            NewsItem(title="New (old copy)", link="https://a/1", pubdate=now.strftime(fmt)),
+            NewsItem(title="Kept", link="https://a/2", pubdate=(now - timedelta(hours=5)).strftime(fmt)),
+            NewsItem(title="Too old", link="https://a/3", pubdate=(now - timedelta(hours=72)).strftime(fmt)),
+        ]
+        merged = merge_stored_items(fresh, previous, now - timedelta(hours=48))
+        self.assertEqual([i.title for i in merged], ["New", "Kept"])
+
 
 class TestConfig(unittest.TestCase):
     def test_defaults(self):
@@ -93,6 +339,48 @@ class TestConfig(unittest.TestCase):
         self.assertEqual(cfg.hours, 24)
 
 
+class TestMultiProfile(unittest.TestCase):
+    def test_merge_profiles(self):
+        a = Config(sources={"A": "https://a/feed", "B": "https://b/feed"}, fallback_hours=48, cache_path="/tmp/a.json")
+        b = Config(sources={"B": "https://b/feed", "C": "https://c/feed"}, fallback_hours=72, cache_path="/tmp/b.json")
+        merged = merge_profiles([a, b])
+        self.assertEqual(list(merged.sources), ["A", "B", "C"])
+        self.assertEqual(merged.fallback_hours, 72)
+        self.assertEqual(merged.cache_path, "/tmp/a.json")
+
+    def test_name_conflict_keeps_first(self):
+        a = Config(sources={"A": "https://a/feed"})
+        b = Config(sources={"A": "https://other/feed"})
+        self.assertEqual(merge_profiles([a, b]).sources["A"], "https://a/feed")
+
+    @patch("generate_rss_news.translate_text")
+    def test_shared_items_are_copies(self, mock_translate):
+        mock_translate.return_value = "翻译后的人工智能标题内容"
+        now = datetime.now(timezone.utc)
+        pubdate = now.strftime("%a, %d %b %Y %H:%M:%S +0000")
+        items = [
+            NewsItem(title="AI one", link="https://a/1", pubdate=pubdate, source="A"),
+            NewsItem(title="AI two", link="https://c/1", pubdate=pubdate, source="C"),
+        ]
+        with TranslationStage() as translator:
+            _, selected = build_digest(Config(sources={"A": "https://a/feed"}), items, now, translator, shared=True)
+        self.assertEqual([i.original_title for i in selected], ["AI one"])
+        self.assertNotEqual(selected[0].title, "AI one")
+        self.assertEqual(items[0].title, "AI one")
+
+    @patch("generate_rss_news.translate_text")
+    def test_shared_translations(self, mock_translate):
+        mock_translate.return_value = "翻译后的人工智能标题内容"
+        now = datetime.now(timezone.utc)
+        pubdate = now.strftime("%a, %d %b %Y %H:%M:%S +0000")
+        items = [NewsItem(title="New AI model released", link="https://a/1", pubdate=pubdate, source="A")]
+        with TranslationStage() as translator:
+            for keywords in (["AI"], ["model"]):
+                cfg = Config(sources={"A": "https://a/feed"}, include_keywords=keywords)
+                build_digest(cfg, items, now, translator, shared=True)
+        self.assertEqual(mock_translate.call_count, 1)
+
+
 class TestParseDate(unittest.TestCase):
     def test_rfc2822(self):
         dt = parse_date("Mon, 01 Jan 2024 12:00:00 +0000")
@@ -246,6 +534,159 @@ class TestFilterItems(unittest.TestCase):
         self.assertEqual(primary[0].title, "AI 技术突破")
 
 
+class TestStreamingSelection(unittest.TestCase):
+    def items(self, hours_ago, prefix="AI 新闻", source="A"):
+        now = datetime.now(timezone.utc)
+        return [
+            NewsItem(
+                title=f"{prefix} 第{i}条",
+                link=f"https://example.com/{prefix}/{i}",
+                pubdate=(now - timedelta(hours=h)).strftime("%a, %d %b %Y %H:%M:%S +0000"),
+                source=source,
+            )
+            for i, h in enumerate(hours_ago)
+        ]
+
+    def test_select_top_matches_stable_sort(self):
+        base = datetime(2024, 5, 1, tzinfo=timezone.utc)
+        items = [
+            NewsItem(title=str(i), link="", score=float(i % 3), dt=base if i % 2 else None)
+            for i in range(20)
+        ]
+        expected = sorted(items, key=lambda x: (x.score, x.dt or datetime.min.replace(tzinfo=timezone.utc)), reverse=True)
+        self.assertEqual(select_top(iter(items), 5), expected[:5])
+        self.assertEqual(select_top(iter(items), 0), expected)
+
+    def test_dedupe_is_lazy(self):
+        pulled = []
+
+        def source():
+            for it in self.items([1, 1, 1]):
+                pulled.append(it)
+                yield it
+
+        stream = iter_deduped(source())
+        next(stream)
+        self.assertEqual(len(pulled), 1)
+
+    def test_fallback_window_used_only_when_primary_empty(self):
+        cfg = Config(sources={"A": "https://a/feed"}, include_keywords=["AI"], max_items=2)
+        now = datetime.now(timezone.utc)
+        _, result = build_digest(cfg, self.items([30, 1, 2, 40, 3]), now)
+        self.assertEqual([it.original_title for it in result], ["AI 新闻 第1条", "AI 新闻 第2条"])
+
+        _, result = build_digest(cfg, self.items([30, 40, 100]), now)
+        self.assertEqual([it.original_title for it in result], ["AI 新闻 第0条", "AI 新闻 第1条"])
+
+    def test_shared_items_copied_after_filter(self):
+        cfg = Config(sources={"A": "https://a/feed"}, include_keywords=["AI"])
+        items = self.items([1]) + self.items([1], source="C") + self.items([1], prefix="体育")
+        _, result = build_digest(cfg, items, datetime.now(timezone.utc), shared=True)
+        self.assertEqual([it.original_title for it in result], ["AI 新闻 第0条"])
+        self.assertIsNot(result[0], items[0])
+        self.assertEqual(items[0].score, 0.0)
+
+
+class TestHistogram(unittest.TestCase):
+    def test_percentiles(self):
+        h = Histogram([1, 2, 4])
+        for v in [0.5] * 90 + [1.5] * 9 + [3]:
+            h.add(v)
+        self.assertLessEqual(h.percentile(0.5), 1)
+        self.assertTrue(1 < h.percentile(0.95) <= 2)
+        self.assertTrue(1 < h.percentile(0.99) <= 2)
+        self.assertTrue(2 < h.percentile(1.0) <= 4)
+
+    def test_overflow_and_empty(self):
+        h = Histogram([1, 2])
+        self.assertEqual(h.percentile(0.5), 0.0)
+        h.add(100)
+        self.assertEqual(h.percentile(0.99), 4)
+
+
+class TestLatencyStats(unittest.TestCase):
+    def test_timeout_needs_history(self):
+        stats = LatencyStats()
+        stats.observe("A", 0.2, 1000)
+        self.assertEqual(stats.timeout_for("A", 25), 25)
+
+    def test_adaptive_timeout(self):
+        stats = LatencyStats()
+        for _ in range(20):
+            stats.observe("fast", 0.3, 2000)
+            stats.observe("slow", 8.0, 2000)
+            stats.observe("stuck", 60.0, 0, "超时")
+        self.assertEqual(stats.timeout_for("fast", 25), TIMEOUT_MIN)
+        self.assertTrue(TIMEOUT_MIN < stats.timeout_for("slow", 25) <= 25)
+        self.assertEqual(stats.timeout_for("stuck", 25), 25)
+
+    def test_fast_failures_not_latency(self):
+        stats = LatencyStats()
+        stats.observe("A", 0.01, 0, "DNS解析失败")
+        self.assertIsNone(stats.summary("A"))
+        self.assertEqual(stats.combined("A").failures, 1)
+
+    def test_persist_with_decay(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "latency.json")
+            first = LatencyStats(path)
+            for _ in range(10):
+                first.observe("A", 0.4, 4096)
+            first.save()
+            second = LatencyStats(path)
+            self.assertAlmostEqual(second.history["A"].latency.total, 10)
+            summary = second.summary("A")
+            self.assertTrue(0.35 < summary["p50"] <= 0.5)
+            self.assertEqual(len(second.history["A"].latency.counts), len(LATENCY_BUCKETS) + 1)
+            second.observe("A", 0.4, 4096)
+            second.save()
+            self.assertAlmostEqual(LatencyStats(path).history["A"].latency.total, 10 * 0.9 + 1)
+
+
+class TestTranslationStage(unittest.TestCase):
+    @patch("generate_rss_news.translate_text")
+    def test_submit_once(self, mock_translate):
+        mock_translate.side_effect = lambda text, *a, **k: "译文"
+        with TranslationStage() as translator:
+            translator.submit("Hello world")
+            translator.submit("Hello world")
+            translator.submit("已经是中文标题")
+            self.assertEqual(translator.translate("Hello world"), "译文")
+            self.assertEqual(translator.translate("已经是中文标题"), "已经是中文标题")
+            self.assertEqual(translator.submitted, 1)
+        self.assertEqual(mock_translate.call_count, 1)
+
+    @patch("generate_rss_news.translate_text")
+    def test_memory_fast_path(self, mock_translate):
+        from translation_memory import TranslationMemory
+        with TranslationStage(memory=TranslationMemory()) as translator:
+            self.assertEqual(translator.translate("Anthropic releases Claude 4"), "Anthropic 发布 Claude 4")
+        mock_translate.assert_not_called()
+
+    @patch("generate_rss_news.translate_text")
+    def test_failure_keeps_original(self, mock_translate):
+        mock_translate.side_effect = RuntimeError("boom")
+        with TranslationStage() as translator:
+            self.assertEqual(translator.translate("Hello world"), "Hello world")
+
+
+class TestPrefilter(unittest.TestCase):
+    def test_candidates_across_profiles(self):
+        now = datetime.now(timezone.utc)
+        recent = (now - timedelta(hours=1)).strftime("%a, %d %b %Y %H:%M:%S +0000")
+        old = (now - timedelta(hours=100)).strftime("%a, %d %b %Y %H:%M:%S +0000")
+        is_candidate = make_prefilter([
+            Config(sources={"A": "a"}, include_keywords=["AI"], exclude_keywords=["funding"]),
+            Config(sources={"B": "b"}, include_keywords=["IPO"], exclude_keywords=[]),
+        ], now)
+        self.assertTrue(is_candidate(NewsItem(title="New AI model", link="l", pubdate=recent, source="A")))
+        self.assertTrue(is_candidate(NewsItem(title="Chip maker IPO", link="l", pubdate=recent, source="B")))
+        self.assertFalse(is_candidate(NewsItem(title="Chip maker IPO", link="l", pubdate=recent, source="A")))
+        self.assertFalse(is_candidate(NewsItem(title="AI funding round", link="l", pubdate=recent, source="A")))
+        self.assertFalse(is_candidate(NewsItem(title="New AI model", link="l", pubdate=old, source="A")))
+        self.assertFalse(is_candidate(NewsItem(title="New AI model", link="l", source="A")))
+
+
 class TestGenerateMarkdown(unittest.TestCase):
     def test_empty_items(self):
         md = generate_markdown([], 24, [])
@@ -276,6 +717,324 @@ class TestGenerateMarkdown(unittest.TestCase):
         md = generate_markdown(items, 24, ["OpenAI"])
         self.assertIn("重点速递", md)
 
+    @patch("generate_rss_news.translate_text")
+    def test_no_translation_while_rendering(self, mock_translate):
+        items = [
+            NewsItem(title="OpenAI 发布新模型", link="https://example.com/1", source="A",
+                     description="An English description"),
+            NewsItem(title="普通条目", link="https://example.com/2", source="B"),
+        ]
+        md = generate_markdown(items, 24, ["OpenAI"])
+        mock_translate.assert_not_called()
+        self.assertIn("💬 An English description...", md)
+        self.assertIn("🔥 1 + 📊 1", md)
+
+    @patch("generate_rss_news.translate_text")
+    def test_build_digest_translates_hot_summary(self, mock_translate):
+        mock_translate.side_effect = lambda text, *a, **k: "翻译：" + text
+        now = datetime.now(timezone.utc)
+        pubdate = now.strftime("%a, %d %b %Y %H:%M:%S +0000")
+        items = [NewsItem(title="OpenAI 发布新的 AI 模型 GPT 系列", link="https://a/1", source="A",
+                          description="English summary", pubdate=pubdate)]
+        cfg = Config(sources={"A": "https://a/feed"}, include_keywords=["AI"], hot_keywords=["OpenAI"])
+        rendered, result = build_digest(cfg, items, now, formats=("markdown", "html"))
+        self.assertTrue(result[0].hot)
+        self.assertIn("翻译：English summary", rendered["markdown"])
+        self.assertIn("翻译：English summary", rendered["html"])
+
+
+class TestLibraryAPI(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.now = datetime.now(timezone.utc)
+        pubdate = self.now.strftime("%a, %d %b %Y %H:%M:%S +0000")
+        self.cfg = Config(
+            sources={"A": "https://a/feed", "B": "https://b/feed"},
+            include_keywords=["AI"],
+            hot_keywords=["OpenAI"],
+            cache_path=str(Path(self.tmp.name) / "cache.json"),
+            translation_memory_path=str(Path(self.tmp.name) / "tm.json"),
+            latency_stats_path=str(Path(self.tmp.name) / "latency.json"),
+            archive_dir=str(Path(self.tmp.name) / "archive"),
+        )
+        titles = {"A": "智谱发布新一代 AI 大模型", "B": "开源社区推出 AI 编程助手"}
+        cache = {}
+        for name, url in self.cfg.sources.items():
+            entry = CacheEntry(timestamp=self.now.timestamp())
+            entry.store_items([NewsItem(title=titles[name], link=f"{url}/1", pubdate=pubdate, source=name)])
+            cache[url] = entry
+        save_cache(self.cfg.cache_path, cache)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @patch("generate_rss_news.fetch")
+    def test_cache_only_digest(self, mock_fetch):
+        digest = generate_digest(self.cfg, cache_only=True, now=self.now, formats=("markdown", "json_feed"))
+        mock_fetch.assert_not_called()
+        self.assertIsInstance(digest, Digest)
+        self.assertEqual(len(digest.items), 2)
+        self.assertIn("智谱发布新一代 AI 大模型", digest.markdown)
+        self.assertEqual(len(json.loads(digest.rendered["json_feed"])["items"]), 2)
+
+    def test_profiles_share_cached_items(self):
+        other = Config(**{**self.cfg.__dict__, "sources": {"B": "https://b/feed"}, "name": "b"})
+        digests = generate_digests([self.cfg, other], cache_only=True, now=self.now)
+        self.assertEqual([len(d.items) for d in digests], [2, 1])
+        self.assertIs(digests[1].config, other)
+
+
+    def test_cache_only_restores_archived_items(self):
+        store = ItemArchive(self.cfg.archive_dir)
+        fmt = "%a, %d %b %Y %H:%M:%S +0000"
+        store.append([
+            NewsItem(title="已滚出 feed 的 AI 新闻", link="https://a/feed/old",
+                     pubdate=(self.now - timedelta(hours=10)).strftime(fmt), source="A"),
+            NewsItem(title="回溯时刻之后的 AI 新闻", link="https://a/feed/new",
+                     pubdate=(self.now + timedelta(hours=1)).strftime(fmt), source="A"),
+            NewsItem(title="其他源的 AI 新闻", link="https://c/feed/1",
+                     pubdate=self.now.strftime(fmt), source="C"),
+        ], self.now)
+        digest = generate_digest(self.cfg, cache_only=True, now=self.now)
+        titles = [it.original_title or it.title for it in digest.items]
+        self.assertIn("已滚出 feed 的 AI 新闻", titles)
+        self.assertNotIn("回溯时刻之后的 AI 新闻", titles)
+        self.assertNotIn("其他源的 AI 新闻", titles)
+
+
+class TestColdStart(unittest.TestCase):
+    def test_heavy_modules_not_imported(self):
+        code = (
+            "import sys, generate_rss_news; "
+            "print(','.join(m for m in ('feedparser', 'argparse', 'digest_server', 'cProfile', 'tracemalloc') "
+            "if m in sys.modules))"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=Path(__file__).parent, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        self.assertEqual(out, "")
+
+    def test_config_name_from_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "finance.json"
+            path.write_text("{}", encoding="utf-8")
+            self.assertEqual(Config.from_file(str(path)).name, "finance")
+
+
+ARXIV_ATOM = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom">
+  <entry>
+    <id>http://arxiv.org/abs/2401.00001v1</id>
+    <title>Vision Transformers at Scale</title>
+    <published>2024-01-02T10:00:00Z</published>
+    <link href="http://arxiv.org/abs/2401.00001v1" rel="alternate" type="text/html"/>
+    <author><name>Alice</name></author>
+    <arxiv:primary_category term="cs.CV"/>
+    <category term="cs.CV"/><category term="cs.LG"/>
+  </entry>
+  <entry>
+    <id>http://arxiv.org/abs/2401.00002v1</id>
+    <title>Agents That Plan</title>
+    <published>2024-01-02T12:30:00Z</published>
+    <link href="http://arxiv.org/abs/2401.00002v1" rel="alternate" type="text/html"/>
+    <author><name>Bob</name></author>
+    <arxiv:primary_category term="stat.ML"/>
+    <category term="stat.ML"/><category term="cs.AI"/>
+  </entry>
+</feed>
+"""
+
+
+class TestArxivSources(unittest.TestCase):
+    SOURCES = {
+        "arXiv AI": "http://export.arxiv.org/api/query?search_query=cat:cs.AI&sortBy=submittedDate&sortOrder=descending&max_results=15",
+        "arXiv CV": "http://export.arxiv.org/api/query?search_query=cat:cs.CV&sortBy=submittedDate&sortOrder=descending&max_results=10",
+        "OpenAI": "https://openai.com/blog/rss.xml",
+    }
+
+    def test_split(self):
+        categories, page_size, others = split_arxiv_sources(self.SOURCES)
+        self.assertEqual(categories, {"cs.AI": "arXiv AI", "cs.CV": "arXiv CV"})
+        self.assertEqual(page_size, 25)
+        self.assertEqual(list(others), ["OpenAI"])
+
+    def test_query_url(self):
+        since = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+        until = datetime(2024, 1, 2, 8, 0, tzinfo=timezone.utc)
+        url = arxiv_query_url(["cs.AI", "cs.CV"], since, until, 25, 25)
+        from urllib.parse import parse_qs, urlparse
+        params = parse_qs(urlparse(url).query)
+        self.assertEqual(
+            params["search_query"][0],
+            "(cat:cs.AI OR cat:cs.CV) AND submittedDate:[202401010800 TO 202401020800]",
+        )
+        self.assertEqual(params["start"][0], "25")
+
+    @patch("generate_rss_news.fetch_attempt")
+    def test_fetch_splits_by_category(self, mock_fetch):
+        mock_fetch.return_value = ((ARXIV_ATOM, CacheEntry(), False, ""), None)
+        since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        by_source, cursor, error = fetch_arxiv(
+            {"cs.AI": "arXiv AI", "cs.CV": "arXiv CV"}, since=since, page_size=10
+        )
+        self.assertEqual(error, "")
+        self.assertEqual(mock_fetch.call_count, 1)
+        self.assertEqual([i.title for i in by_source["arXiv CV"]], ["[论文] Vision Transformers at Scale"])
+        self.assertEqual([i.source for i in by_source["arXiv AI"]], ["arXiv AI"])
+        self.assertEqual(cursor, "2024-01-02T12:30:00+00:00")
+
+    @patch("generate_rss_news.ARXIV_PAGE_DELAY", 0.0)
+    @patch("generate_rss_news.fetch_attempt")
+    def test_fetch_pages_when_full(self, mock_fetch):
+        mock_fetch.side_effect = [
+            ((ARXIV_ATOM, CacheEntry(), False, ""), None),
+            (("<feed xmlns='http://www.w3.org/2005/Atom'></feed>", CacheEntry(), False, ""), None),
+        ]
+        since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        fetch_arxiv({"cs.AI": "arXiv AI", "cs.CV": "arXiv CV"}, since=since, page_size=2)
+        self.assertEqual(mock_fetch.call_count, 2)
+        self.assertIn("start=2", mock_fetch.call_args_list[1][0][0])
+
+    @patch("generate_rss_news.ARXIV_PAGE_DELAY", 0.0)
+    @patch("generate_rss_news.fetch_attempt")
+    def test_later_page_failure_keeps_cursor(self, mock_fetch):
+        mock_fetch.side_effect = [
+            ((ARXIV_ATOM, CacheEntry(), False, ""), None),
+            (("", CacheEntry(), False, "超时"), None),
+        ]
+        since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        with self.assertLogs(level="WARNING"):
+            by_source, cursor, error = fetch_arxiv(
+                {"cs.AI": "arXiv AI", "cs.CV": "arXiv CV"}, since=since, page_size=2
+            )
+        self.assertEqual(error, "")
+        self.assertEqual(cursor, since.isoformat())
+        self.assertEqual(len(by_source["arXiv CV"]), 1)
+
+    @patch("generate_rss_news.ARXIV_PAGE_DELAY", 0.0)
+    @patch("generate_rss_news.fetch_attempt")
+    def test_page_cap_keeps_oldest_cursor(self, mock_fetch):
+        mock_fetch.return_value = ((ARXIV_ATOM, CacheEntry(), False, ""), None)
+        since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        with self.assertLogs(level="WARNING"):
+            _, cursor, _ = fetch_arxiv(
+                {"cs.AI": "arXiv AI", "cs.CV": "arXiv CV"}, since=since, page_size=2, max_pages=2
+            )
+        self.assertEqual(mock_fetch.call_count, 2)
+        self.assertEqual(cursor, "2024-01-02T10:00:00+00:00")
+
+    @patch("generate_rss_news.fetch_attempt")
+    def test_first_page_failure_uses_cache(self, mock_fetch):
+        mock_fetch.return_value = (("", CacheEntry(), False, "超时"), None)
+        now = datetime.now(timezone.utc)
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = Config(
+                sources={name: url for name, url in self.SOURCES.items() if name.startswith("arXiv")},
+                cache_path=str(Path(tmp) / "cache.json"),
+            )
+            key = split_arxiv_sources(cfg.sources)[0]
+            entry = CacheEntry(timestamp=now.timestamp() - 60, cursor=now.isoformat())
+            entry.store_items([
+                NewsItem(title="New", link="https://arxiv.org/abs/1", pubdate=now.isoformat(), source="arXiv AI"),
+                NewsItem(title="Old", link="https://arxiv.org/abs/2", pubdate="2000-01-01T00:00:00Z", source="arXiv AI"),
+            ])
+            save_cache(cfg.cache_path, {arxiv_cache_key(key): entry})
+            items, results, stats = fetch_all_sources(cfg, insecure_ssl=False, now_utc=now)
+        self.assertEqual([it.title for it in items], ["New"])
+        self.assertEqual(results["arXiv AI"], (1, "stale", "超时"))
+        self.assertEqual(results["arXiv CV"], (0, "stale", "超时"))
+        self.assertEqual(stats["failed"], 0)
+
+    @patch("generate_rss_news.fetch_attempt")
+    def test_fetch_error(self, mock_fetch):
+        mock_fetch.return_value = (("", CacheEntry(), False, "超时"), None)
+        by_source, cursor, error = fetch_arxiv(
+            {"cs.AI": "arXiv AI"}, since=datetime(2024, 1, 1, tzinfo=timezone.utc), page_size=10
+        )
+        self.assertEqual((by_source, cursor, error), ({}, "", "超时"))
+
+    @patch("generate_rss_news.ARXIV_PAGE_DELAY", 0.3)
+    @patch("generate_rss_news.fetch_attempt")
+    def test_page_delay_does_not_hold_worker(self, mock_fetch):
+        mock_fetch.side_effect = [
+            ((ARXIV_ATOM, CacheEntry(), False, ""), None),
+            (("<feed xmlns='http://www.w3.org/2005/Atom'></feed>", CacheEntry(), False, ""), None),
+        ]
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            scheduler = RetryScheduler(executor)
+            arxiv = submit_arxiv(
+                {"cs.AI": "arXiv AI", "cs.CV": "arXiv CV"},
+                since=datetime(2024, 1, 1, tzinfo=timezone.utc), page_size=2, scheduler=scheduler,
+            )
+            # 翻页等待期间唯一的工作线程应可执行其他任务
+            ran_at = executor.submit(time.monotonic).result(timeout=5)
+            arxiv.result(timeout=5)
+            self.assertLess(ran_at + 0.2, time.monotonic())
+        self.assertEqual(mock_fetch.call_count, 2)
+
+
+LISTING_HTML = """<html><body>
+<nav><a href="/news/nav-link">Nav</a></nav>
+<main>
+  <a href="/news/claude-4"><h3>Introducing Claude 4</h3><span>Product</span><time datetime="2024-05-22T00:00:00Z">May 22, 2024</time></a>
+  <a href="/news/claude-4">Duplicate</a>
+  <a href="https://www.anthropic.com/news/safety-update"><h3>Safety &amp; Policy Update</h3> May 20, 2024</a>
+  <a href="/careers">Careers</a>
+  <a href="/news/third-post">Third post text</a>
+</main>
+<footer><a href="/news/footer-link">Footer</a></footer>
+</body></html>"""
+
+
+class TestParseHtmlListing(unittest.TestCase):
+    SPEC = {
+        "link_pattern": r"^/news/[a-z0-9-]+$",
+        "base_url": "https://www.anthropic.com",
+        "region_start": "<main>",
+        "region_end": "</main>",
+        "date_regex": r"(\w+\s+\d+,\s+\d{4})",
+    }
+
+    def test_extracts_listing_region(self):
+        items = parse_html_listing(LISTING_HTML, "Anthropic", self.SPEC)
+        self.assertEqual(
+            [i.link for i in items],
+            [
+                "https://www.anthropic.com/news/claude-4",
+                "https://www.anthropic.com/news/safety-update",
+                "https://www.anthropic.com/news/third-post",
+            ],
+        )
+        self.assertEqual(items[0].title, "Introducing Claude 4")
+        self.assertEqual(items[0].pubdate, "2024-05-22T00:00:00Z")
+        self.assertEqual(items[1].title, "Safety & Policy Update")
+        self.assertEqual(items[1].pubdate, "May 20, 2024")
+        self.assertEqual(items[2].title, "Third post text")
+
+    def test_max_items_and_slug_title(self):
+        spec = dict(self.SPEC, max_items=1, title="slug")
+        items = parse_html_listing(LISTING_HTML, "Anthropic", spec)
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items[0].title, "Claude 4")
+
+    def test_without_region(self):
+        spec = {"link_pattern": r"^/news/", "base_url": "https://www.anthropic.com"}
+        items = parse_html_listing(LISTING_HTML, "Anthropic", spec)
+        self.assertEqual(items[0].link, "https://www.anthropic.com/news/nav-link")
+        self.assertEqual(items[-1].link, "https://www.anthropic.com/news/footer-link")
+
+    @patch("generate_rss_news.enrich_single_item")
+    def test_enrich_policy(self, mock_enrich):
+        items = [
+            NewsItem(title="A", link="https://example.com/a", pubdate="May 20, 2024"),
+            NewsItem(title="B", link="https://example.com/b"),
+        ]
+        enrich_html_items(items, {"enrich": "never"})
+        self.assertEqual(mock_enrich.call_count, 0)
+        enrich_html_items(items, {"enrich": "missing"})
+        self.assertEqual(mock_enrich.call_count, 1)
+        self.assertEqual(mock_enrich.call_args[0][0].title, "B")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import hotsearch
+from hotsearch import (
+    ResponseCache,
+    TokenBucket,
+    fetch_api_json,
+    diff_top_news,
+    has_changes,
+    format_delta_message,
+    load_push_state,
+    save_push_state,
+    extract_keywords,
+    calculate_similarity,
+    select_top_news,
+    HotProvider,
+    PROVIDERS,
+    register_provider,
+    parse_uapi,
+    get_all_hot_lists,
+    get_platform_name,
+    get_platform_weight,
+)
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(Path(self.tmp.name))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hit_within_ttl(self):
+        self.cache.set("https://example.com/a", {"list": [1]})
+        self.assertEqual(self.cache.get("https://example.com/a", 60), {"list": [1]})
+
+    def test_expired(self):
+        self.cache.set("https://example.com/a", {"list": [1]})
+        with patch("hotsearch.time.time", return_value=time.time() + 120):
+            self.assertIsNone(self.cache.get("https://example.com/a", 60))
+
+    def test_zero_ttl_disables(self):
+        self.cache.set("https://example.com/a", {"list": [1]})
+        self.assertIsNone(self.cache.get("https://example.com/a", 0))
+
+    def test_miss(self):
+        self.assertIsNone(self.cache.get("https://example.com/missing", 60))
+
+
+class TestTokenBucket(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "bucket.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_burst_then_wait(self):
+        bucket = TokenBucket(self.path, rate=0.5, burst=2)
+        self.assertEqual(bucket.try_acquire(), 0)
+        self.assertEqual(bucket.try_acquire(), 0)
+        self.assertGreater(bucket.try_acquire(), 0)
+
+    def test_shared_state(self):
+        TokenBucket(self.path, rate=0.01, burst=1).try_acquire()
+        other = TokenBucket(self.path, rate=0.01, burst=1)
+        self.assertFalse(other.acquire(max_wait=0))
+
+
+class TestFetchApiJson(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patches = [
+            patch.object(hotsearch, "CACHE_DIR", Path(self.tmp.name)),
+            patch.object(hotsearch, "RESPONSE_CACHE", ResponseCache(Path(self.tmp.name))),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    @patch("hotsearch.fetch_json")
+    def test_reuses_fresh_response(self, mock_fetch):
+        mock_fetch.return_value = {"list": [{"title": "a"}]}
+        _, cached = fetch_api_json("https://example.com/hot", "uapi", is_valid=lambda d: "list" in d)
+        self.assertFalse(cached)
+        data, cached = fetch_api_json("https://example.com/hot", "uapi", is_valid=lambda d: "list" in d)
+        self.assertTrue(cached)
+        self.assertEqual(data["list"][0]["title"], "a")
+        self.assertEqual(mock_fetch.call_count, 1)
+
+    @patch("hotsearch.fetch_json")
+    def test_invalid_response_not_cached(self, mock_fetch):
+        mock_fetch.return_value = {"code": 250, "msg": "error"}
+        fetch_api_json("https://example.com/wx", "uapi", is_valid=lambda d: d.get("code") == 200)
+        fetch_api_json("https://example.com/wx", "uapi", is_valid=lambda d: d.get("code") == 200)
+        self.assertEqual(mock_fetch.call_count, 2)
+
+
+class TestExtractKeywords(unittest.TestCase):
+    def test_cjk_bigrams(self):
+        self.assertEqual(extract_keywords("日本首相"), {"日本", "本首", "首相"})
+
+    def test_mixed_script(self):
+        kw = extract_keywords("OpenAI发布GPT-5")
+        self.assertIn("openai", kw)
+        self.assertIn("发布", kw)
+        self.assertIn("gpt5", kw)
+
+    def test_stop_word_bigrams_dropped(self):
+        self.assertNotIn("再次", extract_keywords("再次当选"))
+
+    def test_single_char_run(self):
+        self.assertEqual(extract_keywords("AI 火"), {"ai", "火"})
+
+    def test_memoized(self):
+        self.assertIs(extract_keywords("春晚机器人厉害在哪里"), extract_keywords("春晚机器人厉害在哪里"))
+
+
+class TestSelectTopNews(unittest.TestCase):
+    def test_similar_titles_cluster(self):
+        self.assertGreaterEqual(calculate_similarity("高市早苗再次当选日本首相", "高市早苗当选日本首相"), 0.6)
+        items = [
+            {"title": "高市早苗再次当选日本首相", "platform": "weibo", "source": "微博", "rank": 1, "weight": 1.0, "url": "", "hot": "100"},
+            {"title": "高市早苗当选日本首相！", "platform": "baidu", "source": "百度", "rank": 2, "weight": 1.0, "url": "", "hot": ""},
+            {"title": "春晚机器人厉害在哪里", "platform": "zhihu", "source": "知乎", "rank": 1, "weight": 0.9, "url": "", "hot": ""},
+        ]
+        top = select_top_news(items, top_n=10)
+        self.assertEqual(len(top), 2)
+        self.assertEqual(top[0]["platform_count"], 2)
+
+    NEAR_DUPLICATES = [
+        ("小米汽车发布", "小米汽车正式发布"),
+        ("苹果发布iPhone 17", "苹果正式发布iPhone 17"),
+        ("华为Mate80开售", "华为Mate80正式开售"),
+        ("台风桦加沙登陆广东", "台风桦加沙在广东登陆"),
+        ("周杰伦演唱会门票秒空", "周杰伦演唱会门票开售即秒空"),
+    ]
+    DISTINCT = [
+        ("小米汽车发布", "小米手机发布"),
+        ("苹果发布iPhone 17", "华为发布Mate80"),
+        ("台风桦加沙登陆广东", "台风桦加沙逼近香港"),
+        ("国足1比0战胜泰国", "国足0比2不敌日本"),
+        ("日本首相访华", "韩国总统访华"),
+    ]
+
+    def cluster_count(self, a, b):
+        items = [
+            {"title": t, "platform": p, "source": p, "rank": 1, "weight": 1.0, "url": "", "hot": ""}
+            for t, p in ((a, "weibo"), (b, "baidu"))
+        ]
+        return len(select_top_news(items, top_n=10))
+
+    def test_near_duplicates_cluster(self):
+        for a, b in self.NEAR_DUPLICATES:
+            with self.subTest(a=a, b=b):
+                self.assertEqual(self.cluster_count(a, b), 1)
+
+    def test_distinct_titles_stay_apart(self):
+        for a, b in self.DISTINCT:
+            with self.subTest(a=a, b=b):
+                self.assertEqual(self.cluster_count(a, b), 2)
+
+
+class TestProviderRegistry(unittest.TestCase):
+    def setUp(self):
+        self.patch = patch.dict(PROVIDERS)
+        self.patch.start()
+        register_provider(HotProvider(
+            key="demo", name="示例热榜", source="示例", api="uapi",
+            url="https://example.com/demo", parser=parse_uapi, weight=0.5,
+            is_valid=lambda d: "list" in d,
+        ))
+
+    def tearDown(self):
+        self.patch.stop()
+
+    def test_lookup(self):
+        self.assertEqual(get_platform_name("demo"), "示例热榜")
+        self.assertEqual(get_platform_weight("demo"), 0.5)
+        self.assertEqual(get_platform_name("unknown"), "unknown")
+        self.assertEqual(get_platform_weight("unknown"), 1.0)
+
+    def test_builtin_platforms(self):
+        for key in ["weibo", "baidu", "zhihu", "bilibili", "douyin", "toutiao", "weixin", "xiaohongshu"]:
+            self.assertIn(key, PROVIDERS)
+
+    @patch("hotsearch.fetch_api_json")
+    def test_fan_out(self, mock_fetch):
+        def fake(url, api, timeout, is_valid):
+            if url.endswith("demo"):
+                return {"list": [{"title": "示例", "hot_value": "1万", "url": "u"}]}, False
+            return {"error": "down"}, False
+        mock_fetch.side_effect = fake
+        results = get_all_hot_lists(["weibo", "demo", "nope"])
+        self.assertEqual(list(results), ["weibo", "demo"])
+        self.assertEqual(results["weibo"], [])
+        self.assertEqual(results["demo"][0]["platform"], "demo")
+        self.assertEqual(results["demo"][0]["weight"], 0.5)
+
+    @patch("hotsearch.fetch_api_json")
+    def test_shared_api_limit_ignores_registration_order(self, mock_fetch):
+        # demo 声明了更大的并发数，但同一 API 的共享上限只取自 API_LIMITS
+        register_provider(HotProvider(
+            key="demo", name="示例热榜", source="示例", api="uapi",
+            url="https://example.com/demo", parser=parse_uapi, concurrency=10,
+        ))
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def fake(url, api, timeout, is_valid):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.05)
+            with lock:
+                state["active"] -= 1
+            return {"list": []}, False
+
+        mock_fetch.side_effect = fake
+        limits = {**hotsearch.API_LIMITS, "uapi": {**hotsearch.API_LIMITS["uapi"], "concurrency": 2}}
+        with patch.dict(hotsearch._semaphores, clear=True), patch.dict(hotsearch.API_LIMITS, limits):
+            get_all_hot_lists(["demo", "weibo", "baidu", "zhihu", "douyin"])
+        self.assertEqual(state["peak"], 2)
+
+
+def make_top(titles):
+    return [{"title": t, "url": f"https://example.com/{i}", "hot": ""} for i, t in enumerate(titles)]
+
+
+class TestTopNewsDiff(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "state.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def previous(self, titles):
+        save_push_state(self.path, make_top(titles))
+        return load_push_state(self.path)
+
+    def test_unchanged(self):
+        titles = ["春晚机器人厉害在哪里", "高市早苗再次当选日本首相", "大年初二为何最好不要午睡"]
+        diff = diff_top_news(self.previous(titles), make_top(titles))
+        self.assertFalse(has_changes(diff))
+
+    def test_small_move_ignored(self):
+        prev = self.previous(["春晚机器人厉害在哪里", "高市早苗再次当选日本首相", "大年初二为何最好不要午睡"])
+        diff = diff_top_news(prev, make_top(["高市早苗再次当选日本首相", "春晚机器人厉害在哪里", "大年初二为何最好不要午睡"]))
+        self.assertFalse(has_changes(diff))
+
+    def test_enter_leave_move(self):
+        prev = self.previous(["春晚机器人厉害在哪里", "高市早苗再次当选日本首相", "大年初二为何最好不要午睡", "北京明天降温"])
+        current = make_top(["北京明天降温", "春晚机器人厉害在哪里", "高市早苗再次当选日本首相", "新能源汽车销量创新高"])
+        diff = diff_top_news(prev, current, threshold=3)
+        self.assertEqual([item["title"] for _, item in diff["entered"]], ["新能源汽车销量创新高"])
+        self.assertEqual([entry["title"] for entry in diff["left"]], ["大年初二为何最好不要午睡"])
+        self.assertEqual([(old, new) for old, new, _ in diff["moved"]], [(4, 1)])
+        message = format_delta_message(diff)
+        self.assertIn("新上榜", message)
+        self.assertIn("4→1", message)
+
+    def test_reworded_title_not_new(self):
+        prev = self.previous(["小米汽车发布", "台风桦加沙登陆广东"])
+        diff = diff_top_news(prev, make_top(["小米汽车正式发布", "台风桦加沙在广东登陆"]))
+        self.assertFalse(has_changes(diff))
+        diff = diff_top_news(prev, make_top(["小米手机发布", "台风桦加沙登陆广东"]))
+        self.assertEqual([item["title"] for _, item in diff["entered"]], ["小米手机发布"])
+
+    def test_missing_state(self):
+        self.assertEqual(load_push_state(self.path), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+import json
+import socket
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httprecord
+from httprecord import HTTPSession
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        if self.path == "/missing":
+            self.send_error(404)
+            return
+        body = f"hello {self.path} #{type(self).hits}".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def live_open(req):
+    return lambda: urllib.request.urlopen(req, timeout=5)
+
+
+class TestRecordReplay(unittest.TestCase):
+    def setUp(self):
+        StubHandler.hits = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+        httprecord.install(None)
+
+    def record(self, *paths):
+        session = HTTPSession(self.dir, httprecord.RECORD)
+        session.now(datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc))
+        bodies = []
+        for path in paths:
+            req = urllib.request.Request(self.base + path)
+            try:
+                with session.open(req, live_open(req)) as resp:
+                    bodies.append((resp.status, resp.read(), resp.headers.get("ETag")))
+            except urllib.error.HTTPError as e:
+                bodies.append((e.code, e.read(), None))
+        session.close()
+        return bodies
+
+    def replay(self, *paths, realtime=False):
+        session = HTTPSession(self.dir, httprecord.REPLAY, realtime)
+
+        def fail():
+            raise AssertionError("回放时不应访问网络")
+
+        bodies = []
+        for path in paths:
+            req = urllib.request.Request(self.base + path)
+            try:
+                with session.open(req, fail) as resp:
+                    bodies.append((resp.status, resp.read(), resp.headers.get("ETag")))
+            except urllib.error.HTTPError as e:
+                bodies.append((e.code, e.read(), None))
+        session.close()
+        return bodies
+
+    def test_replay_matches_recording(self):
+        recorded = self.record("/a", "/b", "/missing")
+        self.assertEqual(recorded[0], (200, b"hello /a #1", '"v1"'))
+        self.assertEqual(recorded[2][0], 404)
+
+        self.server.shutdown()
+        self.assertEqual(self.replay("/a", "/b", "/missing"), recorded)
+        self.assertEqual(StubHandler.hits, 3)
+
+    def test_repeated_requests_replay_in_order(self):
+        recorded = self.record("/a", "/a")
+        self.assertNotEqual(recorded[0], recorded[1])
+        replayed = self.replay("/a", "/a", "/a")
+        self.assertEqual(replayed[:2], recorded)
+        self.assertEqual(replayed[2], recorded[1])
+
+    def test_unrecorded_request_fails(self):
+        self.record("/a")
+        with self.assertRaises(urllib.error.URLError):
+            self.replay("/other")
+
+    def test_connection_error_is_replayed(self):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            dead = f"http://127.0.0.1:{s.getsockname()[1]}/x"
+        session = HTTPSession(self.dir, httprecord.RECORD)
+        session.now(datetime.now(timezone.utc))
+        req = urllib.request.Request(dead)
+        with self.assertRaises(urllib.error.URLError):
+            session.open(req, live_open(req))
+        session.close()
+
+        session = HTTPSession(self.dir, httprecord.REPLAY)
+        with self.assertRaises(urllib.error.URLError) as ctx:
+            session.open(urllib.request.Request(dead), lambda: None)
+        self.assertIn("refused", str(ctx.exception).lower())
+
+    def test_realtime_replay_waits(self):
+        self.record("/a")
+        exchange = next(Path(self.dir, "exchanges").glob("*.json"))
+        data = json.loads(exchange.read_text(encoding="utf-8"))
+        data["elapsed"] = 0.2
+        exchange.write_text(json.dumps(data), encoding="utf-8")
+        started = time.monotonic()
+        self.replay("/a", realtime=True)
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+
+    def test_clock_and_state_files(self):
+        state = Path(self.dir) / "live-cache.json"
+        state.write_text("before", encoding="utf-8")
+        session = HTTPSession(self.dir, httprecord.RECORD)
+        recorded_now = session.now(datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc))
+        self.assertEqual(session.state_file("cache.json", str(state)), str(state))
+        state.write_text("after", encoding="utf-8")
+        session.close()
+
+        session = HTTPSession(self.dir, httprecord.REPLAY)
+        self.assertEqual(session.now(datetime.now(timezone.utc)), recorded_now)
+        copy = session.state_file("cache.json", str(state))
+        self.assertNotEqual(copy, str(state))
+        self.assertEqual(Path(copy).read_text(encoding="utf-8"), "before")
+        session.close()
+        self.assertFalse(Path(copy).exists())
+
+    def test_state_dir(self):
+        live = Path(self.dir) / "archive"
+        (live / "segments").mkdir(parents=True)
+        (live / "index.json").write_text("before", encoding="utf-8")
+        session = HTTPSession(self.dir, httprecord.RECORD)
+        self.assertEqual(session.state_dir("archive", str(live)), str(live))
+        (live / "index.json").write_text("after", encoding="utf-8")
+        session.close()
+
+        session = HTTPSession(self.dir, httprecord.REPLAY)
+        copy = Path(session.state_dir("archive", str(live)))
+        self.assertEqual((copy / "index.json").read_text(encoding="utf-8"), "before")
+        self.assertTrue((copy / "segments").is_dir())
+        session.close()
+        self.assertFalse(copy.exists())
+
+    def test_hook_is_passthrough_when_inactive(self):
+        req = urllib.request.Request(self.base + "/a")
+        with httprecord.urlopen(req, live_open(req)) as resp:
+            self.assertEqual(resp.read(), b"hello /a #1")
+        self.assertFalse(Path(self.dir, "exchanges").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+from netroute import DIRECT, PROXY, Router, probe_proxy
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestProbe(unittest.TestCase):
+    def test_live_and_dead(self):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            s.listen()
+            self.assertTrue(probe_proxy(f"http://127.0.0.1:{s.getsockname()[1]}"))
+        self.assertFalse(probe_proxy(f"http://127.0.0.1:{free_port()}"))
+
+
+class TestChoose(unittest.TestCase):
+    def router(self):
+        return Router("http://127.0.0.1:7890", state_path="", probe=False)
+
+    def test_dead_proxy_goes_direct(self):
+        router = Router(f"http://127.0.0.1:{free_port()}", state_path="")
+        self.assertFalse(router.proxy_alive)
+        self.assertEqual(router.choose("openai.com"), [DIRECT])
+
+    def test_priors(self):
+        router = self.router()
+        self.assertEqual(router.choose("uapis.cn"), [DIRECT, PROXY])
+        self.assertEqual(router.choose("openai.com"), [PROXY, DIRECT])
+
+    def test_learns_faster_route(self):
+        router = self.router()
+        for _ in range(3):
+            router.record("openai.com", PROXY, 1.5, True)
+            router.record("openai.com", DIRECT, 0.2, True)
+        self.assertEqual(router.choose("openai.com")[0], DIRECT)
+
+    def test_failures_demote_route(self):
+        router = self.router()
+        router.record("uapis.cn", DIRECT, 0.1, True)
+        router.record("uapis.cn", PROXY, 0.5, True)
+        router.record("uapis.cn", DIRECT, 5.0, False)
+        self.assertEqual(router.choose("uapis.cn")[0], PROXY)
+
+    def test_persisted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "routes.json")
+            router = Router("http://127.0.0.1:7890", state_path=path, probe=False)
+            router.record("openai.com", DIRECT, 0.2, True)
+            router.record("openai.com", PROXY, 2.0, True)
+            router.save()
+            again = Router("http://127.0.0.1:7890", state_path=path, probe=False)
+            self.assertEqual(again.choose("openai.com")[0], DIRECT)
+
+
+class TestFallback(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), OkHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.env = patch.dict(os.environ, {"no_proxy": "", "NO_PROXY": ""})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connect_failure_switches_route(self):
+        router = Router(f"http://127.0.0.1:{free_port()}", state_path="", probe=False)
+        req = urllib.request.Request(f"http://127.0.0.1:{self.server.server_address[1]}/")
+        with router.open(req, timeout=2) as resp:
+            self.assertEqual(resp.read(), b"ok")
+        stats = router.hosts["127.0.0.1"]
+        self.assertEqual(stats[PROXY].failures, 1)
+        self.assertEqual(stats[DIRECT].samples, 1)
+        self.assertEqual(router.choose("127.0.0.1")[0], DIRECT)
+
+
+class FakeOpener:
+    def __init__(self, error=None, delay=0.0):
+        self.error = error
+        self.delay = delay
+        self.timeouts = []
+
+    def open(self, req, timeout):
+        self.timeouts.append(timeout)
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return "resp"
+
+
+class TestDeadline(unittest.TestCase):
+    def open_with(self, proxy, direct, timeout=1.0):
+        router = Router("http://127.0.0.1:7890", state_path="", probe=False)
+        openers = {PROXY: proxy, DIRECT: direct}
+        with patch.object(router, "_opener", side_effect=lambda route, context: openers[route]):
+            return router, router.open(urllib.request.Request("https://openai.com/"), timeout=timeout)
+
+    def test_timeout_does_not_fall_back(self):
+        proxy = FakeOpener(urllib.error.URLError(TimeoutError("timed out")))
+        direct = FakeOpener()
+        with self.assertRaises(urllib.error.URLError):
+            self.open_with(proxy, direct)
+        self.assertEqual(direct.timeouts, [])
+
+    def test_fallback_gets_remaining_time(self):
+        proxy = FakeOpener(urllib.error.URLError(ConnectionRefusedError("refused")), delay=0.3)
+        direct = FakeOpener()
+        router, resp = self.open_with(proxy, direct)
+        self.assertEqual(resp, "resp")
+        self.assertEqual(len(proxy.timeouts), 1)
+        self.assertLessEqual(direct.timeouts[0], 0.71)
+        self.assertEqual(router.hosts["openai.com"][PROXY].failures, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import random
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from outbox import FAILED, PENDING, SENT, SUPERSEDED, Outbox
+
+
+class Recorder:
+    """记录投递调用；fail 中的目标返回错误"""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+        self.lock = threading.Lock()
+
+    def __call__(self, target, message, delivery):
+        with self.lock:
+            self.calls.append((target, message.key))
+        return "boom" if target in self.fail else ""
+
+
+class TestOutbox(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.box = Outbox(self.tmp.name, rng=random.Random(1))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_enqueue_is_idempotent(self):
+        first = self.box.enqueue("text", "hello", ["a"], now=100)
+        second = self.box.enqueue("text", "hello", ["a"], now=200)
+        self.assertEqual(first.key, second.key)
+        self.assertEqual(second.created, 100)
+        self.assertEqual(len(self.box.pending()), 1)
+
+    def test_delivered_message_not_resent(self):
+        message = self.box.enqueue("text", "hello", ["a", "b"], now=100)
+        deliver = Recorder()
+        self.box.drain(deliver, now=100)
+        self.assertEqual(sorted(deliver.calls), [("a", message.key), ("b", message.key)])
+        self.assertEqual(self.box.pending(), [])
+        self.assertTrue(self.box.get(message.key).delivered)
+
+        again = self.box.enqueue("text", "hello", ["a", "b"], now=150)
+        self.assertTrue(again.delivered)
+        self.box.drain(deliver, now=150)
+        self.assertEqual(len(deliver.calls), 2)
+
+    def test_failed_target_retried_after_backoff(self):
+        message = self.box.enqueue("text", "hello", ["a", "b"], now=100)
+        self.box.drain(Recorder(fail={"a"}), now=100)
+        state = self.box.get(message.key)
+        self.assertEqual(state.targets["b"].status, SENT)
+        self.assertEqual(state.targets["a"].status, PENDING)
+        self.assertEqual(state.targets["a"].tries, 1)
+        self.assertLessEqual(state.targets["a"].due, 100 + self.box.base)
+
+        deliver = Recorder()
+        self.box.drain(deliver, now=state.targets["a"].due + 1)
+        self.assertEqual(deliver.calls, [("a", message.key)])
+        self.assertTrue(self.box.get(message.key).delivered)
+
+    def test_gives_up_after_max_tries(self):
+        box = Outbox(self.tmp.name, max_tries=2, base=0)
+        message = box.enqueue("text", "hello", ["a"], now=100)
+        box.drain(Recorder(fail={"a"}), now=100)
+        box.drain(Recorder(fail={"a"}), now=101)
+        state = box.get(message.key)
+        self.assertEqual(state.targets["a"].status, FAILED)
+        self.assertEqual(box.pending(), [])
+
+    def test_reenqueue_revives_failed_target(self):
+        box = Outbox(self.tmp.name, max_tries=1)
+        message = box.enqueue("text", "hello", ["a"], now=100)
+        box.drain(Recorder(fail={"a"}), now=100)
+        self.assertEqual(box.get(message.key).targets["a"].status, FAILED)
+
+        again = box.enqueue("text", "hello", ["a"], now=200)
+        self.assertEqual(again.targets["a"].status, PENDING)
+        deliver = Recorder()
+        box.drain(deliver, now=200)
+        self.assertEqual(deliver.calls, [("a", message.key)])
+        self.assertTrue(box.get(message.key).delivered)
+
+    def test_new_target_added_to_sent_message(self):
+        message = self.box.enqueue("text", "hello", ["a"], now=100)
+        self.box.drain(Recorder(), now=100)
+        again = self.box.enqueue("text", "hello", ["b"], now=150)
+        self.assertEqual(again.targets["a"].status, SENT)
+        self.assertEqual(again.targets["b"].status, PENDING)
+
+        deliver = Recorder()
+        self.box.drain(deliver, now=150)
+        self.assertEqual(deliver.calls, [("b", message.key)])
+        self.assertTrue(self.box.get(message.key).delivered)
+
+    def test_force_ignores_backoff(self):
+        message = self.box.enqueue("text", "hello", ["a"], now=100)
+        self.box.drain(Recorder(fail={"a"}), now=100)
+        self.assertGreater(self.box.get(message.key).targets["a"].due, 100)
+        deliver = Recorder()
+        self.box.drain(deliver, now=100)
+        self.assertEqual(deliver.calls, [])
+        self.box.drain(deliver, now=100, force=True)
+        self.assertEqual(deliver.calls, [("a", message.key)])
+
+    def test_order_kept_per_target(self):
+        first = self.box.enqueue("text", "one", ["a"], now=100)
+        self.box.enqueue("text", "two", ["a"], now=101)
+        deliver = Recorder(fail={"a"})
+        self.box.drain(deliver, now=102)
+        self.assertEqual(deliver.calls, [("a", first.key)])
+        self.assertEqual(len(self.box.pending()), 2)
+
+    def test_progress_survives_failure(self):
+        def partial(target, message, delivery):
+            delivery.progress += 1
+            return "second chunk failed"
+
+        message = self.box.enqueue("text", "hello", ["a"], now=100)
+        self.box.drain(partial, now=100)
+        self.assertEqual(self.box.get(message.key).targets["a"].progress, 1)
+
+    def test_group_supersedes_unsent(self):
+        old = self.box.enqueue("text", "old", ["a"], group="hot", now=100)
+        new = self.box.enqueue("text", "new", ["a"], group="hot", now=101)
+        deliver = Recorder()
+        self.box.drain(deliver, now=102)
+        self.assertEqual(deliver.calls, [("a", new.key)])
+        self.assertEqual(self.box.get(old.key).targets["a"].status, SUPERSEDED)
+
+    def test_expired_messages_dropped(self):
+        message = self.box.enqueue("text", "hello", ["a"], now=100)
+        deliver = Recorder()
+        self.box.drain(deliver, now=100 + self.box.max_age + 1)
+        self.assertEqual(deliver.calls, [])
+        self.assertEqual(self.box.get(message.key).targets["a"].status, FAILED)
+
+    def test_targets_delivered_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def deliver(target, message, delivery):
+            barrier.wait()
+            return ""
+
+        message = self.box.enqueue("text", "hello", ["a", "b"], now=100)
+        self.box.drain(deliver, now=100)
+        self.assertTrue(self.box.get(message.key).delivered)
+        self.assertTrue((Path(self.tmp.name) / "sent" / f"{message.key}.json").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+import pstats
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import profiling
+from profiling import StageProfiler
+
+
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+def allocate():
+    return [str(i) * 10 for i in range(20000)]
+
+
+class TestStageProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_profiler(self, body):
+        profiler = StageProfiler(str(self.dir), interval=0.001)
+        profiler.start()
+        try:
+            body(profiler)
+        finally:
+            profiler.stop()
+        return profiler, profiler.write()
+
+    def test_stage_outputs(self):
+        def body(p):
+            with p.stage("parse"):
+                busy(0.05)
+            with p.stage("render"):
+                data = allocate()
+                del data
+
+        profiler, lines = self.run_profiler(body)
+        self.assertEqual([line.split()[0] for line in lines], ["parse", "render"])
+        self.assertTrue((self.dir / "parse.pstats").exists())
+        funcs = {func for _, _, func in pstats.Stats(str(self.dir / "parse.pstats")).stats}
+        self.assertIn("busy", funcs)
+
+        collapsed = (self.dir / "profile.collapsed").read_text(encoding="utf-8").splitlines()
+        self.assertTrue(any(line.startswith("parse;MainThread;") and "busy (" in line for line in collapsed))
+        for line in collapsed:
+            stack, count = line.rsplit(" ", 1)
+            self.assertGreater(int(count), 0)
+
+        self.assertGreater(profiler.stats["render"].growth, 100_000)
+        memory = (self.dir / "memory.txt").read_text(encoding="utf-8")
+        self.assertIn("## render", memory)
+        self.assertIn("test_profiling.py", memory)
+
+    def test_nested_stage_time_is_exclusive(self):
+        def body(p):
+            with p.stage("fetch"):
+                with p.stage("parse"):
+                    busy(0.05)
+
+        self.run_profiler(body)
+        fetch_funcs = {func for _, _, func in pstats.Stats(str(self.dir / "fetch.pstats")).stats}
+        parse_funcs = {func for _, _, func in pstats.Stats(str(self.dir / "parse.pstats")).stats}
+        self.assertNotIn("busy", fetch_funcs)
+        self.assertIn("busy", parse_funcs)
+
+    def test_worker_threads_follow_main_stage(self):
+        def body(p):
+            with p.stage("fetch"):
+                worker = threading.Thread(target=busy, args=(0.05,), name="worker")
+                worker.start()
+                worker.join()
+
+        profiler, _ = self.run_profiler(body)
+        self.assertTrue(any(stack.startswith("fetch;worker;") for stack in profiler.samples))
+
+    def test_thread_stage_counts_calls(self):
+        def body(p):
+            def work():
+                with p.stage("enrich"):
+                    busy(0.01)
+
+            threads = [threading.Thread(target=work) for _ in range(3)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        profiler, _ = self.run_profiler(body)
+        self.assertEqual(profiler.stats["enrich"].calls, 3)
+        self.assertFalse((self.dir / "enrich.pstats").exists())
+
+
+    def test_iter_stages_attribute_per_item(self):
+        def produce():
+            for _ in range(3):
+                busy(0.01)
+                yield 1
+
+        def consume(items):
+            for item in items:
+                busy(0.01)
+                yield item
+
+        def body(p):
+            with p.stage("select"):
+                self.assertEqual(sum(p.iter_stage("score", consume(p.iter_stage("filter", produce())))), 3)
+
+        profiler, _ = self.run_profiler(body)
+        self.assertEqual(profiler.stats["filter"].calls, 4)
+        filter_funcs = {func for _, _, func in pstats.Stats(str(self.dir / "filter.pstats")).stats}
+        score_funcs = {func for _, _, func in pstats.Stats(str(self.dir / "score.pstats")).stats}
+        self.assertIn("produce", filter_funcs)
+        self.assertNotIn("produce", score_funcs)
+        self.assertIn("consume", score_funcs)
+
+
+class TestModuleHooks(unittest.TestCase):
+    def test_inactive_stage_is_noop(self):
+        with profiling.stage("anything"):
+            pass
+        items = [1, 2]
+        self.assertIs(profiling.stage_iter("anything", items), items)
+        profiling.finish()
+
+    def test_start_and_finish(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertIsNone(profiling.start(""))
+            self.assertIsNotNone(profiling.start(tmp))
+            with profiling.stage("score"):
+                busy(0.01)
+            profiling.finish()
+            self.assertIn("score", (Path(tmp) / "summary.txt").read_text(encoding="utf-8"))
+            with profiling.stage("score"):
+                pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+import io
+import json
+import unittest
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+import feedparser
+
+from renderers import DigestWriter, render_digest, render_to
+
+NOW = datetime(2026, 1, 2, 8, 0, tzinfo=timezone.utc)
+
+
+@dataclass
+class NewsItem:
+    title: str
+    link: str
+    source: str = ""
+    description: str = ""
+    dt: Optional[datetime] = None
+    score: float = 0.0
+    original_title: str = ""
+    summary: str = ""
+    hot: bool = False
+
+
+def sample_items():
+    return [
+        NewsItem(title="模型 <发布> & 更新", link="https://a.com/1?x=1&y=2", source="A",
+                 description="desc", dt=NOW, score=1.5, hot=True, summary="摘要"),
+        NewsItem(title="无日期条目", link="https://b.com/2", source="B"),
+    ]
+
+
+class CountingWriter(DigestWriter):
+    def __init__(self, out):
+        super().__init__(out)
+        self.calls = []
+
+    def item(self, index, item, hot):
+        self.calls.append((index, item.title, hot))
+
+
+class TestRenderDigest(unittest.TestCase):
+    def test_single_pass_dispatch(self):
+        writers = [CountingWriter(io.StringIO()), CountingWriter(io.StringIO())]
+        meta = render_to(sample_items(), 24, NOW, writers)
+        self.assertEqual((meta.hot_count, meta.normal_count), (1, 1))
+        for writer in writers:
+            self.assertEqual(writer.calls, [(1, "模型 <发布> & 更新", True), (1, "无日期条目", False)])
+
+    def test_markdown(self):
+        md = render_digest(sample_items(), 24, NOW)["markdown"]
+        self.assertIn("## 🔥 重点速递", md)
+        self.assertIn("💬 摘要...", md)
+        self.assertIn("1. [无日期条目](https://b.com/2)", md)
+        self.assertIn("**数据源**: A, B", md)
+
+    def test_feishu_card(self):
+        card = json.loads(render_digest(sample_items(), 24, NOW, ["feishu_card"])["feishu_card"])
+        self.assertEqual(card["header"]["template"], "red")
+        contents = [e["text"]["content"] for e in card["elements"] if e["tag"] == "div"]
+        self.assertIn("**🔥 重点速递**", contents)
+        self.assertTrue(any("[无日期条目](https://b.com/2)" in c for c in contents))
+
+    def test_empty_card_is_valid(self):
+        card = json.loads(render_digest([], 24, NOW, ["feishu_card"])["feishu_card"])
+        self.assertIn("暂无符合条件的资讯", json.dumps(card, ensure_ascii=False))
+
+    def test_html_escaping(self):
+        html = render_digest(sample_items(), 24, NOW, ["html"])["html"]
+        self.assertIn("模型 &lt;发布&gt; &amp; 更新", html)
+        self.assertIn('href="https://a.com/1?x=1&amp;y=2"', html)
+        self.assertEqual(html.count("<ol>"), html.count("</ol>"))
+
+    def test_json_feed(self):
+        feed = json.loads(render_digest(sample_items(), 24, NOW, ["json_feed"])["json_feed"])
+        self.assertEqual(feed["version"], "https://jsonfeed.org/version/1.1")
+        self.assertEqual(feed["items"][0]["id"], "https://a.com/1?x=1&y=2")
+        self.assertEqual(feed["items"][0]["tags"], ["A"])
+        self.assertNotIn("date_published", feed["items"][1])
+
+    def test_rss_roundtrip(self):
+        parsed = feedparser.parse(render_digest(sample_items(), 24, NOW, ["rss"])["rss"])
+        self.assertFalse(parsed.bozo)
+        self.assertEqual(parsed.entries[0].title, "模型 <发布> & 更新")
+        self.assertEqual(parsed.entries[0].link, "https://a.com/1?x=1&y=2")
+        self.assertEqual(len(parsed.entries), 2)
+
+    def test_linear_in_items(self):
+        items = [NewsItem(title=f"条目 {i}", link=f"https://x.com/{i}", source="S") for i in range(5000)]
+        md = render_digest(items, 24, NOW)["markdown"]
+        self.assertIn("5000. [条目 4999]", md)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+import random
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from retryqueue import RetryScheduler, retry_after_seconds
+
+
+class Flaky:
+    """前 failures 次返回重试提示 hint，之后成功"""
+
+    def __init__(self, failures, hint=0.0, name=""):
+        self.failures = failures
+        self.hint = hint
+        self.name = name
+        self.calls = []
+
+    def __call__(self):
+        self.calls.append(time.monotonic())
+        if len(self.calls) <= self.failures:
+            return f"{self.name} failed", self.hint
+        return f"{self.name} ok", None
+
+
+class TestRetryScheduler(unittest.TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+
+    def scheduler(self, **kwargs):
+        kwargs.setdefault("base", 0.01)
+        return RetryScheduler(self.executor, rng=random.Random(1), **kwargs)
+
+    def test_retries_until_success(self):
+        job = Flaky(2)
+        self.assertEqual(self.scheduler().submit(job, "a", retries=2).result(timeout=5), " ok")
+        self.assertEqual(len(job.calls), 3)
+
+    def test_gives_up_with_last_result(self):
+        job = Flaky(5)
+        self.assertEqual(self.scheduler().submit(job, "a", retries=1).result(timeout=5), " failed")
+        self.assertEqual(len(job.calls), 2)
+
+    def test_retry_after_is_honored(self):
+        job = Flaky(1, hint=0.2)
+        self.scheduler().submit(job, "a").result(timeout=5)
+        self.assertGreaterEqual(job.calls[1] - job.calls[0], 0.2)
+
+    def test_retry_after_beyond_cap_is_not_retried(self):
+        job = Flaky(1, hint=120)
+        self.assertEqual(self.scheduler().submit(job, "a").result(timeout=5), " failed")
+        self.assertEqual(len(job.calls), 1)
+
+    def test_full_jitter_bounds(self):
+        sched = self.scheduler(base=1.0, cap=5.0)
+        delays = [sched.delay(3) for _ in range(200)]
+        self.assertTrue(all(0 <= d <= 5.0 for d in delays))
+        self.assertGreater(len({round(d, 3) for d in delays}), 100)
+        self.assertGreaterEqual(sched.delay(0, retry_after=2.0), 2.0)
+
+    def test_host_budget(self):
+        sched = self.scheduler(host_budget=1)
+        first, second = Flaky(5), Flaky(5)
+        sched.submit(first, "slow.example", retries=3).result(timeout=5)
+        sched.submit(second, "slow.example", retries=3).result(timeout=5)
+        self.assertEqual(len(first.calls) + len(second.calls), 3)
+        other = Flaky(1)
+        self.assertEqual(sched.submit(other, "fine.example").result(timeout=5), " ok")
+
+    def test_waiting_job_does_not_hold_worker(self):
+        sched = self.scheduler()
+        slow = Flaky(1, hint=0.3, name="slow")
+        fast = Flaky(0, name="fast")
+        order = []
+        slow_future = sched.submit(slow, "a")
+        time.sleep(0.05)
+        fast_future = sched.submit(fast, "b")
+        for f in (slow_future, fast_future):
+            f.add_done_callback(lambda f: order.append(f.result()))
+        slow_future.result(timeout=5)
+        self.assertEqual(order, ["fast ok", "slow ok"])
+
+    def test_delayed_submit(self):
+        sched = self.scheduler()
+        started = time.monotonic()
+        sched.submit(Flaky(0), "a", delay=0.2).result(timeout=5)
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+
+    def test_timer_thread_exits_when_idle(self):
+        sched = self.scheduler()
+        sched.submit(Flaky(1), "a").result(timeout=5)
+        thread = sched._thread
+        if thread is not None:
+            thread.join(timeout=5)
+        self.assertIsNone(sched._thread)
+        self.assertEqual(sched.submit(Flaky(1), "a").result(timeout=5), " ok")
+
+    def test_close_owned_executor(self):
+        with RetryScheduler(base=0.01) as sched:
+            self.assertEqual(sched.submit(Flaky(1), "a").result(timeout=5), " ok")
+        self.assertRaises(RuntimeError, sched._executor.submit, time.monotonic)
+
+    def test_exception_propagates(self):
+        def boom():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            self.scheduler().submit(boom).result(timeout=5)
+
+
+class TestRetryAfter(unittest.TestCase):
+    def test_parse(self):
+        now = datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc)
+        self.assertEqual(retry_after_seconds("30"), 30)
+        self.assertEqual(retry_after_seconds(format_datetime(now + timedelta(seconds=90), usegmt=True), now), 90)
+        self.assertEqual(retry_after_seconds(format_datetime(now - timedelta(seconds=90), usegmt=True), now), 0)
+        self.assertEqual(retry_after_seconds("soon"), 0)
+        self.assertEqual(retry_after_seconds(None), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import translation_memory
+from translation_memory import TranslationMemory, join_parts
+
+
+class FakeUpstream:
+    def __init__(self, online=True):
+        self.online = online
+        self.calls = []
+
+    def __call__(self, text):
+        self.calls.append(text)
+        return f"译[{text}]" if self.online else text
+
+
+class TestGlossary(unittest.TestCase):
+    def test_fully_covered_title_is_local(self):
+        upstream = FakeUpstream()
+        tm = TranslationMemory()
+        self.assertEqual(tm.translate("Anthropic releases Claude 4", upstream), "Anthropic 发布 Claude 4")
+        self.assertEqual(tm.translate("OpenAI launches new reasoning model", upstream), "OpenAI 推出新推理模型")
+        self.assertEqual(upstream.calls, [])
+
+    def test_versioned_names_kept(self):
+        tm = TranslationMemory()
+        self.assertEqual(tm.translate("Qwen2.5 and Llama 3.1 benchmarks", FakeUpstream()), "Qwen2.5 和 Llama 3.1 基准测试")
+
+    def test_partial_coverage_sent_whole(self):
+        upstream = FakeUpstream()
+        tm = TranslationMemory()
+        result = tm.translate("Google releases Gemini 2.0 model for humanoid robots", upstream)
+        self.assertEqual(upstream.calls, ["⟦0⟧ releases ⟦1⟧ model for humanoid robots"])
+        self.assertIn("Gemini 2.0", result)
+
+    def test_adjacent_duplicates_collapsed(self):
+        tm = TranslationMemory()
+        self.assertEqual(tm.translate("Anthropic raises funding", FakeUpstream()), "Anthropic 融资")
+
+    def test_protected_terms_masked_upstream(self):
+        upstream = FakeUpstream()
+        tm = TranslationMemory()
+        result = tm.translate("Why Llama matters to everyone building software today", upstream)
+        self.assertEqual(upstream.calls, ["Why ⟦0⟧ matters to everyone building software today"])
+        self.assertIn("Llama", result)
+        self.assertNotIn("⟦", result)
+
+    def test_custom_glossary(self):
+        tm = TranslationMemory(glossary={"world model": "世界模型"}, protected_terms=["Genie"])
+        self.assertEqual(tm.translate("Genie 3 world model", FakeUpstream()), "Genie 3 世界模型")
+
+    def test_offline_keeps_english(self):
+        upstream = FakeUpstream(online=False)
+        tm = TranslationMemory()
+        for title in (
+            "Why models fail at math",
+            "How we built our multi-agent research system",
+            "Anthropic raises funding to build safer robots",
+        ):
+            self.assertEqual(tm.translate(title, upstream), title)
+        self.assertEqual(tm.stats["offline"], 3)
+        self.assertEqual(tm.entries, {})
+
+    def test_offline_keeps_covered_segments(self):
+        tm = TranslationMemory()
+        result = tm.translate("OpenAI releases new model: why it matters", FakeUpstream(online=False))
+        self.assertEqual(result, "OpenAI 发布新模型：why it matters")
+
+    def test_concurrent_stats(self):
+        tm = TranslationMemory()
+        upstream = FakeUpstream(online=False)
+
+        def work(n):
+            for i in range(200):
+                tm.translate(f"Startup {n} unveils gadget {i}", upstream)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual((tm.stats["upstream"], tm.stats["offline"]), (800, 800))
+
+
+class TestMemory(unittest.TestCase):
+    def test_exact_and_persisted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "tm.json")
+            upstream = FakeUpstream()
+            tm = TranslationMemory(path)
+            first = tm.translate("Why scaling laws still hold for everyone", upstream)
+            tm.save()
+            again = TranslationMemory(path).translate("Why  scaling laws still hold for EVERYONE", upstream)
+            self.assertEqual(first, again)
+            self.assertEqual(len(upstream.calls), 1)
+
+    def test_fuzzy_reuse_substitutes_versions(self):
+        tm = TranslationMemory()
+        tm.remember("Gemini 2.0 tops the leaderboard on coding tasks", "Gemini 2.0 在编程任务排行榜上登顶")
+        self.assertEqual(tm.lookup("Gemini 2.5 tops the leaderboard on coding tasks"), "Gemini 2.5 在编程任务排行榜上登顶")
+        self.assertEqual(tm.stats["fuzzy"], 1)
+
+    def test_fuzzy_rejects_untransferable_change(self):
+        tm = TranslationMemory()
+        tm.remember("Gemini 2.0 tops the leaderboard on coding tasks", "Gemini 2.0 在编程任务排行榜上登顶")
+        self.assertIsNone(tm.lookup("Gemini 2.0 tops the leaderboard on math tasks"))
+
+    def test_fuzzy_lookup_uses_precomputed_trigrams(self):
+        tm = TranslationMemory()
+        for i in range(50):
+            tm.remember(f"Gemini {i}.0 tops the leaderboard on coding tasks", f"Gemini {i}.0 在编程任务排行榜上登顶")
+        with patch.object(translation_memory, "trigrams", wraps=translation_memory.trigrams) as spy:
+            tm.lookup("Gemini 2.5 tops the leaderboard on coding tasks")
+        self.assertEqual(spy.call_count, 1)
+
+    def test_concurrent_saves_keep_all_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "tm.json")
+            memories = [TranslationMemory(path) for _ in range(4)]
+
+            def work(n, tm):
+                for i in range(10):
+                    tm.remember(f"title {n} {i}", f"标题 {n} {i}")
+                    tm.save()
+
+            threads = [threading.Thread(target=work, args=(n, tm)) for n, tm in enumerate(memories)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            with open(path, "r", encoding="utf-8") as f:
+                self.assertEqual(len(json.load(f)["entries"]), 40)
+
+
+class TestJoinParts(unittest.TestCase):
+    def test_spacing(self):
+        self.assertEqual(join_parts(["OpenAI", "推出", "新", "GPT-5"]), "OpenAI 推出新 GPT-5")
+        self.assertEqual(join_parts(["OpenAI", ",", "Google"]), "OpenAI, Google")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+离线翻译记忆与术语表
+- 精确匹配：规范化后的原文直接命中记忆
+- 模糊匹配：字符三元组召回相近原文，仅当差异全是译文中原样出现的词（版本号、名称）时替换复用
+- 术语表：模型/产品名原样保留，常见短语按表翻译；完全覆盖的片段本地拼装，其余片段整段送去在线翻译
+- 在线翻译不可用时，完全覆盖的片段仍可产出中文，其余片段保留英文原文，不输出中英夹杂的逐词拼接
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，退化为不加锁
+    fcntl = None
+
+# 保持原文、不应被翻译的模型与产品名（可带版本号，如 GPT-4o、Llama 3.1、Qwen2.5）
+PROTECTED_TERMS = [
+    "Claude", "Sonnet", "Opus", "Haiku", "Anthropic",
+    "ChatGPT", "GPT", "OpenAI", "Sora", "Codex",
+    "Gemini", "Gemma", "DeepMind", "Google",
+    "Llama", "Meta", "Qwen", "DeepSeek", "Kimi", "GLM", "Mistral", "Grok", "xAI",
+    "Microsoft", "Copilot", "NVIDIA", "Nvidia", "Apple", "Amazon", "AWS",
+    "Hugging Face", "PyTorch", "TensorFlow", "arXiv", "GitHub",
+    "Perplexity", "Midjourney", "Stable Diffusion", "Cursor", "API", "SDK",
+]
+
+GLOSSARY = {
+    "large language models": "大语言模型",
+    "large language model": "大语言模型",
+    "language models": "语言模型",
+    "language model": "语言模型",
+    "open-sources": "开源",
+    "open-sourced": "开源",
+    "open-source": "开源",
+    "open source": "开源",
+    "open-weight": "开放权重",
+    "open weights": "开放权重",
+    "context window": "上下文窗口",
+    "video generation": "视频生成",
+    "image generation": "图像生成",
+    "now available": "现已上线",
+    "generally available": "正式上线",
+    "agents": "智能体",
+    "agent": "智能体",
+    "agentic": "智能体",
+    "reasoning": "推理",
+    "inference": "推理",
+    "benchmarks": "基准测试",
+    "benchmark": "基准测试",
+    "fine-tuning": "微调",
+    "multimodal": "多模态",
+    "models": "模型",
+    "model": "模型",
+    "releases": "发布",
+    "released": "发布",
+    "release": "发布",
+    "launches": "推出",
+    "launched": "推出",
+    "launch": "推出",
+    "introduces": "推出",
+    "introducing": "推出",
+    "announces": "宣布",
+    "announced": "宣布",
+    "unveils": "发布",
+    "updates": "更新",
+    "update": "更新",
+    "new": "新",
+    "funding": "融资",
+    "raises": "融资",
+    "acquires": "收购",
+    "acquisition": "收购",
+    "partnership": "合作",
+    "research": "研究",
+    "paper": "论文",
+    "dataset": "数据集",
+    "training": "训练",
+    "safety": "安全",
+    "coding": "编程",
+    "chips": "芯片",
+    "chip": "芯片",
+    "robots": "机器人",
+    "robot": "机器人",
+    "robotics": "机器人",
+    "preview": "预览版",
+    "version": "版本",
+    "faster": "更快",
+    "cheaper": "更便宜",
+    "and": "和",
+}
+
+STOPWORDS = {"a", "an", "the", "its", "their", "our", "your", "is", "are", "to", "of", "for", "with", "on", "in", "at", "by", "from"}
+
+SEGMENT_RE = re.compile(r"(\s*:\s+|\s+[-–—|]\s+)")
+FUZZY_THRESHOLD = 0.85
+MAX_ENTRIES = 20000
+PLACEHOLDER = "⟦{}⟧"
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def has_cjk(text: str) -> bool:
+    return any("\u4e00" <= c <= "\u9fff" for c in text)
+
+
+def needs_space(prev: str, nxt: str) -> bool:
+    """中文与中文之间不留空格，中英文之间、英文单词之间留空格，标点前不留空格"""
+    prev_cjk, next_cjk = has_cjk(prev), has_cjk(nxt)
+    if prev_cjk and next_cjk:
+        return False
+    if prev in "([":
+        return False
+    if nxt in "([":
+        return True
+    if not (next_cjk or nxt.isalnum()):
+        return False
+    if not (prev_cjk or prev.isalnum()):
+        return nxt.isascii()
+    return True
+
+
+def join_parts(parts: list[str]) -> str:
+    out = ""
+    for part in parts:
+        if not part:
+            continue
+        if out and needs_space(out[-1], part[0]):
+            out += " "
+        out += part
+    return out
+
+
+def collapse(parts: list[str]) -> list[str]:
+    """合并相邻的相同译文（如 raises funding → 融资），空片段忽略"""
+    out: list[str] = []
+    for part in parts:
+        if part and not (out and out[-1] == part and has_cjk(part)):
+            out.append(part)
+    return out
+
+
+def tokens(text: str) -> list[str]:
+    return re.findall(r"\w[\w.+-]*|\S", text)
+
+
+@contextmanager
+def locked(path: str):
+    with open(f"{path}.lock", "a", encoding="utf-8") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class TranslationMemory:
+    def __init__(
+        self,
+        path: str = "",
+        glossary: Optional[dict[str, str]] = None,
+        protected_terms: Optional[list[str]] = None,
+        fuzzy_threshold: float = FUZZY_THRESHOLD,
+    ):
+        self.path = path
+        self.glossary = {k.casefold(): v for k, v in {**GLOSSARY, **(glossary or {})}.items()}
+        self.protected_terms = list(PROTECTED_TERMS) + list(protected_terms or [])
+        self.fuzzy_threshold = fuzzy_threshold
+        self.entries: dict[str, dict] = {}
+        self._index: dict[str, set[str]] = {}
+        self._sizes: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.stats = {"exact": 0, "fuzzy": 0, "local": 0, "upstream": 0, "offline": 0}
+
+        terms = "|".join(re.escape(t) for t in sorted(self.protected_terms, key=len, reverse=True))
+        phrases = "|".join(re.escape(p) for p in sorted(self.glossary, key=len, reverse=True))
+        self._scan = re.compile(
+            rf"(?P<term>\b(?:{terms})(?:[-\s]?v?\d+(?:\.\d+)*[A-Za-z]*)?(?![\w]))"
+            rf"|(?P<phrase>(?i:\b(?:{phrases})\b))"
+            r"|(?P<number>\d[\w.%]*)"
+            r"|(?P<word>[A-Za-z][\w'’+-]*)"
+            r"|(?P<other>\S)"
+        )
+        self.load()
+
+    # ---- 持久化 ----
+
+    def load(self) -> None:
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for key, entry in data.get("entries", {}).items():
+            if isinstance(entry, dict) and entry.get("target"):
+                self._add(key, entry)
+
+    def save(self) -> None:
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            entries = dict(self.entries)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        # 读取、合并、写回在同一把文件锁内完成，并发运行不会互相覆盖新增的记忆
+        with locked(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    on_disk = json.load(f).get("entries", {})
+            except (OSError, ValueError):
+                on_disk = {}
+            merged = {**on_disk, **entries}
+            if len(merged) > MAX_ENTRIES:
+                newest = sorted(merged.items(), key=lambda kv: kv[1].get("ts", 0), reverse=True)[:MAX_ENTRIES]
+                merged = dict(newest)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"version": 1, "entries": merged}, f, ensure_ascii=False)
+                os.replace(tmp, self.path)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+        self._dirty = False
+
+    # ---- 记忆 ----
+
+    def _add(self, key: str, entry: dict) -> None:
+        """写入记忆并更新三元组索引；每条原文的三元组数在此预先算好，查询时不再重算"""
+        self.entries[key] = entry
+        grams = trigrams(key)
+        self._sizes[key] = len(grams)
+        for gram in grams:
+            self._index.setdefault(gram, set()).add(key)
+
+    def remember(self, source: str, target: str) -> None:
+        key = normalize(source)
+        if not key or not target:
+            return
+        with self._lock:
+            self._add(key, {"source": source, "target": target, "ts": time.time()})
+            self._dirty = True
+
+    def lookup(self, text: str) -> Optional[str]:
+        key = normalize(text)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry:
+                self.stats["exact"] += 1
+                return entry["target"]
+
+            grams = trigrams(key)
+            counts: dict[str, int] = {}
+            for gram in grams:
+                for candidate in self._index.get(gram, ()):
+                    counts[candidate] = counts.get(candidate, 0) + 1
+            ranked = sorted(
+                ((2 * shared / (len(grams) + self._sizes[candidate]), candidate) for candidate, shared in counts.items()),
+                reverse=True,
+            )
+            for score, candidate in ranked[:5]:
+                if score < self.fuzzy_threshold:
+                    break
+                adapted = self._adapt(self.entries[candidate], text)
+                if adapted:
+                    self.stats["fuzzy"] += 1
+                    return adapted
+        return None
+
+    def _adapt(self, entry: dict, text: str) -> Optional[str]:
+        """相近原文的译文复用：差异词必须在旧译文中原样出现，逐个替换为新词"""
+        old, new = tokens(entry["source"]), tokens(text)
+        target = entry["target"]
+        matcher = SequenceMatcher(None, [t.casefold() for t in old], [t.casefold() for t in new], autojunk=False)
+        for op, i1, i2, j1, j2 in matcher.get_opcodes():
+            if op == "equal":
+                continue
+            if op != "replace" or i2 - i1 != j2 - j1:
+                return None
+            for old_token, new_token in zip(old[i1:i2], new[j1:j2]):
+                if old_token not in target:
+                    return None
+                target = target.replace(old_token, new_token, 1)
+        return target
+
+    # ---- 术语表 ----
+
+    def scan(self, text: str) -> list[tuple[str, str, str]]:
+        """切分为 (类型, 原文, 译文) 片段，类型为 keep / zh / drop / miss"""
+        spans = []
+        for m in self._scan.finditer(text):
+            kind, value = m.lastgroup, m.group()
+            if kind == "phrase":
+                spans.append(("zh", value, self.glossary[value.casefold()]))
+            elif kind == "word":
+                if value.casefold() in STOPWORDS:
+                    spans.append(("drop", value, ""))
+                else:
+                    spans.append(("miss", value, value))
+            else:
+                spans.append(("keep", value, value))
+        return spans
+
+    def _mask(self, text: str) -> tuple[str, list[str]]:
+        terms: list[str] = []
+
+        def repl(m: re.Match) -> str:
+            if m.lastgroup != "term":
+                return m.group()
+            terms.append(m.group())
+            return PLACEHOLDER.format(len(terms) - 1)
+
+        return self._scan.sub(repl, text), terms
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _upstream(self, text: str, upstream: Callable[[str], str]) -> Optional[str]:
+        cached = self.lookup(text)
+        if cached:
+            return cached
+        masked, terms = self._mask(text)
+        self._count("upstream")
+        result = upstream(masked)
+        if terms and any(PLACEHOLDER.format(i) not in result for i in range(len(terms))):
+            result = upstream(text)
+            terms = []
+        for i, term in enumerate(terms):
+            result = result.replace(PLACEHOLDER.format(i), term)
+        if not result or result == text or not has_cjk(result):
+            return None
+        self.remember(text, result)
+        return result
+
+    def _translate_segment(self, segment: str, upstream: Callable[[str], str]) -> tuple[str, bool]:
+        """术语表完全覆盖的片段本地拼装，其余整段送 upstream；upstream 失败时原样返回英文片段"""
+        cached = self.lookup(segment)
+        if cached:
+            return cached, True
+
+        spans = self.scan(segment)
+        content = [s for s in spans if s[0] in ("zh", "miss") or (s[0] == "keep" and s[1][0].isalpha())]
+        if content and not any(s[0] == "miss" for s in content):
+            self._count("local")
+            return join_parts(collapse([s[2] for s in spans])), True
+
+        translated = self._upstream(segment, upstream)
+        if translated:
+            return translated, True
+        self._count("offline")
+        return segment, False
+
+    def translate(self, text: str, upstream: Callable[[str], str]) -> str:
+        """按片段翻译标题：记忆/术语表能覆盖的本地完成，其余送 upstream；upstream 失败时保留英文片段"""
+        cached = self.lookup(text)
+        if cached:
+            return cached
+
+        pieces = SEGMENT_RE.split(text)
+        out: list[str] = []
+        complete = True
+        for i, piece in enumerate(pieces):
+            if i % 2:
+                out.append("：" if piece.strip() == ":" else piece)
+                continue
+            if not piece.strip():
+                out.append(piece)
+                continue
+            translated, ok = self._translate_segment(piece, upstream)
+            complete = complete and ok
+            out.append(translated)
+
+        result = "".join(out)
+        if complete and has_cjk(result):
+            self.remember(text, result)
+        return result if has_cjk(result) else text